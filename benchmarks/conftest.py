@@ -0,0 +1,40 @@
+"""Shared configuration for the gnuplot_style benchmark suite."""
+
+import os
+import sys
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Import gnuplot_style from src and the reference layout from tests
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines")
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:  # pragma: no cover
+    # Without the plugin there is no `benchmark` fixture to run against
+    collect_ignore_glob = ["test_*.py"]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Store results next to the suite unless another storage is given."""
+    if getattr(config.option, "benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BASELINES}"
+
+
+@pytest.fixture(autouse=True)
+def _reset_matplotlib():
+    """Start every benchmark from matplotlib's defaults with no open figures."""
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+
+    mpl.rcdefaults()
+    yield
+    plt.close("all")
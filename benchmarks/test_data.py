@@ -0,0 +1,77 @@
+"""Benchmarks for reading gnuplot data files."""
+
+import numpy as np
+import pytest
+
+import gnuplot_style as gp
+from gnuplot_style.data import _cached_index
+
+N_DATASETS = 4
+N_BLOCKS = 50
+N_ROWS = 2_500  # per block: 500k lines, about 14 MB
+
+
+@pytest.fixture(scope="module")
+def dat_file(tmp_path_factory):
+    """A three-column file of datasets made of blank-line separated blocks."""
+    path = tmp_path_factory.mktemp("data") / "run.dat"
+    rng = np.random.default_rng(0)
+    with open(path, "w") as f:
+        for _ in range(N_DATASETS):
+            for _ in range(N_BLOCKS):
+                np.savetxt(f, rng.normal(size=(N_ROWS, 3)), fmt="%.6g")
+                f.write("\n")
+            f.write("\n")
+    return path
+
+
+def test_index(benchmark, dat_file):
+    """Scan the file for its blocks and datasets."""
+    benchmark(gp.DataFile, dat_file, cache="none")
+
+
+def test_read_dataset(benchmark, dat_file):
+    """Read two columns of one dataset through the cached index."""
+    _cached_index.cache_clear()
+    benchmark(gp.load_data, dat_file, index=2, using="1:2")
+
+
+def test_read_every(benchmark, dat_file):
+    """Read every 10th point of the first block of every dataset."""
+    benchmark(gp.load_data, dat_file, every="10:1:0:0::0", using="1:2")
+
+
+def test_loadtxt_whole_file(benchmark, dat_file):
+    """Parse the whole file with numpy.loadtxt, for comparison."""
+    benchmark.pedantic(np.loadtxt, args=(dat_file,), rounds=3)
+
+
+N_RECORDS = 4_000_000  # 80 MB of '%float64%float64%*int32' records
+
+
+@pytest.fixture(scope="module")
+def bin_file(tmp_path_factory):
+    """Records of two doubles and a skipped int."""
+    path = tmp_path_factory.mktemp("data") / "sim.bin"
+    records = np.zeros(N_RECORDS, dtype=[("t", "f8"), ("v", "f8"), ("flag", "i4")])
+    records["t"] = np.arange(N_RECORDS)
+    records["v"] = np.sin(records["t"])
+    records.tofile(path)
+    return path
+
+
+def test_binary_columns(benchmark, bin_file):
+    """Map the two columns without reading them."""
+    benchmark(gp.load_binary, bin_file, format="%float64%float64%*int32")
+
+
+def test_binary_chunked_max(benchmark, bin_file):
+    """Reduce one column chunk by chunk."""
+    data = gp.BinaryFile(bin_file, format="%float64%float64%*int32")
+    benchmark(lambda: max(v.max() for t, v in data.chunks()))
+
+
+def test_binary_fromfile(benchmark, bin_file):
+    """Read the whole file with numpy.fromfile, for comparison."""
+    dtype = np.dtype([("t", "f8"), ("v", "f8"), ("flag", "i4")])
+    benchmark(np.fromfile, bin_file, dtype=dtype)
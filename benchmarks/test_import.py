@@ -0,0 +1,36 @@
+"""Benchmarks for importing gnuplot_style in a fresh interpreter."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+STATEMENTS = {
+    "import": "import gnuplot_style",
+    "import_and_use": "import gnuplot_style as gp; gp.use()",
+}
+
+
+@pytest.mark.parametrize("name", list(STATEMENTS))
+def test_import(benchmark, name):
+    """Start Python and run an import statement, interpreter startup included."""
+    env = dict(os.environ, PYTHONPATH=SRC, MPLBACKEND="Agg")
+    command = [sys.executable, "-c", STATEMENTS[name]]
+
+    def run():
+        subprocess.run(command, env=env, check=True)
+
+    benchmark.pedantic(run, rounds=10, warmup_rounds=1)
+
+
+def test_interpreter_startup(benchmark):
+    """Start Python without importing anything, for reference."""
+    command = [sys.executable, "-c", "pass"]
+
+    def run():
+        subprocess.run(command, check=True)
+
+    benchmark.pedantic(run, rounds=10, warmup_rounds=1)
@@ -0,0 +1,55 @@
+"""Benchmarks for keys with hundreds of entries."""
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import gnuplot_style as gp
+
+N_ENTRIES = [100, 400]
+N_POINTS = 2_000
+
+
+def _figure(n):
+    """Return a drawn figure whose axes hold ``n`` labelled lines."""
+    gp.use("cl", cycle_mode="extended", profile="fast")
+    fig = Figure(figsize=(12, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    x = np.linspace(0, 1, N_POINTS)
+    for i in range(n):
+        ax.plot(x, np.sin(x * i), label=f"series {i}")
+    fig.canvas.draw()
+    return fig, ax
+
+
+@pytest.mark.parametrize("n", N_ENTRIES, ids=lambda n: f"{n}entries")
+def test_key(benchmark, n):
+    """Build and draw a fixed-position key from shared proxies."""
+    fig, ax = _figure(n)
+
+    def build():
+        gp.key(ax, maxrows=50)
+        fig.canvas.draw()
+
+    benchmark.pedantic(build, rounds=3)
+
+
+@pytest.mark.parametrize("n", N_ENTRIES, ids=lambda n: f"{n}entries")
+def test_legend_best(benchmark, n):
+    """Build and draw ax.legend() at loc='best', for comparison."""
+    fig, ax = _figure(n)
+
+    def build():
+        ax.legend(ncol=n // 50)
+        fig.canvas.draw()
+
+    benchmark.pedantic(build, rounds=3)
+
+
+@pytest.mark.parametrize("n", N_ENTRIES, ids=lambda n: f"{n}entries")
+def test_draw_without_key(benchmark, n):
+    """Draw the same figure without a key, the cost both share."""
+    fig, _ = _figure(n)
+    benchmark.pedantic(fig.canvas.draw, rounds=3)
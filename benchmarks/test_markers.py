@@ -0,0 +1,32 @@
+"""Benchmarks for lines drawn with shared point type markers."""
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import gnuplot_style as gp
+
+N_LINES = 2_000
+
+
+@pytest.mark.parametrize("shared", [False, True], ids=["strings", "shared"])
+def test_plot_point_types(benchmark, shared):
+    """Add many marker-only lines, from marker strings or shared MarkerStyles."""
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    x = np.arange(10.0)
+    if shared:
+        styles = [{"marker": gp.marker_style(i)} for i in range(N_LINES)]
+    else:
+        styles = [
+            dict(zip(("marker", "fillstyle"), gp.pointtype(i))) for i in range(N_LINES)
+        ]
+
+    def plot():
+        ax.cla()
+        for style in styles:
+            ax.plot(x, x, linestyle="none", **style)
+
+    benchmark(plot)
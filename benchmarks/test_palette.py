@@ -0,0 +1,48 @@
+"""Benchmarks for gnuplot palettes."""
+
+import numpy as np
+import pytest
+
+import gnuplot_style as gp
+from gnuplot_style.palette import _parse_palette, _rgbformulae_cmap
+
+SPEC = "rgbformulae 33,13,10"
+
+
+@pytest.fixture(scope="module")
+def image():
+    """A 1000x1000 image of gray values in [0, 1]."""
+    return np.random.default_rng(0).random((1000, 1000))
+
+
+def test_palette_build(benchmark):
+    """Parse a palette and tabulate its formulae."""
+
+    def build():
+        _parse_palette.cache_clear()
+        _rgbformulae_cmap.cache_clear()
+        return gp.get_palette(SPEC)
+
+    benchmark(build)
+
+
+def test_palette_cached(benchmark):
+    """Look up an already built palette."""
+    gp.get_palette(SPEC)
+    benchmark(gp.get_palette, SPEC)
+
+
+def test_palette_lut_image(benchmark, image):
+    """Color an image through the palette's lookup table."""
+    cmap = gp.get_palette(SPEC)
+    cmap(image)
+    benchmark(cmap, image)
+
+
+def test_palette_formulae_image(benchmark, image):
+    """Evaluate the formulae on every pixel, for comparison."""
+
+    def evaluate():
+        return np.stack([gp.rgbformula(k, image) for k in (33, 13, 10)], axis=-1)
+
+    benchmark(evaluate)
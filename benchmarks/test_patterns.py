@@ -0,0 +1,97 @@
+"""Benchmarks for pattern fills on large bar charts."""
+
+import numpy as np
+import pytest
+from matplotlib.container import BarContainer
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+
+import gnuplot_style as gp
+
+SIZES = [10, 10_000, 100_000]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n}bars")
+def bars(request):
+    """Build a bar container once per size.
+
+    The rectangles are not added to an axes: ``Axes.bar`` spends about a
+    millisecond per bar updating data limits, which would make the 100k
+    case take minutes to set up while leaving `apply_pattern` unchanged.
+    """
+    n = request.param
+    return BarContainer([Rectangle((float(x), 0.0), 0.8, 1.0) for x in range(n)])
+
+
+def test_apply_pattern(benchmark, bars):
+    """Apply one pattern to every bar."""
+    benchmark(gp.apply_pattern, bars, pattern=4)
+
+
+def test_apply_pattern_per_bar(benchmark, bars):
+    """Apply a different pattern to each bar."""
+    patterns = np.arange(len(bars)) % len(gp.PATTERNS)
+    benchmark(gp.apply_pattern, bars, pattern=patterns)
+
+
+@pytest.mark.parametrize("n", SIZES, ids=lambda n: f"{n}bars")
+def test_apply_pattern_collection(benchmark, n):
+    """Replace the bars by one collection per pattern."""
+    patterns = np.arange(n) % len(gp.PATTERNS)
+
+    def setup():
+        ax = Figure().subplots()
+        bars = BarContainer([Rectangle((float(x), 0.0), 0.8, 1.0) for x in range(n)])
+        for patch in bars:
+            # Attached by hand; see the bars fixture for why not ax.bar
+            patch.axes = ax
+        return (bars,), {"pattern": patterns, "collection": True}
+
+    benchmark.pedantic(gp.apply_pattern, setup=setup, rounds=5)
+
+
+@pytest.mark.parametrize("n", SIZES, ids=lambda n: f"{n}bars")
+def test_pattern_bars(benchmark, n):
+    """Draw patterned bars as one collection per pattern."""
+    x = np.arange(n, dtype=float)
+    heights = np.ones(n)
+    patterns = np.arange(n) % len(gp.PATTERNS)
+
+    def setup():
+        return (Figure().subplots(), x, heights), {"pattern": patterns}
+
+    benchmark.pedantic(gp.pattern_bars, setup=setup, rounds=20)
+
+
+@pytest.fixture(scope="module")
+def table():
+    """A 1000-row histogram table of four series."""
+    return np.random.default_rng(0).random((1_000, 4))
+
+
+@pytest.mark.parametrize("mode", ["clustered", "rowstacked"])
+def test_histogram(benchmark, table, mode):
+    """Lay out and draw a histogram table as one collection per series."""
+
+    def setup():
+        return (Figure().subplots(), table), {"mode": mode}
+
+    benchmark.pedantic(gp.histogram, setup=setup, rounds=20)
+
+
+def test_bar_histogram(benchmark, table):
+    """Build the clustered histogram with ax.bar and apply_pattern, for comparison."""
+    n_series = table.shape[1]
+    width = 1.0 / (n_series + 2)
+    x = np.arange(len(table))
+
+    def build(ax):
+        for k in range(n_series):
+            offset = (k - (n_series - 1) / 2) * width
+            bars = ax.bar(x + offset, table[:, k], width=width)
+            gp.apply_pattern(bars, pattern=k)
+
+    def setup():
+        return (Figure().subplots(),), {}
+
+    benchmark.pedantic(build, setup=setup, rounds=3)
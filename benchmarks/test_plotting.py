@@ -0,0 +1,141 @@
+"""Benchmarks for the vectorized plotting functions."""
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import gnuplot_style as gp
+
+SIZES = [10_000, 1_000_000]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n}points")
+def points(request):
+    """Random points with one point type and line color per point."""
+    rng = np.random.default_rng(0)
+    n = request.param
+    x, y = rng.normal(size=(2, n))
+    pt = rng.integers(1, len(gp.MARKERS), n)
+    return x, y, pt, pt % len(gp.COLORS)
+
+
+def test_scatter(benchmark, points):
+    """Group the points into one collection per point type."""
+    x, y, pt, lc = points
+
+    def setup():
+        return (Figure().subplots(), x, y), {"pt": pt, "lc": lc}
+
+    benchmark.pedantic(gp.scatter, setup=setup, rounds=5)
+
+
+def test_scatter_draw(benchmark, points):
+    """Draw the grouped scatter with the Agg backend."""
+    x, y, pt, lc = points
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    gp.scatter(fig.subplots(), x, y, pt=pt, lc=lc, s=4)
+    benchmark.pedantic(canvas.draw, rounds=3, warmup_rounds=1)
+
+
+def test_linetype_colors(benchmark, points):
+    """Look up an RGBA color per point from its line type."""
+    _, _, _, lc = points
+    benchmark(gp.linetype, lc)
+
+
+N_SERIES, N_SAMPLES = 2_000, 200
+
+
+@pytest.fixture(scope="module")
+def traces():
+    """Many short series, one per row."""
+    x = np.linspace(0, 1, N_SAMPLES)
+    return x, np.sin(x * 6 + np.arange(N_SERIES)[:, None])
+
+
+def test_multiline(benchmark, traces):
+    """Draw all series as one LineCollection per dash pattern, Agg included."""
+    x, Y = traces
+    gp.use("cl", cycle_mode="extended")
+
+    def render():
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        gp.multiline(fig.subplots(), x, Y)
+        canvas.draw()
+
+    benchmark.pedantic(render, rounds=3, warmup_rounds=1)
+
+
+def test_plot_per_series(benchmark, traces):
+    """Draw the same series with one ax.plot call each, for comparison."""
+    x, Y = traces
+    gp.use("cl", cycle_mode="extended")
+
+    def render():
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.subplots()
+        for y in Y:
+            ax.plot(x, y)
+        canvas.draw()
+
+    benchmark.pedantic(render, rounds=3, warmup_rounds=1)
+
+
+@pytest.fixture(scope="module")
+def long_series():
+    """One long noisy series."""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 100, 10_000_000)
+    return x, np.sin(x) + rng.normal(0, 0.3, x.size)
+
+
+def test_plot_decimated(benchmark, long_series):
+    """Plot a 10M point series decimated to the pixel columns, Agg included."""
+    x, y = long_series
+    gp.use("cl")
+
+    def render():
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        gp.plot(fig.subplots(), x, y)
+        canvas.draw()
+
+    benchmark.pedantic(render, rounds=3, warmup_rounds=1)
+
+
+def test_plot_full_series(benchmark, long_series):
+    """Plot the same series with ax.plot, for comparison."""
+    x, y = long_series
+    gp.use("cl")
+
+    def render():
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        fig.subplots().plot(x, y)
+        canvas.draw()
+
+    benchmark.pedantic(render, rounds=3, warmup_rounds=1)
+
+
+@pytest.mark.parametrize(
+    "thinning",
+    [{}, {"pointinterval": 100}],
+    ids=["every_point", "pointinterval"],
+)
+def test_marker_series(benchmark, thinning):
+    """Draw a 100k point series with markers, with and without thinning."""
+    x = np.linspace(0, 10, 100_000)
+    y = np.sin(x)
+    gp.use("cm", skip_no_marker=True, **thinning)
+
+    def render():
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        fig.subplots().plot(x, y)
+        canvas.draw()
+
+    benchmark.pedantic(render, rounds=3, warmup_rounds=1)
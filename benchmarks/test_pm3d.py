@@ -0,0 +1,48 @@
+"""Benchmarks for pm3d maps of dense grids."""
+
+import io
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import gnuplot_style as gp
+
+N = 1_000  # grid points per axis
+
+
+@pytest.fixture(scope="module")
+def grid():
+    """A regular grid and its values."""
+    x = np.linspace(-3, 3, N)
+    X, Y = np.meshgrid(x, x)
+    return X, Y, np.sin(X * Y) * np.exp(-(X**2) - Y**2)
+
+
+def _save(draw, fmt):
+    """Draw on a new figure and save it in ``fmt``; return the file size."""
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    draw(fig.subplots())
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.tell()
+
+
+@pytest.mark.parametrize("fmt", ["png", "pdf"])
+def test_pm3d_map(benchmark, grid, fmt):
+    """Draw and save the map with gp.pm3d, which uses an image."""
+    benchmark.pedantic(
+        _save, args=(lambda ax: gp.pm3d(ax, *grid, colorbox=False), fmt), rounds=3
+    )
+
+
+@pytest.mark.parametrize("fmt", ["png", "pdf"])
+def test_pcolormesh_map(benchmark, grid, fmt):
+    """Draw and save the same map with ax.pcolormesh, for comparison."""
+    benchmark.pedantic(
+        _save,
+        args=(lambda ax: ax.pcolormesh(*grid, shading="nearest"), fmt),
+        rounds=1,
+    )
@@ -0,0 +1,141 @@
+"""Benchmarks for building and saving the reference figures."""
+
+import io
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import gnuplot_style as gp
+from tests.test_reference_gnuplot_style import build_reference
+
+FORMATS = ["png", "pdf", "svg"]
+PROFILES = ["default", "fast"]
+
+
+def build_lines():
+    """Build the four-line figure of the colors + lines test."""
+    gp.use("cl")
+    fig, ax = plt.subplots(figsize=(8, 6))
+    x = np.linspace(0, 2 * np.pi, 50)
+    for i in range(4):
+        ax.plot(x, np.sin(x + i * 0.5), linewidth=2, label=f"Line {i+1}")
+    ax.set_title("Test: Colors + Lines")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+# Layout name -> (builder, dpi and bbox used when the figure is saved)
+LAYOUTS = {
+    "lines": (build_lines, {"dpi": 100}),
+    "reference": (build_reference, {"dpi": 150, "bbox_inches": "tight"}),
+}
+
+
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_build(benchmark, layout):
+    """Create a figure and draw all of its artists."""
+    builder, _ = LAYOUTS[layout]
+
+    def build():
+        plt.close(builder())
+
+    benchmark.pedantic(build, rounds=5, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_save(benchmark, layout, fmt):
+    """Save a built figure with the Agg, PDF or SVG backend."""
+    builder, savefig_kwargs = LAYOUTS[layout]
+    fig = builder()
+
+    def save():
+        fig.savefig(io.BytesIO(), format=fmt, **savefig_kwargs)
+
+    benchmark.pedantic(save, rounds=5, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_save_all_formats(benchmark, layout):
+    """Save a built figure as PNG, PDF and SVG with one savefig per format."""
+    builder, savefig_kwargs = LAYOUTS[layout]
+    fig = builder()
+
+    def save():
+        for fmt in FORMATS:
+            fig.savefig(io.BytesIO(), format=fmt, **savefig_kwargs)
+
+    benchmark.pedantic(save, rounds=3, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_savefig_many(benchmark, layout):
+    """Save the same three formats with gp.savefig_many."""
+    builder, savefig_kwargs = LAYOUTS[layout]
+    fig = builder()
+    benchmark.pedantic(
+        gp.savefig_many,
+        args=(fig,),
+        kwargs=dict(formats=FORMATS, **savefig_kwargs),
+        rounds=3,
+        warmup_rounds=1,
+    )
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("profile", PROFILES)
+def test_profile(benchmark, profile, fmt):
+    """Build and save a labelled figure with the savefig settings of a profile."""
+    gp.use("cl", profile=profile)
+    x = np.linspace(0, 2 * np.pi, 200)
+
+    def render():
+        fig, ax = plt.subplots()
+        for i in range(4):
+            ax.plot(x, np.sin(x + i * 0.5), label=f"Line {i+1}")
+        ax.set_xlabel("x")
+        ax.set_ylabel("sin(x)")
+        ax.set_title("Layout profile")
+        ax.legend()
+        fig.savefig(io.BytesIO(), format=fmt)
+        plt.close(fig)
+
+    benchmark.pedantic(render, rounds=10, warmup_rounds=1)
+
+
+BATCH_SIZE = 16
+
+
+def build_small():
+    """Build a small labelled figure for the batch benchmarks."""
+    fig, ax = plt.subplots()
+    x = np.linspace(0, 2 * np.pi, 50)
+    for i in range(4):
+        ax.plot(x, np.sin(x + i * 0.5))
+    ax.set_title("Batch")
+    return fig
+
+
+def test_batch_serial(benchmark):
+    """Build and save a batch of figures one after another in this process."""
+    gp.use("cl")
+
+    def render():
+        for _ in range(BATCH_SIZE):
+            fig = build_small()
+            fig.savefig(io.BytesIO(), format="png")
+            plt.close(fig)
+
+    benchmark.pedantic(render, rounds=3, warmup_rounds=1)
+
+
+def test_batch_render_many(benchmark):
+    """Render the same batch with gp.render_many, pool startup included."""
+    benchmark.pedantic(
+        gp.render_many,
+        args=([build_small] * BATCH_SIZE,),
+        kwargs={"style": "cl"},
+        rounds=3,
+    )
@@ -0,0 +1,49 @@
+"""Benchmarks for running gnuplot scripts."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import gnuplot_style as gp
+from gnuplot_style.data import _cached_index
+from gnuplot_style.script import _compile_file, _load
+
+N_FILES = 8
+N_POINTS = 20_000
+
+
+@pytest.fixture(scope="module")
+def script(tmp_path_factory):
+    """A script plotting eight two-column data files."""
+    root = tmp_path_factory.mktemp("script")
+    x = np.linspace(0, 10, N_POINTS)
+    items = []
+    for i in range(N_FILES):
+        np.savetxt(root / f"s{i}.dat", np.column_stack([x, np.sin(x + i)]))
+        items.append(f"'s{i}.dat' using 1:2 with lines lt {i + 1} title 's{i}'")
+    path = root / "fig.gp"
+    path.write_text("set xlabel 't'\nplot " + ", \\\n     ".join(items) + "\n")
+    return path
+
+
+def test_run_script_cold(benchmark, script):
+    """Compile the script, parse the data and draw it on fresh axes."""
+
+    def run():
+        _compile_file.cache_clear()
+        _load.cache_clear()
+        _cached_index.cache_clear()
+        fig, ax = plt.subplots()
+        gp.run_script(script, ax=ax)
+        plt.close(fig)
+
+    benchmark(run)
+
+
+def test_run_script_rerun(benchmark, script):
+    """Re-run the unchanged script on the same axes, as a watch loop does."""
+    gp.use("cl")
+    fig, ax = plt.subplots()
+    gp.run_script(script, ax=ax)
+    benchmark(gp.run_script, script, ax=ax)
+    plt.close(fig)
@@ -0,0 +1,39 @@
+"""Benchmarks for applying styles with gp.use()."""
+
+import pytest
+
+import gnuplot_style as gp
+
+STYLES = ["color", "line", "marker", "color+line", "color+marker", "all"]
+CYCLE_MODES = ["default", "extended", "zip"]
+
+
+@pytest.mark.parametrize("cycle_mode", CYCLE_MODES)
+@pytest.mark.parametrize("style", STYLES)
+def test_use(benchmark, style, cycle_mode):
+    """Re-apply a style whose prop_cycle is already cached."""
+    gp.use(style, cycle_mode=cycle_mode)
+    benchmark(gp.use, style, cycle_mode=cycle_mode)
+
+
+@pytest.mark.parametrize("cycle_mode", CYCLE_MODES)
+@pytest.mark.parametrize("style", STYLES)
+def test_use_cold(benchmark, style, cycle_mode):
+    """Apply a style after the caches have been cleared."""
+    benchmark.pedantic(
+        gp.use,
+        args=(style,),
+        kwargs={"cycle_mode": cycle_mode},
+        setup=gp.cache_clear,
+        rounds=50,
+    )
+
+
+def test_use_alternating(benchmark):
+    """Switch between two styles, as a script styling several figures does."""
+
+    def switch():
+        gp.use("all", cycle_mode="extended")
+        gp.use("color")
+
+    benchmark(switch)
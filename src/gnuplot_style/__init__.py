@@ -6,9 +6,14 @@ Usage:
     import gnuplot_style as gp
     gp.use()  # Apply gnuplot colors (default)
     gp.use('cl')  # Apply colors + lines
+
+Only the constants are loaded on import; matplotlib is imported the first
+time a function that needs it is accessed.
 """
 
-from .api import all, colors, colors_lines, colors_markers, lines, markers
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from .constants import (
     COLORS,
     FILL_STYLES,
@@ -17,14 +22,62 @@ from .constants import (
     PATTERN_FILL_STYLES,
     PATTERNS,
 )
-from .core import apply_pattern, use
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .api import all, colors, colors_lines, colors_markers, lines, markers, patterns
+    from .constants import COLORS_RGBA
+    from .core import (
+        apply,
+        apply_pattern,
+        cache_clear,
+        cache_info,
+        histogram,
+        pattern_bars,
+        style_context,
+        use,
+    )
+    from .cycle import GnuplotCycle, linetype, marker_style, pointtype
+    from .data import BinaryFile, DataFile, load_binary, load_data
+    from .legend import key
+    from .palette import (
+        cubehelix_palette,
+        defined_palette,
+        get_palette,
+        register_palette,
+        rgbformula,
+        rgbformulae_palette,
+    )
+    from .plotting import multiline, plot, pm3d, scatter
+    from .render import render_many, savefig_many
+    from .script import run_script
 
 __version__ = "0.1.3"
 
 __all__ = [
     # Main functions
     "use",
+    "apply",
+    "style_context",
     "apply_pattern",
+    "pattern_bars",
+    "histogram",
+    "plot",
+    "scatter",
+    "multiline",
+    "pm3d",
+    "key",
+    "render_many",
+    "savefig_many",
+    "load_data",
+    "load_binary",
+    "run_script",
+    "get_palette",
+    "register_palette",
+    "rgbformulae_palette",
+    "defined_palette",
+    "cubehelix_palette",
+    "cache_info",
+    "cache_clear",
     # Convenience functions
     "colors",
     "lines",
@@ -32,11 +85,80 @@ __all__ = [
     "colors_lines",
     "colors_markers",
     "all",
+    "patterns",
+    # Lazy cycles and style lookups
+    "GnuplotCycle",
+    "linetype",
+    "pointtype",
+    "marker_style",
+    "rgbformula",
+    # Data files
+    "DataFile",
+    "BinaryFile",
     # Constants (for advanced users)
     "COLORS",
+    "COLORS_RGBA",
     "LINE_STYLES",
     "MARKERS",
     "FILL_STYLES",
     "PATTERNS",
     "PATTERN_FILL_STYLES",
 ]
+
+# Public name -> submodule that defines it, imported on first access
+_LAZY_ATTRS = {
+    "use": "core",
+    "apply": "core",
+    "style_context": "core",
+    "apply_pattern": "core",
+    "pattern_bars": "core",
+    "histogram": "core",
+    "plot": "plotting",
+    "scatter": "plotting",
+    "multiline": "plotting",
+    "pm3d": "plotting",
+    "key": "legend",
+    "render_many": "render",
+    "savefig_many": "render",
+    "load_data": "data",
+    "DataFile": "data",
+    "load_binary": "data",
+    "BinaryFile": "data",
+    "run_script": "script",
+    "get_palette": "palette",
+    "register_palette": "palette",
+    "rgbformulae_palette": "palette",
+    "defined_palette": "palette",
+    "cubehelix_palette": "palette",
+    "rgbformula": "palette",
+    "cache_info": "core",
+    "cache_clear": "core",
+    "colors": "api",
+    "lines": "api",
+    "markers": "api",
+    "colors_lines": "api",
+    "colors_markers": "api",
+    "all": "api",
+    "patterns": "api",
+    "GnuplotCycle": "cycle",
+    "linetype": "cycle",
+    "pointtype": "cycle",
+    "marker_style": "cycle",
+    "COLORS_RGBA": "constants",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import lazily exported names on first access."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List lazily exported names alongside the loaded ones."""
+    return sorted(set(globals()) | set(__all__))
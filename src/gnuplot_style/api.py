@@ -1,6 +1,9 @@
 """Convenience API functions for gnuplot style."""
 
-from .core import use
+from cycler import Cycler, cycler
+
+from .constants import PATTERNS
+from .core import _pattern_style, use
 
 
 def colors() -> None:
@@ -74,3 +77,33 @@ def all(
         skip_no_marker=skip_no_marker,
         loop_order=loop_order,
     )
+
+
+def patterns(color: str = "black") -> Cycler:
+    """Return gnuplot pattern fills (0-7) as bar keyword arguments.
+
+    Each entry is a dict with ``facecolor``, ``edgecolor`` and ``hatch``,
+    so passing it to ``ax.bar`` or ``ax.hist`` creates the bars with their
+    pattern fill directly, without a second :func:`apply_pattern` pass.
+
+    Parameters
+    ----------
+    color : str, optional
+        Edge and hatch color, and fill color of the solid pattern (3)
+
+    Returns
+    -------
+    cycler.Cycler
+        Eight entries in pattern order; call it to cycle forever.
+
+    Examples
+    --------
+    >>> for style, heights in zip(gp.patterns(), table):
+    ...     ax.bar(x, heights, **style)
+    """
+    fills = [_pattern_style(index, color) for index in range(len(PATTERNS))]
+    return cycler(
+        facecolor=[facecolor for facecolor, _ in fills],
+        edgecolor=[color] * len(fills),
+        hatch=[hatch for _, hatch in fills],
+    )
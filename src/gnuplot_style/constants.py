@@ -1,5 +1,7 @@
 """Gnuplot style constants."""
 
+from typing import Any
+
 # Gnuplot default colors
 COLORS = [
     "#9400D3",  # Dark violet
@@ -12,6 +14,9 @@ COLORS = [
     "#000000",  # Black
 ]
 
+# COLORS_RGBA, an (8, 4) read-only float array of COLORS, is built on first
+# access (see __getattr__) so importing the constants does not load numpy
+
 # Gnuplot line styles (dash patterns for line types 0-8)
 LINE_STYLES = [
     "-",  # LT0: solid
@@ -100,3 +105,18 @@ STYLE_MAP = {
     "m": "marker",
     "clm": "all",
 }
+
+
+def __getattr__(name: str) -> Any:
+    """Build the NumPy color table on first access."""
+    if name != "COLORS_RGBA":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import numpy as np
+
+    # Decode all hex triplets at once: 3 bytes per color, scaled to 0-1
+    rgb = np.frombuffer(bytes.fromhex("".join(c[1:] for c in COLORS)), np.uint8)
+    rgba = np.ones((len(COLORS), 4))
+    rgba[:, :3] = rgb.reshape(-1, 3) / 255
+    rgba.setflags(write=False)
+    globals()[name] = rgba
+    return rgba
@@ -1,24 +1,71 @@
 """Core functionality for gnuplot style."""
 
-import itertools
 import os
-from math import gcd
-from typing import Any, List, Union
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from numbers import Integral
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
 
 import matplotlib as mpl
-import matplotlib.pyplot as plt
-from cycler import cycler
-
-from .constants import (
-    COLORS,
-    FILL_STYLES,
-    LINE_STYLES,
-    MARKERS,
-    PATTERN_FILL_STYLES,
-    PATTERNS,
-    STYLE_MAP,
+import numpy as np
+from cycler import Cycler
+from matplotlib.rcsetup import validate_cycler
+
+from .constants import COLORS, PATTERN_FILL_STYLES, PATTERNS, STYLE_MAP
+from .cycle import GnuplotCycle
+from .palette import register_palette
+
+# Upper bound on the number of distinct prop_cycles kept by ``use()``
+_PROP_CYCLE_CACHE_SIZE = 32
+
+_STYLE_PATH = os.path.join(os.path.dirname(__file__), "gnuplot.mplstyle")
+
+# rcParams that styles never touch (mirrors matplotlib.style's blacklist)
+_STYLE_BLACKLIST = frozenset(
+    {
+        "interactive",
+        "backend",
+        "webagg.port",
+        "webagg.address",
+        "webagg.port_retries",
+        "webagg.open_in_browser",
+        "backend_fallback",
+        "toolbar",
+        "timezone",
+        "figure.max_open_warning",
+        "figure.raise_window",
+        "savefig.directory",
+        "tk.window_focus",
+        "docstring.hardcopy",
+        "date.epoch",
+    }
 )
 
+_MISSING = object()
+
+_HISTOGRAM_MODES = ("clustered", "rowstacked", "columnstacked")
+
+_PROFILES = ("default", "fast")
+
+# rcParams that the 'fast' profile pins instead of laying figures out per draw
+_FAST_PARAMS = {
+    "figure.autolayout": False,
+    "figure.constrained_layout.use": False,
+    "savefig.bbox": None,
+}
+
+# Text metrics used to estimate fixed margins, in units of the font size:
+# typical tick label length in characters, character width, line height and
+# the padding tight_layout leaves around the figure edge
+_TICK_LABEL_CHARS = 5
+_CHAR_WIDTH = 0.6
+_LINE_HEIGHT = 1.2
+_BORDER_PAD = 1.08
+
+# Serializes gnuplot_style's writes to the process-global rcParams
+_RC_LOCK = threading.RLock()
+
 
 def use(
     style: str = "color",
@@ -26,6 +73,9 @@ def use(
     cycle_mode: str = "default",
     skip_no_marker: bool = False,
     loop_order: str = "mlc",
+    profile: str = "default",
+    pointinterval: Optional[int] = None,
+    palette: Any = None,
 ) -> None:
     """Apply gnuplot style with a single command.
 
@@ -61,205 +111,814 @@ def use(
         Default 'mlc': marker changes slowest, then line, color changes fastest.
         Examples: 'clm' (color slowest), 'lmc' (line slowest).
         Only used when style='all' and cycle_mode='extended'.
+    profile : str, optional
+        Layout profile (default: 'default'):
+        - 'default': gnuplot.mplstyle as is, with ``figure.autolayout`` and
+          ``savefig.bbox: tight`` laying out every figure on each draw and save
+        - 'fast': same look, but both are switched off and
+          ``figure.subplot.*`` holds fixed margins computed from
+          ``figure.figsize`` and the font sizes, which saves a layout pass
+          per draw and a full extra draw per save
+    pointinterval : int, optional
+        Like gnuplot's ``pointinterval``: series with markers draw a marker
+        on every Nth data point only (``markevery=N``)
+    palette : str or Colormap, optional
+        Like gnuplot's ``set palette``: a specification such as
+        ``'rgbformulae 33,13,10'`` or ``'cubehelix'`` (see
+        :func:`get_palette`), registered and stored in ``image.cmap``. By
+        default ``image.cmap`` keeps its mplstyle value.
 
     Raises
     ------
     ValueError
-        If an unknown style is provided.
+        If an unknown style or profile is provided, or an invalid
+        ``pointinterval`` or ``palette``.
+
+    Notes
+    -----
+    ``gnuplot.mplstyle`` is parsed and validated once per process; each call
+    then writes only the rcParams that differ from the requested state, so
+    re-applying the active style is a no-op. The validated prop_cycle is
+    memoized per ``(style, cycle_mode, skip_no_marker, loop_order,
+    markevery)`` in a
+    bounded LRU cache, so repeated calls with the same configuration skip
+    rebuilding it. See :func:`cache_info` and :func:`cache_clear`.
     """
-    # Reset to defaults first
-    mpl.rcdefaults()
+    # Resolve the prop_cycle first so an invalid request leaves rcParams alone
+    style = STYLE_MAP.get(style, style)
+    markevery = _markevery(pointinterval)
+    prop_cycle = _build_prop_cycle(
+        style, cycle_mode, skip_no_marker, loop_order, markevery
+    )
+    _check_profile(profile)
+    cmap = _palette_name(palette)
 
-    # Apply gnuplot.mplstyle if requested and available
-    if apply_mplstyle:
-        # Look for gnuplot.mplstyle in the same directory as this module
-        style_path = os.path.join(os.path.dirname(__file__), "gnuplot.mplstyle")
-        if os.path.exists(style_path):
-            plt.style.use(style_path)
+    with _RC_LOCK:
+        delta = _style_delta(prop_cycle, apply_mplstyle, profile, cmap)
+        if delta:
+            _rc_update(delta)
+
+
+@contextmanager
+def style_context(
+    style: str = "color",
+    apply_mplstyle: bool = True,
+    cycle_mode: str = "default",
+    skip_no_marker: bool = False,
+    loop_order: str = "mlc",
+    profile: str = "default",
+    pointinterval: Optional[int] = None,
+    palette: Any = None,
+) -> Iterator[None]:
+    """Temporarily apply gnuplot style; usable as context manager or decorator.
+
+    Takes the same parameters as :func:`use`. On entry only the rcParams
+    that differ from the requested style are saved and overwritten, and on
+    exit exactly those keys are restored, so the cost is proportional to
+    the change rather than to the full rcParams.
+
+    The gnuplot_style rcParams lock is held for the duration of the block:
+    contexts nest freely within a thread, while :func:`use` and
+    :func:`style_context` calls from other threads wait until the block
+    exits. To style figures in parallel, use :func:`apply` instead.
+
+    Raises
+    ------
+    ValueError
+        If an unknown style or profile is provided, or an invalid
+        ``pointinterval`` or ``palette``.
+
+    Examples
+    --------
+    >>> with style_context("cl", cycle_mode="extended"):
+    ...     fig, ax = plt.subplots()
+
+    >>> @style_context("all")
+    ... def make_figure():
+    ...     return plt.subplots()
+    """
+    style = STYLE_MAP.get(style, style)
+    markevery = _markevery(pointinterval)
+    prop_cycle = _build_prop_cycle(
+        style, cycle_mode, skip_no_marker, loop_order, markevery
+    )
+    _check_profile(profile)
+    cmap = _palette_name(palette)
+
+    with _RC_LOCK:
+        delta = _style_delta(prop_cycle, apply_mplstyle, profile, cmap)
+        saved = {key: dict.__getitem__(mpl.rcParams, key) for key in delta}
+        _rc_update(delta)
+        try:
+            yield
+        finally:
+            _rc_update(saved)
+
+
+def apply(
+    target: Any,
+    style: str = "color",
+    apply_mplstyle: bool = True,
+    cycle_mode: str = "default",
+    skip_no_marker: bool = False,
+    loop_order: str = "mlc",
+    profile: str = "default",
+    pointinterval: Optional[int] = None,
+    palette: Any = None,
+) -> None:
+    """Apply gnuplot style to existing Axes or Figures without touching rcParams.
+
+    Unlike :func:`use`, nothing global is modified, so different figures can
+    be styled concurrently from several threads.
+
+    Parameters
+    ----------
+    target : Axes, Figure or iterable of them
+        What to style. A Figure styles itself and all of its axes; an Axes
+        styles only that axes.
+    style : str, optional
+        Style to apply, as accepted by :func:`use` (default: 'color')
+    apply_mplstyle : bool, optional
+        Whether to also apply the figure and axes properties from
+        gnuplot.mplstyle: figure facecolor, edgecolor, dpi and layout, and
+        axes facecolor, spines, grid, labels and ticks (default: True)
+    cycle_mode : str, optional
+        Cycling mode, as accepted by :func:`use` (default: 'default')
+    skip_no_marker : bool, optional
+        Whether to skip marker index 0 (no symbol) (default: False)
+    loop_order : str, optional
+        Loop order for extended 'all' mode, as accepted by :func:`use`
+    profile : str, optional
+        Layout profile, as accepted by :func:`use`. With 'fast', figures
+        get fixed margins computed from their own size in place of a tight
+        layout; other layout engines are kept (default: 'default')
+    pointinterval : int, optional
+        Marker thinning for series with markers, as accepted by :func:`use`
+    palette : str or Colormap, optional
+        Palette, as accepted by :func:`use`, given to the images and
+        color-mapped collections already on the axes
 
-    # Normalize style name
+    Raises
+    ------
+    ValueError
+        If an unknown style or profile is provided, or an invalid
+        ``pointinterval`` or ``palette``.
+
+    Notes
+    -----
+    Properties that matplotlib reads from rcParams when an artist is
+    created (line widths, marker sizes, fonts, legend frames) cannot be
+    attached to existing axes; pass them explicitly or use :func:`use`.
+    """
     style = STYLE_MAP.get(style, style)
+    markevery = _markevery(pointinterval)
+    prop_cycle = _build_prop_cycle(
+        style, cycle_mode, skip_no_marker, loop_order, markevery
+    )
+    _check_profile(profile)
+    cmap = _palette_name(palette)
+    params = _base_params(True, profile) if apply_mplstyle else None
 
-    # Build the prop_cycle based on style
-    if style == "color":
-        # Just colors
-        plt.rc("axes", prop_cycle=cycler("color", COLORS))
-
-    elif style == "line":
-        # Just line styles (keep default colors)
-        plt.rc("axes", prop_cycle=cycler("linestyle", LINE_STYLES))
-
-    elif style == "marker":
-        # Just markers - no connecting lines, pair element-wise
-        if skip_no_marker:
-            # Skip the first marker (no symbol)
-            markers_to_use = MARKERS[1:]
-            fills_to_use = FILL_STYLES[1:]
+    for obj in _iter_targets(target):
+        if hasattr(obj, "set_prop_cycle"):
+            axes = [obj]
         else:
-            markers_to_use = MARKERS
-            fills_to_use = FILL_STYLES
-
-        plt.rc(
-            "axes",
-            prop_cycle=cycler(
-                marker=markers_to_use,
-                fillstyle=fills_to_use,
-                linestyle=["none"] * len(markers_to_use),
-            ),
+            if params is not None:
+                _style_figure(obj, params, profile)
+            axes = obj.axes
+        for ax in axes:
+            ax.set_prop_cycle(prop_cycle)
+            if params is not None:
+                _style_axes(ax, params)
+            if cmap is not None:
+                _style_mappables(ax, cmap)
+
+
+def cache_info() -> Any:
+    """Return hit/miss statistics of the prop_cycle cache used by :func:`use`.
+
+    Returns
+    -------
+    functools._CacheInfo
+        Named tuple with ``hits``, ``misses``, ``maxsize`` and ``currsize``.
+    """
+    return _build_prop_cycle.cache_info()
+
+
+def cache_clear() -> None:
+    """Drop every prop_cycle cached by :func:`use` and the parsed mplstyle."""
+    _build_prop_cycle.cache_clear()
+    _base_params.cache_clear()
+    _mplstyle_params.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _mplstyle_params() -> Dict[str, Any]:
+    """Parse and validate the bundled gnuplot.mplstyle."""
+    if not os.path.exists(_STYLE_PATH):
+        return {}
+    params = mpl.rc_params_from_file(_STYLE_PATH, use_default_template=False)
+    return {k: v for k, v in dict.items(params) if k not in _STYLE_BLACKLIST}
+
+
+@lru_cache(maxsize=None)
+def _base_params(apply_mplstyle: bool, profile: str = "default") -> Dict[str, Any]:
+    """Return the validated rcParams that ``rcdefaults()`` + mplstyle produce.
+
+    The 'fast' profile additionally replaces the per-draw layout with fixed
+    margins. ``axes.prop_cycle`` is left out since :func:`use` always
+    supplies its own.
+    """
+    params = {
+        k: v for k, v in dict.items(mpl.rcParamsDefault) if k not in _STYLE_BLACKLIST
+    }
+    if apply_mplstyle:
+        params.update(_mplstyle_params())
+    if profile == "fast":
+        params.update(_FAST_PARAMS)
+        margins = _fixed_margins(params["figure.figsize"], params)
+        params.update({f"figure.subplot.{k}": v for k, v in margins.items()})
+    del params["axes.prop_cycle"]
+    return params
+
+
+def _style_delta(
+    prop_cycle: Cycler,
+    apply_mplstyle: bool,
+    profile: str = "default",
+    cmap: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Return the rcParams writes that turn the current state into a style.
+
+    The target state is rcdefaults() + gnuplot.mplstyle (if requested) +
+    the layout ``profile`` + ``prop_cycle`` + the ``cmap`` name (if given);
+    keys that already hold their target value are omitted.
+    """
+    params = _base_params(apply_mplstyle, profile)
+    if cmap is not None:
+        params = {**params, "image.cmap": cmap}
+    delta = _rc_delta(params)
+    if dict.get(mpl.rcParams, "axes.prop_cycle") is not prop_cycle:
+        delta["axes.prop_cycle"] = prop_cycle
+    return delta
+
+
+def _rc_delta(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the entries of ``params`` that differ from the current rcParams."""
+    delta = {}
+    for key, value in params.items():
+        current = dict.get(mpl.rcParams, key, _MISSING)
+        if current is not value and current != value:
+            delta[key] = value
+    return delta
+
+
+def _rc_update(params: Dict[str, Any]) -> None:
+    """Store already-validated values in rcParams without revalidating them."""
+    # ``RcParams._set`` is the supported raw setter from matplotlib 3.7 on
+    setter = getattr(mpl.rcParams, "_set", None)
+    for key, value in params.items():
+        if setter is None:
+            dict.__setitem__(mpl.rcParams, key, value)
+        else:
+            setter(key, value)
+
+
+@lru_cache(maxsize=_PROP_CYCLE_CACHE_SIZE)
+def _build_prop_cycle(
+    style: str,
+    cycle_mode: str,
+    skip_no_marker: bool,
+    loop_order: str,
+    markevery: Optional[int] = None,
+) -> Cycler:
+    """Build and validate the prop_cycle for a normalized style name.
+
+    Results are memoized on the full argument tuple, so callers must treat
+    the returned cycler as read-only.
+    """
+    # Validate once here so cache hits can skip matplotlib's validation
+    return validate_cycler(
+        GnuplotCycle(style, cycle_mode, skip_no_marker, loop_order, markevery)
+    )
+
+
+def _markevery(pointinterval: Optional[int]) -> Optional[int]:
+    """Translate gnuplot's pointinterval into a markevery value."""
+    if pointinterval is None:
+        return None
+    if isinstance(pointinterval, bool) or not (
+        isinstance(pointinterval, Integral) and pointinterval >= 1
+    ):
+        raise ValueError(
+            f"pointinterval must be a positive integer, got {pointinterval!r}"
         )
+    return int(pointinterval)
+
+
+def _palette_name(palette: Any) -> Optional[str]:
+    """Register a ``palette`` option and return its colormap name."""
+    if palette is None:
+        return None
+    return register_palette(palette)
+
+
+def _check_profile(profile: str) -> None:
+    """Raise ValueError for an unknown layout profile."""
+    if profile not in _PROFILES:
+        raise ValueError(f"Unknown profile: {profile}. Use 'default' or 'fast'")
+
 
-    elif style == "color+line":
-        # Create paired colors and lines
-        if cycle_mode == "extended":
-            # Extended mode: cycle through all combinations (8 colors × 9 lines = 72)
-            colors = []
-            lines = []
-            for line_idx in range(len(LINE_STYLES)):
-                for color_idx in range(len(COLORS)):
-                    colors.append(COLORS[color_idx])
-                    lines.append(LINE_STYLES[line_idx])
+def _fixed_margins(figsize: Any, params: Dict[str, Any]) -> Dict[str, float]:
+    """Estimate subplot margins that fit tick labels, axis labels and a title.
+
+    The room each side needs is computed in points from the font and tick
+    settings in ``params``, the way tight_layout would measure a typical
+    single-axes plot, and converted to figure fractions for ``figsize``.
+    """
+    from matplotlib.font_manager import font_scalings
+
+    def size(key: str) -> float:
+        value = params[key]
+        if isinstance(value, str):
+            return float(params["font.size"] * font_scalings[value])
+        return float(value)
+
+    def ticks(axis: str) -> float:
+        # Tick length outside the axes plus the gap to the tick labels
+        direction = params[f"{axis}tick.direction"]
+        length = params[f"{axis}tick.major.size"]
+        outside = {"out": length, "inout": length / 2}.get(direction, 0.0)
+        return outside + params[f"{axis}tick.major.pad"]
+
+    border = _BORDER_PAD * params["font.size"]
+    label = _LINE_HEIGHT * size("axes.labelsize") + params["axes.labelpad"]
+    xtick_width = _TICK_LABEL_CHARS * _CHAR_WIDTH * size("xtick.labelsize")
+    ytick_width = _TICK_LABEL_CHARS * _CHAR_WIDTH * size("ytick.labelsize")
+
+    left = border + label + ytick_width + ticks("y")
+    bottom = border + label + _LINE_HEIGHT * size("xtick.labelsize") + ticks("x")
+    top = border + _LINE_HEIGHT * size("axes.titlesize") + params["axes.titlepad"]
+    # The last x tick label is centered on the right edge of the axes
+    right = border + xtick_width / 2
+
+    width, height = (72.0 * float(v) for v in figsize)
+    return {
+        "left": left / width,
+        "right": 1.0 - right / width,
+        "bottom": bottom / height,
+        "top": 1.0 - top / height,
+    }
+
+
+def _iter_targets(target: Any) -> List[Any]:
+    """Flatten an Axes, a Figure or a (nested) iterable of them."""
+    if hasattr(target, "set_prop_cycle") or hasattr(target, "add_subplot"):
+        return [target]
+    objs = []
+    for item in target:
+        objs.extend(_iter_targets(item))
+    return objs
+
+
+def _style_figure(fig: Any, params: Dict[str, Any], profile: str = "default") -> None:
+    """Apply the figure-level rcParams in ``params`` to ``fig``."""
+    fig.set_facecolor(params["figure.facecolor"])
+    fig.set_edgecolor(params["figure.edgecolor"])
+    fig.set_dpi(params["figure.dpi"])
+    if profile == "fast" and _has_tight_layout(fig):
+        # Fixed margins replace the tight layout figure.autolayout installs
+        if hasattr(fig, "set_layout_engine"):
+            fig.set_layout_engine("none")
         else:
-            # Default: element-wise pairing (8 combinations)
-            colors = []
-            lines = []
-            for i in range(8):
-                colors.append(COLORS[i % len(COLORS)])
-                lines.append(LINE_STYLES[i % len(LINE_STYLES)])
-        plt.rc("axes", prop_cycle=cycler(color=colors, linestyle=lines))
-
-    elif style == "color+marker":
-        # Create paired colors and markers
-        if cycle_mode == "extended":
-            # Extended mode: cycle through all combinations
-            # (8 colors × 17 markers = 136, or 8 × 16 = 128 if skipping no marker)
-            colors = []
-            markers = []
-            fills = []
-            start_idx = 1 if skip_no_marker else 0
-            for marker_idx in range(start_idx, len(MARKERS)):
-                for color_idx in range(len(COLORS)):
-                    colors.append(COLORS[color_idx])
-                    markers.append(MARKERS[marker_idx])
-                    fills.append(FILL_STYLES[marker_idx])
+            fig.set_tight_layout(False)
+    elif _has_layout(fig):
+        # Leave an explicitly chosen layout engine alone
+        return
+    if profile == "fast":
+        fig.subplots_adjust(**_fixed_margins(fig.get_size_inches(), params))
+    elif params["figure.autolayout"]:
+        if hasattr(fig, "set_layout_engine"):
+            fig.set_layout_engine("tight")
         else:
-            # Default: element-wise pairing (8 combinations)
-            colors = []
-            markers = []
-            fills = []
-            start_idx = 1 if skip_no_marker else 0
-            for i in range(8):
-                colors.append(COLORS[i % len(COLORS)])
-                marker_idx = (i + start_idx) % len(MARKERS)
-                markers.append(MARKERS[marker_idx])
-                fills.append(FILL_STYLES[marker_idx])
-        plt.rc("axes", prop_cycle=cycler(color=colors, marker=markers, fillstyle=fills))
-
-    elif style == "all":
-        # All three combined
-        colors = []
-        lines = []
-        markers = []
-        fills = []
-
-        if cycle_mode == "extended":
-            # Extended mode: cycle through all combinations
-            # (8 colors × 9 lines × 17 markers = 1224
-            # or 8 × 9 × 16 = 1152 if skipping no marker)
-            start_idx = 1 if skip_no_marker else 0
-            if set(loop_order) != {"c", "l", "m"} or len(loop_order) != 3:
-                raise ValueError(
-                    f"loop_order must be a permutation of 'c', 'l', 'm', \
-                    got '{loop_order}'"
-                )
-            ranges = {
-                "c": range(len(COLORS)),
-                "l": range(len(LINE_STYLES)),
-                "m": range(start_idx, len(MARKERS)),
-            }
-            for indices in itertools.product(*[ranges[k] for k in loop_order]):
-                idx = dict(zip(loop_order, indices))
-                colors.append(COLORS[idx["c"]])
-                lines.append(LINE_STYLES[idx["l"]])
-                markers.append(MARKERS[idx["m"]])
-                fills.append(FILL_STYLES[idx["m"]])
-        elif cycle_mode == "zip":
-            # Zip mode: all three properties advance simultaneously.
-            # Each step increments color, linestyle, and marker together,
-            # wrapping each independently.
-            # Cycle length = lcm(n_colors, n_lines, n_markers).
-            start_idx = 1 if skip_no_marker else 0
-            n_markers = len(MARKERS) - start_idx
-            n = len(COLORS)
-            n = n * len(LINE_STYLES) // gcd(n, len(LINE_STYLES))
-            n = n * n_markers // gcd(n, n_markers)
-            for i in range(n):
-                marker_idx = start_idx + (i % n_markers)
-                colors.append(COLORS[i % len(COLORS)])
-                lines.append(LINE_STYLES[i % len(LINE_STYLES)])
-                markers.append(MARKERS[marker_idx])
-                fills.append(FILL_STYLES[marker_idx])
+            fig.set_tight_layout(True)
 
-        else:
-            # Default: use 16 unique combinations
-            # First 8: colors 1-8 with markers 0-7 (or 1-8 if skipping no marker)
-            # Next 8: colors 1-8 with markers 8-15 (or 9-16 if skipping no marker)
-            start_idx = 1 if skip_no_marker else 0
-            for i in range(16):
-                color_idx = i % 8
-                line_idx = i % len(LINE_STYLES)
-                marker_idx = (i + start_idx) % len(MARKERS)
-
-                colors.append(COLORS[color_idx])
-                lines.append(LINE_STYLES[line_idx])
-                markers.append(MARKERS[marker_idx])
-                fills.append(FILL_STYLES[marker_idx])
-
-        plt.rc(
-            "axes",
-            prop_cycle=cycler(
-                color=colors, linestyle=lines, marker=markers, fillstyle=fills
-            ),
-        )
 
+def _has_layout(fig: Any) -> bool:
+    """Return whether ``fig`` has a layout engine."""
+    if hasattr(fig, "get_layout_engine"):
+        return fig.get_layout_engine() is not None
+    return bool(fig.get_constrained_layout() or fig.get_tight_layout())
+
+
+def _has_tight_layout(fig: Any) -> bool:
+    """Return whether ``fig`` is laid out by tight_layout on every draw."""
+    if hasattr(fig, "get_layout_engine"):
+        from matplotlib.layout_engine import TightLayoutEngine
+
+        return isinstance(fig.get_layout_engine(), TightLayoutEngine)
+    return bool(fig.get_tight_layout())
+
+
+def _style_axes(ax: Any, params: Dict[str, Any]) -> None:
+    """Apply the axes-level rcParams in ``params`` to ``ax``."""
+    ax.set_facecolor(params["axes.facecolor"])
+    ax.set_axisbelow(params["axes.axisbelow"])
+    for spine in ax.spines.values():
+        spine.set_edgecolor(params["axes.edgecolor"])
+        spine.set_linewidth(params["axes.linewidth"])
+    if params["axes.grid"]:
+        ax.grid(
+            True,
+            which=params["axes.grid.which"],
+            axis=params["axes.grid.axis"],
+            color=params["grid.color"],
+            linestyle=params["grid.linestyle"],
+            linewidth=params["grid.linewidth"],
+            alpha=params["grid.alpha"],
+        )
     else:
-        raise ValueError(
-            f"Unknown style: {style}. Use 'c', 'l', 'm', 'cl', 'cm', or 'all'"
+        ax.grid(False)
+
+    for axis, sides in (("x", ("top", "bottom")), ("y", ("left", "right"))):
+        label = getattr(ax, f"{axis}axis").label
+        label.set_color(params["axes.labelcolor"])
+        label.set_fontsize(params["axes.labelsize"])
+
+        labelcolor = params[f"{axis}tick.labelcolor"]
+        if labelcolor == "inherit":
+            labelcolor = params[f"{axis}tick.color"]
+        for which in ("major", "minor"):
+            ax.tick_params(
+                axis=axis,
+                which=which,
+                direction=params[f"{axis}tick.direction"],
+                length=params[f"{axis}tick.{which}.size"],
+                width=params[f"{axis}tick.{which}.width"],
+                pad=params[f"{axis}tick.{which}.pad"],
+                color=params[f"{axis}tick.color"],
+                labelcolor=labelcolor,
+                labelsize=params[f"{axis}tick.labelsize"],
+            )
+        ax.tick_params(
+            axis=axis,
+            **{side: params[f"{axis}tick.{side}"] for side in sides},
+            **{f"label{side}": params[f"{axis}tick.label{side}"] for side in sides},
         )
+        if params[f"{axis}tick.minor.visible"]:
+            getattr(ax, f"{axis}axis").minorticks_on()
+
+
+def _style_mappables(ax: Any, cmap: str) -> None:
+    """Give the images and color-mapped collections of ``ax`` a colormap."""
+    for artist in [*ax.images, *ax.collections]:
+        if artist.get_array() is not None:
+            artist.set_cmap(cmap)
 
 
 def apply_pattern(
-    bars: Union[Any, List[Any]], pattern: int, color: str = "black"
-) -> None:
+    bars: Union[Any, List[Any]],
+    pattern: Any,
+    color: str = "black",
+    collection: bool = False,
+    **kwargs: Any,
+) -> Optional[List[Any]]:
     """Apply gnuplot-style pattern fills to existing bars.
 
+    By default every bar is restyled in place, one patch at a time. With
+    ``collection=True`` the bars are instead redrawn as one
+    `~matplotlib.collections.PolyCollection` per distinct pattern, as
+    :func:`pattern_bars` draws them, and the original patches are hidden,
+    so drawing costs time proportional to the number of patterns rather
+    than of bars.
+
     Parameters
     ----------
-    bars : BarContainer or list of patches
+    bars : BarContainer, list of BarContainers or list of patches
         The bars to apply patterns to
-    pattern : int
-        Pattern index (0-7) for gnuplot pattern fills
+    pattern : int or array-like of int
+        Pattern index (0-7) for gnuplot pattern fills, or one index per bar.
+        Bars with an index outside 0-7 are left unchanged.
     color : str, optional
         Color to use for solid fills (pattern 3), default is 'black'
-    """
-    if pattern is None or pattern < 0 or pattern >= len(PATTERNS):
-        return
+    collection : bool, optional
+        Whether to replace the bars by one collection per pattern instead
+        of restyling each patch (default: False). The bars must be
+        rectangles on an axes. The hidden patches no longer make a visible
+        legend entry; pass the returned collections as legend handles.
+    **kwargs
+        Passed on to each collection when ``collection`` is True
 
-    fillstyle = PATTERN_FILL_STYLES[pattern]
-    hatch = PATTERNS[pattern]
+    Returns
+    -------
+    list of PolyCollection or None
+        With ``collection=True``, one collection per distinct pattern in
+        increasing pattern order; otherwise None.
 
-    # Handle single bar or container
-    if hasattr(bars, "patches"):
-        patches = bars.patches
-    elif hasattr(bars, "__iter__"):
-        patches = bars
-    else:
-        patches = [bars]
+    Raises
+    ------
+    ValueError
+        If per-bar pattern indices do not match the number of bars, or
+        with ``collection=True``, if the bars are not on an axes.
+
+    See Also
+    --------
+    pattern_bars : Draw many patterned bars as one collection per pattern.
+    """
+    if pattern is None:
+        return [] if collection else None
+
+    patches = _flatten_patches(bars)
+    if np.ndim(pattern) and np.shape(pattern) != (len(patches),):
+        raise ValueError(
+            f"Got {np.size(pattern)} pattern indices for {len(patches)} bars"
+        )
+    indices = np.broadcast_to(np.asarray(pattern), (len(patches),))
+    valid = (indices >= 0) & (indices < len(PATTERNS))
 
-    for patch in patches:
-        if fillstyle == "none":
-            patch.set_facecolor("none")
-        else:  # fillstyle == 'full'
-            patch.set_facecolor(color)
+    if collection:
+        patches = [patch for patch, keep in zip(patches, valid.tolist()) if keep]
+        if not patches:
+            return []
+        ax = patches[0].axes
+        if ax is None:
+            raise ValueError("collection=True needs bars that are on an axes")
+        corners = np.array(
+            [(p.get_x(), p.get_y(), p.get_width(), p.get_height()) for p in patches]
+        ).reshape(-1, 4)
+        left, bottom, width, height = corners.T
+        for patch in patches:
+            patch.set_visible(False)
+        # The hidden bars keep the data limits and sticky edges of ax.bar
+        return _add_pattern_collections(
+            ax,
+            _rectangle_verts(left, bottom, left + width, bottom + height),
+            indices[valid],
+            color,
+            False,
+            **kwargs,
+        )
 
+    # Each bar is still restyled on its own; only the style lookup is shared
+    styles = [_pattern_style(index, color) for index in range(len(PATTERNS))]
+    for patch, index, keep in zip(patches, indices.tolist(), valid.tolist()):
+        if not keep:
+            continue
+        facecolor, hatch = styles[index]
+        patch.set_facecolor(facecolor)
         if hatch is not None:
             patch.set_hatch(hatch)
+    return None
+
+
+def pattern_bars(
+    ax: Any,
+    x: Any,
+    height: Any,
+    width: Any = 0.8,
+    bottom: Any = 0.0,
+    pattern: Any = 0,
+    color: str = "black",
+    align: str = "center",
+    **kwargs: Any,
+) -> List[Any]:
+    """Draw patterned bars as one PolyCollection per distinct pattern.
+
+    A vectorized counterpart of ``ax.bar`` followed by :func:`apply_pattern`:
+    no per-bar Rectangle is created, so building and drawing the bars costs
+    time proportional to the number of distinct patterns, not of bars.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to draw on
+    x, height, width, bottom : float or array-like
+        Bar geometry as in ``ax.bar``, broadcast against each other
+    pattern : int or array-like of int, optional
+        Pattern index (0-7), or one index per bar (default: 0)
+    color : str, optional
+        Edge and hatch color, and fill color of solid bars (default: 'black')
+    align : {'center', 'edge'}, optional
+        Alignment of the bars to the x coordinates (default: 'center')
+    **kwargs
+        Passed on to each `~matplotlib.collections.PolyCollection`
+
+    Returns
+    -------
+    list of PolyCollection
+        One collection per distinct pattern, in increasing pattern order.
+
+    Raises
+    ------
+    ValueError
+        If a pattern index is outside 0-7 or ``align`` is invalid.
+    """
+    x, height, width, bottom, pattern = np.broadcast_arrays(
+        np.asarray(x, dtype=float),
+        np.asarray(height, dtype=float),
+        np.asarray(width, dtype=float),
+        np.asarray(bottom, dtype=float),
+        np.asarray(pattern),
+    )
+    x, height, width, bottom, pattern = (
+        np.atleast_1d(a).ravel() for a in (x, height, width, bottom, pattern)
+    )
+    if pattern.size and (pattern.min() < 0 or pattern.max() >= len(PATTERNS)):
+        raise ValueError(f"Pattern indices must be in 0-{len(PATTERNS) - 1}")
+    if align == "center":
+        left = x - width / 2
+    elif align == "edge":
+        left = x
+    else:
+        raise ValueError(f"align must be 'center' or 'edge', got {align!r}")
+    verts = _rectangle_verts(left, bottom, left + width, bottom + height)
+    collections = _add_pattern_collections(ax, verts, pattern, color, True, **kwargs)
+    for collection in collections:
+        collection.sticky_edges.y.append(float(bottom.min()))
+    ax.autoscale_view()
+    return collections
+
+
+def _rectangle_verts(left: Any, bottom: Any, right: Any, top: Any) -> np.ndarray:
+    """Return (n, 4, 2) rectangle vertices, counter-clockwise from bottom left."""
+    return np.stack(
+        [
+            np.stack([left, bottom], axis=-1),
+            np.stack([right, bottom], axis=-1),
+            np.stack([right, top], axis=-1),
+            np.stack([left, top], axis=-1),
+        ],
+        axis=1,
+    )
+
+
+def _add_pattern_collections(
+    ax: Any,
+    verts: np.ndarray,
+    pattern: np.ndarray,
+    color: Any,
+    autolim: bool,
+    **kwargs: Any,
+) -> List[Any]:
+    """Add one PolyCollection per distinct pattern of the rectangles to ``ax``."""
+    from matplotlib.collections import PolyCollection
+
+    kwargs.setdefault("linewidths", mpl.rcParams["patch.linewidth"])
+    collections = []
+    for index in np.unique(pattern).tolist():
+        facecolor, hatch = _pattern_style(index, color)
+        collection = PolyCollection(
+            verts[pattern == index],
+            facecolors=facecolor,
+            edgecolors=color,
+            hatch=hatch,
+            **kwargs,
+        )
+        ax.add_collection(collection, autolim=autolim)
+        collections.append(collection)
+    return collections
+
+
+def histogram(
+    ax: Any,
+    table: Any,
+    mode: str = "clustered",
+    gap: float = 2.0,
+    patterns: Any = True,
+    color: str = "black",
+    boxwidth: float = 1.0,
+    labels: Optional[Sequence[str]] = None,
+    xticklabels: Optional[Sequence[str]] = None,
+    **kwargs: Any,
+) -> List[Any]:
+    """Draw a gnuplot ``set style histogram`` chart of a 2-D table.
+
+    Row ``i`` of the table is placed at ``x = i`` and column ``j`` is the
+    ``j``-th series, as in ``plot 'file' using 2, '' using 3, ...``. The
+    positions and stack baselines of all boxes are computed at once, then
+    each series is drawn by :func:`pattern_bars` as a single collection.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to draw on
+    table : array-like
+        Shape (rows, series) values; NaN is drawn as an empty box. A 1-d
+        array is a single series.
+    mode : {'clustered', 'rowstacked', 'columnstacked'}, optional
+        Layout (default: 'clustered'):
+        - 'clustered': the series of a row side by side around ``x = i``
+        - 'rowstacked': the series of a row stacked into one box at ``x = i``
+        - 'columnstacked': the rows of a series stacked into one box at
+          ``x = j``; the rows then take the patterns, colors and labels
+    gap : float, optional
+        Free space between neighbouring clusters or stacks, in box widths
+        (default: 2, gnuplot's default)
+    patterns : bool or sequence of int, optional
+        True gives series ``k`` pattern ``k % 8`` drawn in ``color``, False
+        a solid fill in ``COLORS[k % 8]``; a sequence gives one pattern
+        index per series (default: True)
+    color : str, optional
+        Edge and hatch color of patterned boxes (default: 'black')
+    boxwidth : float, optional
+        Fraction of its slot each box fills, like ``set boxwidth x
+        relative`` (default: 1)
+    labels : sequence of str, optional
+        One legend label per series
+    xticklabels : sequence of str, optional
+        Tick labels at the box positions, like ``xtic(1)``
+    **kwargs
+        Passed on to each `~matplotlib.collections.PolyCollection`
+
+    Returns
+    -------
+    list of PolyCollection
+        One collection per series, in series order.
+
+    Raises
+    ------
+    ValueError
+        If ``mode`` is unknown, ``gap`` is negative, or ``patterns``,
+        ``labels`` or ``xticklabels`` have the wrong length.
+
+    Examples
+    --------
+    >>> table = np.loadtxt("immigration.dat", usecols=(1, 2, 3))
+    >>> gp.histogram(ax, table, mode="rowstacked", labels=["A", "B", "C"])
+    >>> ax.legend()
+    """
+    if mode not in _HISTOGRAM_MODES:
+        raise ValueError(f"mode must be one of {', '.join(_HISTOGRAM_MODES)}")
+    if gap < 0:
+        raise ValueError(f"gap must not be negative, got {gap!r}")
+    values = np.asarray(table, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    if mode == "columnstacked":
+        values = values.T
+    values = np.nan_to_num(values)
+    n_boxes, n_series = values.shape
+
+    index = np.arange(n_boxes, dtype=float)[:, None]
+    if mode == "clustered":
+        slot = 1.0 / (n_series + gap)
+        x = index + (np.arange(n_series) - (n_series - 1) / 2) * slot
+        bottom = np.zeros_like(values)
+    else:
+        slot = 1.0 / (1.0 + gap)
+        x = np.broadcast_to(index, values.shape)
+        bottom = np.cumsum(values, axis=1) - values
+
+    if patterns is True:
+        fills = [(k % len(PATTERNS), color) for k in range(n_series)]
+    elif patterns is False:
+        fills = [(3, COLORS[k % len(COLORS)]) for k in range(n_series)]
+    else:
+        fills = [(int(p), color) for p in patterns]
+    for name, items in (("patterns", fills), ("labels", labels)):
+        if items is not None and len(items) != n_series:
+            raise ValueError(f"Got {len(items)} {name} for {n_series} series")
+    if xticklabels is not None and len(xticklabels) != n_boxes:
+        raise ValueError(f"Got {len(xticklabels)} xticklabels for {n_boxes} boxes")
+
+    collections = []
+    for k, (pattern, fill_color) in enumerate(fills):
+        drawn = pattern_bars(
+            ax,
+            x[:, k],
+            values[:, k],
+            width=slot * boxwidth,
+            bottom=bottom[:, k],
+            pattern=pattern,
+            color=fill_color,
+            **kwargs,
+        )
+        for collection in drawn:
+            if labels is not None:
+                collection.set_label(labels[k])
+        collections.extend(drawn)
+    if xticklabels is not None:
+        ax.set_xticks(index.ravel(), xticklabels)
+    return collections
+
+
+def _flatten_patches(bars: Any) -> List[Any]:
+    """Return the patches of a container, a list of containers or patches."""
+    if hasattr(bars, "patches"):
+        return list(bars.patches)
+    if not hasattr(bars, "__iter__"):
+        return [bars]
+    patches = []
+    for item in bars:
+        if hasattr(item, "patches"):
+            patches.extend(item.patches)
+        else:
+            patches.append(item)
+    return patches
+
+
+def _pattern_style(pattern: int, color: Any) -> Any:
+    """Return the (facecolor, hatch) pair of a gnuplot pattern index."""
+    if PATTERN_FILL_STYLES[pattern] == "none":
+        return "none", PATTERNS[pattern]
+    return color, PATTERNS[pattern]
@@ -0,0 +1,395 @@
+"""Lazy gnuplot style cycles computed from table indices."""
+
+import operator
+from functools import lru_cache
+from math import gcd
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from cycler import Cycler, cycler
+
+from . import constants
+from .constants import COLORS, FILL_STYLES, LINE_STYLES, MARKERS, STYLE_MAP
+
+# Component slots returned by GnuplotCycle.indices()
+_COLOR, _LINE, _MARKER = 0, 1, 2
+
+# (property, table, component) triples emitted by each style
+_FIELDS = {
+    "color": (("color", COLORS, _COLOR),),
+    "line": (("linestyle", LINE_STYLES, _LINE),),
+    "marker": (
+        ("marker", MARKERS, _MARKER),
+        ("fillstyle", FILL_STYLES, _MARKER),
+        ("linestyle", ("none",), None),
+    ),
+    "color+line": (
+        ("color", COLORS, _COLOR),
+        ("linestyle", LINE_STYLES, _LINE),
+    ),
+    "color+marker": (
+        ("color", COLORS, _COLOR),
+        ("marker", MARKERS, _MARKER),
+        ("fillstyle", FILL_STYLES, _MARKER),
+    ),
+    "all": (
+        ("color", COLORS, _COLOR),
+        ("linestyle", LINE_STYLES, _LINE),
+        ("marker", MARKERS, _MARKER),
+        ("fillstyle", FILL_STYLES, _MARKER),
+    ),
+}
+
+# Styles whose entries carry a marker, and so accept a markevery setting
+_MARKER_STYLES = frozenset({"marker", "color+marker", "all"})
+
+# Loop order (outermost to innermost) of the extended Cartesian products
+_EXTENDED_ORDER = {"color+line": "lc", "color+marker": "mc"}
+
+
+def _object_table(values: List[Any]) -> np.ndarray:
+    """Return ``values`` as a 1-d object array, keeping tuples as elements."""
+    table = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        table[i] = value
+    return table
+
+
+# Lookup tables for fancy-indexing with arrays of line and point types
+_LINE_STYLE_TABLE = _object_table(LINE_STYLES)
+_MARKER_TABLE = np.array(MARKERS)
+_FILL_STYLE_TABLE = np.array(FILL_STYLES)
+
+
+def linetype(idx: Any) -> Tuple[np.ndarray, Any]:
+    """Return the color and dash pattern of gnuplot line type(s).
+
+    Parameters
+    ----------
+    idx : int or array-like of int
+        Line type index. Colors wrap around over ``COLORS`` and dash
+        patterns over ``LINE_STYLES``, as in the style cycles.
+
+    Returns
+    -------
+    color : numpy.ndarray
+        RGBA row(s) of ``COLORS_RGBA``: shape (4,) for a scalar index,
+        ``idx.shape + (4,)`` for an array.
+    dashes : str, tuple or numpy.ndarray
+        The ``LINE_STYLES`` entry, or an object array of them.
+
+    Examples
+    --------
+    >>> color, dashes = gp.linetype(np.array([0, 1, 9]))
+    >>> color.shape
+    (3, 4)
+    >>> dashes[1]
+    (0, (4, 2))
+    """
+    idx = np.asarray(idx)
+    color = constants.COLORS_RGBA[idx % len(COLORS)]
+    if idx.ndim == 0:
+        return color, LINE_STYLES[int(idx) % len(LINE_STYLES)]
+    return color, _LINE_STYLE_TABLE[idx % len(LINE_STYLES)]
+
+
+def pointtype(idx: Any) -> Tuple[Any, Any]:
+    """Return the marker and fill style of gnuplot point type(s).
+
+    Parameters
+    ----------
+    idx : int or array-like of int
+        Point type index into ``MARKERS`` and ``FILL_STYLES``; wraps around.
+
+    Returns
+    -------
+    marker : str or numpy.ndarray
+        The ``MARKERS`` entry, or a string array of them.
+    fillstyle : str or numpy.ndarray
+        The ``FILL_STYLES`` entry, or a string array of them.
+
+    Examples
+    --------
+    >>> gp.pointtype(7)
+    ('o', 'none')
+    >>> gp.pointtype([6, 23])[0]
+    array(['s', 's'], dtype='<U1')
+    """
+    idx = np.asarray(idx)
+    if idx.ndim == 0:
+        i = int(idx) % len(MARKERS)
+        return MARKERS[i], FILL_STYLES[i]
+    idx = idx % len(MARKERS)
+    return _MARKER_TABLE[idx], _FILL_STYLE_TABLE[idx]
+
+
+def marker_style(idx: Any) -> Any:
+    """Return the shared, pre-built MarkerStyle of gnuplot point type(s).
+
+    The 17 point types are built once per process from ``MARKERS`` and
+    ``FILL_STYLES``. Passing one as ``marker=`` to ``ax.plot`` or ``Line2D``
+    uses it as is, where a marker string builds a new MarkerStyle for every
+    line; its fill style is part of it, so no ``fillstyle`` is needed.
+
+    Parameters
+    ----------
+    idx : int or array-like of int
+        Point type index into ``MARKERS`` and ``FILL_STYLES``; wraps around.
+
+    Returns
+    -------
+    MarkerStyle or numpy.ndarray
+        The shared MarkerStyle, or an object array of them. They are shared
+        by every caller, so treat them as read-only.
+
+    Examples
+    --------
+    >>> for i, y in enumerate(series):
+    ...     ax.plot(x, y, marker=gp.marker_style(i), linestyle="none")
+    """
+    styles = _marker_styles()
+    idx = np.asarray(idx)
+    if idx.ndim == 0:
+        return styles[int(idx) % len(MARKERS)]
+    return styles[idx % len(MARKERS)]
+
+
+@lru_cache(maxsize=None)
+def _marker_styles() -> np.ndarray:
+    """Build the MarkerStyle of every point type, as a read-only object array."""
+    from matplotlib.markers import MarkerStyle
+
+    styles = _object_table([MarkerStyle(m, f) for m, f in zip(MARKERS, FILL_STYLES)])
+    styles.setflags(write=False)
+    return styles
+
+
+@lru_cache(maxsize=None)
+def _shared_markers() -> Dict[Tuple[str, str], Any]:
+    """Map each (marker, fillstyle) pair of the point types to its MarkerStyle."""
+    return {
+        (m, f): style for m, f, style in zip(MARKERS, FILL_STYLES, _marker_styles())
+    }
+
+
+def _shared_marker(marker: Any, fillstyle: str) -> Any:
+    """Return the shared MarkerStyle of a point type's marker, or ``marker``."""
+    try:
+        return _shared_markers().get((marker, fillstyle), marker)
+    except TypeError:
+        # Unhashable markers such as vertex arrays are never point types
+        return marker
+
+
+class GnuplotCycle(Cycler):
+    """Gnuplot prop_cycle whose entries are computed on demand.
+
+    Every entry is a pure function of its index over ``COLORS``,
+    ``LINE_STYLES``, ``MARKERS`` and ``FILL_STYLES``, so the cycle stores
+    only its configuration and never materializes the style lists. It is a
+    `cycler.Cycler`, so it can be passed to ``Axes.set_prop_cycle`` or
+    stored in ``rcParams['axes.prop_cycle']``.
+
+    Parameters
+    ----------
+    style : str, optional
+        Style name or shorthand, as accepted by :func:`gnuplot_style.use`.
+    cycle_mode : str, optional
+        'default', 'extended' or 'zip', as accepted by
+        :func:`gnuplot_style.use`.
+    skip_no_marker : bool, optional
+        Whether to skip marker index 0 (no symbol).
+    loop_order : str, optional
+        Loop order for extended 'all' mode, outermost to innermost.
+    markevery : int, optional
+        ``markevery`` value added to every entry of the styles with markers,
+        e.g. from the ``pointinterval`` option of :func:`gnuplot_style.use`.
+        Ignored by styles without markers.
+
+    Raises
+    ------
+    ValueError
+        If an unknown style or an invalid loop_order is provided.
+
+    Examples
+    --------
+    >>> cycle = GnuplotCycle("all", cycle_mode="extended")
+    >>> len(cycle)
+    1224
+    >>> cycle[1000]["marker"]
+    'D'
+    """
+
+    # Plain cyclers keep these per instance; a GnuplotCycle never composes
+    _right = None
+    _op = None
+
+    def __init__(
+        self,
+        style: str = "color",
+        cycle_mode: str = "default",
+        skip_no_marker: bool = False,
+        loop_order: str = "mlc",
+        markevery: Optional[int] = None,
+    ) -> None:
+        style = STYLE_MAP.get(style, style)
+        if style not in _FIELDS:
+            raise ValueError(
+                f"Unknown style: {style}. Use 'c', 'l', 'm', 'cl', 'cm', or 'all'"
+            )
+        start = 1 if skip_no_marker else 0
+        sizes = {"c": len(COLORS), "l": len(LINE_STYLES), "m": len(MARKERS) - start}
+
+        order = ""
+        if cycle_mode == "extended" and style == "all":
+            if set(loop_order) != {"c", "l", "m"} or len(loop_order) != 3:
+                raise ValueError(
+                    f"loop_order must be a permutation of 'c', 'l', 'm', "
+                    f"got '{loop_order}'"
+                )
+            order = loop_order
+        elif cycle_mode == "extended":
+            order = _EXTENDED_ORDER.get(style, "")
+
+        if order:
+            # Cartesian product: mixed-radix digits, innermost varies fastest
+            length = 1
+            for key in order:
+                length *= sizes[key]
+        elif cycle_mode == "zip" and style == "all":
+            # All components advance together; the cycle closes at their lcm
+            length = 1
+            for size in sizes.values():
+                length = length * size // gcd(length, size)
+        elif style == "all":
+            length = 16
+        elif style == "line":
+            length = sizes["l"]
+        elif style == "marker":
+            length = sizes["m"]
+        else:
+            length = len(COLORS)
+
+        self._style = style
+        self._cycle_mode = cycle_mode
+        self._loop_order = loop_order
+        self._start = start
+        self._radix = tuple((key, sizes[key]) for key in reversed(order))
+        self._zip = cycle_mode == "zip" and style == "all"
+        self._length = length
+        self._fields = _FIELDS[style]
+        if markevery is not None and style in _MARKER_STYLES:
+            self._fields += (("markevery", (markevery,), None),)
+
+    @property
+    def _keys(self) -> FrozenSet[str]:  # type: ignore[override]
+        return frozenset(field[0] for field in self._fields)
+
+    @property
+    def _left(self) -> List[Dict[str, Any]]:  # type: ignore[override]
+        # Only reached when composing with another cycler, which needs a copy
+        return list(self)
+
+    @property
+    def style(self) -> str:
+        """Normalized style name."""
+        return self._style
+
+    def indices(self, index: Any) -> Tuple[Any, Any, Any]:
+        """Return the (color, line, marker) table indices of an entry.
+
+        Parameters
+        ----------
+        index : int or numpy.ndarray
+            Non-negative position(s) in the cycle.
+
+        Returns
+        -------
+        tuple
+            Indices into ``COLORS``, ``LINE_STYLES`` and ``MARKERS`` (and
+            ``FILL_STYLES``), with the same shape as ``index``.
+        """
+        start = self._start
+        if self._radix:
+            digits = {"c": 0, "l": 0, "m": 0}
+            for key, size in self._radix:
+                digits[key] = index % size
+                index = index // size
+            return digits["c"], digits["l"], start + digits["m"]
+        if self._zip:
+            n_markers = len(MARKERS) - start
+            return (
+                index % len(COLORS),
+                index % len(LINE_STYLES),
+                start + index % n_markers,
+            )
+        return (
+            index % len(COLORS),
+            index % len(LINE_STYLES),
+            (index + start) % len(MARKERS),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of entries in the cycle."""
+        return self._length
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:  # type: ignore[override]
+        """Return one entry as a dict, or a slice as a plain `cycler.Cycler`."""
+        if isinstance(key, slice):
+            positions = range(self._length)[key]
+            return cycler(**self._columns(np.asarray(positions, dtype=int)))
+        index = operator.index(key)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("GnuplotCycle index out of range")
+        components = self.indices(index)
+        return {
+            prop: table[0 if component is None else components[component]]
+            for prop, table, component in self._fields
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yield the entries in order, computing each on demand."""
+        for index in range(self._length):
+            yield self[index]
+
+    def by_key(self) -> Dict[str, List[Any]]:
+        """Return the values of each property as lists."""
+        return self._columns(np.arange(self._length))
+
+    def _columns(self, positions: np.ndarray) -> Dict[str, List[Any]]:
+        components = self.indices(positions)
+        columns = {}
+        for prop, table, component in self._fields:
+            if component is None:
+                columns[prop] = [table[0]] * len(positions)
+            else:
+                picks = np.broadcast_to(components[component], positions.shape)
+                columns[prop] = [table[i] for i in picks.tolist()]
+        return columns
+
+    def change_key(self, old: str, new: str) -> None:
+        """Rename a property; only identity renames are supported."""
+        if old != new:
+            raise ValueError("GnuplotCycle properties cannot be renamed")
+
+    def __iadd__(self, other: Cycler) -> Cycler:  # type: ignore[override]
+        """Return ``self + other``; instances are shared, so never in place."""
+        return self + other
+
+    def __imul__(self, other: Any) -> Cycler:  # type: ignore[override]
+        """Return ``self * other``; instances are shared, so never in place."""
+        return self * other
+
+    def __repr__(self) -> str:
+        """Return the constructor call that rebuilds this cycle."""
+        markevery = ""
+        if self._fields[-1][0] == "markevery":
+            markevery = f", markevery={self._fields[-1][1][0]!r}"
+        return (
+            f"GnuplotCycle(style={self._style!r}, "
+            f"cycle_mode={self._cycle_mode!r}, "
+            f"skip_no_marker={bool(self._start)!r}, "
+            f"loop_order={self._loop_order!r}{markevery})"
+        )
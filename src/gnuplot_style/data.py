@@ -0,0 +1,756 @@
+"""Readers for gnuplot data files."""
+
+import io
+import mmap
+import operator
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Bytes scanned per vectorized pass when indexing, bounding the temporaries
+_INDEX_CHUNK = 1 << 22
+
+# Upper bound on the number of block indexes kept in memory
+_INDEX_CACHE_SIZE = 64
+
+# Suffix of the block index written next to a data file with cache='file'
+_INDEX_SUFFIX = ".gpindex.npz"
+
+_CACHE_MODES = ("none", "memory", "file")
+
+_NEWLINE, _COMMENT = ord("\n"), ord("#")
+_SPACE, _TAB, _RETURN = ord(" "), ord("\t"), ord("\r")
+
+# Leading blanks skipped a byte at a time before searching for the first field
+_MAX_INDENT = 16
+
+# Number of fields of gnuplot's 'index m:n:p' and 'every' selectors
+_INDEX_FIELDS = 3
+_EVERY_FIELDS = 6
+
+# gnuplot binary field types -> numpy type codes
+_BINARY_TYPES = {
+    "char": "i1",
+    "schar": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "long": "i8",
+    "int64": "i8",
+    "ulong": "u8",
+    "uint64": "u8",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+# One field of a binary format: '%float64', '%3double' (three columns) or
+# '%*int' (skipped)
+_BINARY_FIELD = re.compile(r"%(\*)?(\d*)([a-z]+\d*)")
+
+_ENDIAN = {"default": "=", "little": "<", "big": ">", "swap": None}
+
+# Records per chunk yielded by BinaryFile.chunks()
+_BINARY_CHUNK = 1 << 20
+
+Spec = Union[None, int, str, Sequence[Optional[int]]]
+
+
+class _BlockIndex(NamedTuple):
+    """Byte range, number of data lines and dataset number of every block."""
+
+    start: np.ndarray
+    stop: np.ndarray
+    rows: np.ndarray
+    dataset: np.ndarray
+
+
+class DataFile:
+    """A memory-mapped gnuplot data file with a block/dataset index.
+
+    Data lines hold whitespace-separated numbers; lines starting with ``#``
+    are comments. As in gnuplot, a single blank line ends a block and two
+    or more end a dataset. The file is scanned once to record the byte
+    range of every block, and :meth:`read` then parses only the blocks
+    selected by gnuplot's ``index`` and ``every``.
+
+    Parameters
+    ----------
+    path : str or path-like
+        The data file
+    cache : str, optional
+        Where to keep the block index (default: 'memory'):
+        - 'memory': in a per-process LRU cache keyed on the file's path,
+          size and modification time
+        - 'file': also in ``path + '.gpindex.npz'``, reused by later
+          processes while the data file is unchanged
+        - 'none': rescan the file every time
+
+    Raises
+    ------
+    ValueError
+        If an unknown cache mode is provided.
+
+    Examples
+    --------
+    >>> with DataFile("run.dat", cache="file") as data:
+    ...     data.n_datasets
+    ...     x, y = data.read(index=2, every="10", using="1:3")
+    3
+    """
+
+    def __init__(self, path: Any, cache: str = "memory") -> None:
+        if cache not in _CACHE_MODES:
+            raise ValueError(
+                f"Unknown cache mode: {cache}. Use 'none', 'memory' or 'file'"
+            )
+        self.path = os.fspath(path)
+        stat = os.stat(self.path)
+        with open(self.path, "rb") as f:
+            # mmap cannot map an empty file
+            self._buf = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if stat.st_size
+                else b""
+            )
+        if cache == "none":
+            self._index = _scan(self._buf)
+        else:
+            self._index = _cached_index(
+                os.path.realpath(self.path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                cache == "file",
+            )
+
+    @property
+    def n_datasets(self) -> int:
+        """Number of datasets (``index`` values) in the file."""
+        dataset = self._index.dataset
+        return int(dataset[-1]) + 1 if dataset.size else 0
+
+    def n_blocks(self, index: int) -> int:
+        """Return the number of blocks in dataset ``index``."""
+        first, last = self._blocks_of(index)
+        return last - first
+
+    def read(
+        self,
+        index: Spec = None,
+        every: Spec = None,
+        using: Union[None, str, Sequence[int]] = None,
+        gaps: bool = False,
+    ) -> Tuple[np.ndarray, ...]:
+        """Return the selected columns as float arrays.
+
+        Parameters
+        ----------
+        index : int, str or sequence, optional
+            Datasets to read, as gnuplot's ``index m:n:p``: an int, a string
+            such as ``'1:5:2'`` or a ``(m, n, p)`` tuple. ``n`` is inclusive
+            and empty fields or None take their defaults (default: all)
+        every : int, str or sequence, optional
+            Points and blocks to read, as gnuplot's ``every
+            point_incr:block_incr:start_point:start_block:end_point:end_block``,
+            as a string such as ``'10::5'`` or a tuple; blocks are counted
+            within each dataset (default: everything)
+        using : str or sequence of int, optional
+            Columns to return, as gnuplot's ``using 1:2``: a string or a
+            tuple of 1-based column numbers. The pseudo-columns 0, -1 and
+            -2 are the point number within the dataset, the block number
+            within the dataset and the dataset number (default: all columns
+            of the file)
+        gaps : bool, optional
+            Insert a NaN row between consecutive blocks, so a line plot
+            breaks there as in gnuplot (default: False)
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            One 1-d array per column.
+
+        Raises
+        ------
+        ValueError
+            If a selector cannot be parsed, or the selected lines do not
+            hold the requested columns.
+        """
+        fields = _parse_spec(every, _EVERY_FIELDS, "every")
+        fields += [None] * (_EVERY_FIELDS - len(fields))
+        point_incr, block_incr, start_point, start_block, end_point, end_block = fields
+        fields = _parse_spec(index, _INDEX_FIELDS, "index")
+        if len(fields) == 1:
+            # 'index m' selects dataset m alone
+            fields.append(fields[0])
+        fields += [None] * (_INDEX_FIELDS - len(fields))
+        first_set, last_set, set_incr = fields
+        datasets = range(self.n_datasets)[_inclusive(first_set, last_set, set_incr)]
+        points = _inclusive(start_point, end_point, point_incr)
+        block_slice = _inclusive(start_block, end_block, block_incr)
+        columns = _parse_using(using)
+
+        pieces = []
+        for dataset in datasets:
+            first, last = self._blocks_of(dataset)
+            blocks = range(first, last)[block_slice]
+            if points == slice(None) and blocks.step == 1:
+                # Consecutive whole blocks are parsed with a single call
+                if blocks:
+                    pieces.append(self._read_run(dataset, first, blocks, columns, gaps))
+                continue
+            for block in blocks:
+                pieces.append(self._read_block(dataset, first, block, points, columns))
+
+        pieces = [piece for piece in pieces if len(piece)]
+        if not pieces:
+            n_columns = self._n_columns() if columns is None else len(columns)
+            return tuple(np.empty((n_columns, 0)))
+        if gaps:
+            gap = np.full((1, pieces[0].shape[1]), np.nan)
+            pieces = [row for piece in pieces for row in (piece, gap)][:-1]
+        return tuple(np.concatenate(pieces).T)
+
+    def _blocks_of(self, dataset: int) -> Tuple[int, int]:
+        """Return the first and one-past-last block number of a dataset."""
+        sets = self._index.dataset
+        return (
+            int(np.searchsorted(sets, dataset, "left")),
+            int(np.searchsorted(sets, dataset, "right")),
+        )
+
+    def _n_columns(self) -> int:
+        """Return the number of columns of the first block."""
+        if not self._index.start.size:
+            return 0
+        return self._parse(0, 1, None).shape[1]
+
+    def _parse(self, first: int, last: int, usecols: Any) -> np.ndarray:
+        """Parse blocks ``first`` to ``last - 1``, which are contiguous."""
+        start, stop = int(self._index.start[first]), int(self._index.stop[last - 1])
+        text = io.StringIO(self._buf[start:stop].decode("latin-1"))
+        return np.loadtxt(text, comments="#", usecols=usecols, ndmin=2)
+
+    @staticmethod
+    def _columns(
+        table: Optional[np.ndarray],
+        columns: Optional[List[int]],
+        point: np.ndarray,
+        block: np.ndarray,
+        dataset: int,
+    ) -> np.ndarray:
+        """Arrange parsed file columns and pseudo-columns in ``using`` order."""
+        if columns is None:
+            return table
+        file_columns = sorted({c for c in columns if c > 0})
+        out = np.empty((len(point), len(columns)))
+        for i, column in enumerate(columns):
+            if column > 0:
+                out[:, i] = table[:, file_columns.index(column)]
+            elif column == 0:
+                out[:, i] = point
+            elif column == -1:
+                out[:, i] = block
+            else:
+                out[:, i] = dataset
+        return out
+
+    def _load(
+        self, first: int, last: int, columns: Optional[List[int]]
+    ) -> Optional[np.ndarray]:
+        """Parse the file columns ``columns`` needs from a run of blocks."""
+        if columns is None:
+            return self._parse(first, last, None)
+        file_columns = sorted({c - 1 for c in columns if c > 0})
+        if not file_columns:
+            # Only pseudo-columns: the index already knows the row counts
+            return None
+        return self._parse(first, last, file_columns)
+
+    def _read_run(
+        self,
+        dataset: int,
+        first: int,
+        blocks: range,
+        columns: Optional[List[int]],
+        gaps: bool,
+    ) -> np.ndarray:
+        """Read whole consecutive blocks of one dataset."""
+        rows = self._index.rows[blocks.start : blocks.stop]
+        offset = int(self._index.rows[first : blocks.start].sum())
+        table = self._load(blocks.start, blocks.stop, columns)
+        point = offset + np.arange(int(rows.sum()))
+        block = np.repeat(np.arange(blocks.start - first, blocks.stop - first), rows)
+        out = self._columns(table, columns, point, block, dataset)
+        if gaps:
+            out = np.insert(out, np.cumsum(rows)[:-1], np.nan, axis=0)
+        return out
+
+    def _read_block(
+        self,
+        dataset: int,
+        first: int,
+        block: int,
+        points: slice,
+        columns: Optional[List[int]],
+    ) -> np.ndarray:
+        """Read the selected points of one block."""
+        rows = int(self._index.rows[block])
+        table = self._load(block, block + 1, columns)
+        offset = int(self._index.rows[first:block].sum())
+        selected = np.arange(rows)[points]
+        if table is not None:
+            table = table[points]
+        return self._columns(
+            table,
+            columns,
+            offset + selected,
+            np.full(len(selected), block - first),
+            dataset,
+        )
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self) -> "DataFile":
+        """Return the file itself."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Unmap the file."""
+        self.close()
+
+
+def load_data(
+    path: Any,
+    index: Spec = None,
+    every: Spec = None,
+    using: Union[None, str, Sequence[int]] = None,
+    gaps: bool = False,
+    cache: str = "memory",
+) -> Tuple[np.ndarray, ...]:
+    """Read columns of a gnuplot data file, like ``plot 'file' index every using``.
+
+    Shorthand for ``DataFile(path, cache).read(index, every, using, gaps)``;
+    see :class:`DataFile` for the selectors and the index cache.
+
+    Examples
+    --------
+    >>> x, y = load_data("run.dat", index=1, using="1:2")
+    >>> ax.plot(x, y)
+    """
+    with DataFile(path, cache=cache) as data:
+        return data.read(index=index, every=every, using=using, gaps=gaps)
+
+
+class BinaryFile:
+    """A gnuplot binary data file as a zero-copy structured memmap.
+
+    Takes the keywords of gnuplot's ``binary`` modifier. Every record holds
+    one value per field of ``format``; the columns are views into the
+    mapped file, so only the pages that are actually used get read.
+
+    Parameters
+    ----------
+    path : str or path-like
+        The data file
+    format : str, optional
+        Record layout as in gnuplot, e.g. ``'%float64%3float32'``: one
+        ``%type`` per column with an optional repeat count, and ``%*type``
+        for a field that is skipped (default: ``'%float'``, gnuplot's)
+    record : int, optional
+        Number of records; by default, as many as the file holds
+    array : tuple of int, optional
+        Grid shape ``(nx, ny)`` of an image-like file, x varying fastest;
+        the columns are then returned with shape ``(ny, nx)``. Mutually
+        exclusive with ``record``.
+    skip : int, optional
+        Bytes of header to skip at the start of the file (default: 0)
+    endian : str, optional
+        'default' (native), 'little', 'big' or 'swap' (default: 'default')
+
+    Raises
+    ------
+    ValueError
+        If the format, endianness, layout or ``skip`` is invalid, or the
+        file is too short for it.
+
+    Examples
+    --------
+    >>> data = BinaryFile("sim.bin", format="%float64%float64%*int32")
+    >>> t, v = data.columns()
+    >>> gp.plot(ax, t, v)
+    >>> peak = max(v.max() for t, v in data.chunks())
+    """
+
+    def __init__(
+        self,
+        path: Any,
+        format: str = "%float",
+        record: Optional[int] = None,
+        array: Optional[Sequence[int]] = None,
+        skip: int = 0,
+        endian: str = "default",
+    ) -> None:
+        if record is not None and array is not None:
+            raise ValueError("record and array are mutually exclusive")
+        self.path = os.fspath(path)
+        self.dtype = _binary_dtype(format, endian)
+        self.shape = None if array is None else tuple(int(n) for n in array)
+
+        size = os.path.getsize(self.path)
+        if not 0 <= skip <= size:
+            raise ValueError(
+                f"skip={skip} lies outside {self.path}, which holds {size} bytes"
+            )
+        available = (size - skip) // self.dtype.itemsize
+        if array is not None:
+            record = int(np.prod(self.shape))
+        if record is None:
+            record = available
+        if record > available:
+            raise ValueError(
+                f"{self.path} holds {available} records of "
+                f"{self.dtype.itemsize} bytes after skip={skip}, not {record}"
+            )
+        # mmap cannot map an empty range
+        self.records = (
+            np.memmap(self.path, self.dtype, "r", offset=skip, shape=(record,))
+            if record
+            else np.zeros(0, self.dtype)
+        )
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self.records)
+
+    def columns(
+        self, using: Union[None, str, Sequence[int]] = None
+    ) -> Tuple[np.ndarray, ...]:
+        """Return the columns as views into the file.
+
+        Parameters
+        ----------
+        using : str or sequence of int, optional
+            1-based column numbers, as gnuplot's ``using 1:2``; skipped
+            fields are not counted. Column 0 is the record number
+            (default: all columns)
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            One array per column, of shape ``(n,)`` or, for an ``array``
+            layout, ``(ny, nx)``.
+        """
+        out = self._select(self.records, using)
+        if self.shape is not None:
+            out = tuple(column.reshape(self.shape[::-1]) for column in out)
+        return out
+
+    def chunks(
+        self,
+        size: int = _BINARY_CHUNK,
+        using: Union[None, str, Sequence[int]] = None,
+    ) -> Iterator[Tuple[np.ndarray, ...]]:
+        """Yield the columns ``size`` records at a time.
+
+        Each chunk is a view into the file, so files larger than memory
+        can be reduced or plotted piece by piece. An ``array`` layout is
+        iterated as flat records.
+
+        Yields
+        ------
+        tuple of numpy.ndarray
+            The columns of the next ``size`` records, selected by ``using``
+            as in :meth:`columns`.
+        """
+        for start in range(0, len(self.records), size):
+            yield self._select(self.records[start : start + size], using, start)
+
+    def _select(
+        self,
+        records: np.ndarray,
+        using: Union[None, str, Sequence[int]],
+        start: int = 0,
+    ) -> Tuple[np.ndarray, ...]:
+        """Return the ``using`` columns of a run of records."""
+        names = self.dtype.names
+        columns = _parse_using(using)
+        if columns is None:
+            columns = list(range(1, len(names) + 1))
+        if min(columns) < 0 or max(columns) > len(names):
+            raise ValueError(
+                f"Invalid using selector: {using!r} for {len(names)} columns"
+            )
+        return tuple(
+            records[names[c - 1]] if c else np.arange(start, start + len(records))
+            for c in columns
+        )
+
+
+def load_binary(
+    path: Any,
+    format: str = "%float",
+    record: Optional[int] = None,
+    array: Optional[Sequence[int]] = None,
+    skip: int = 0,
+    endian: str = "default",
+    using: Union[None, str, Sequence[int]] = None,
+) -> Tuple[np.ndarray, ...]:
+    """Map columns of a gnuplot binary file, like ``plot 'file' binary ...``.
+
+    Shorthand for ``BinaryFile(path, format, record, array, skip,
+    endian).columns(using)``; see :class:`BinaryFile`. The columns are
+    zero-copy views into the file.
+
+    Examples
+    --------
+    >>> x, y = load_binary("sim.bin", format="%float64%float64")
+    >>> z = load_binary("field.bin", array=(512, 256))[0]  # shape (256, 512)
+    """
+    data = BinaryFile(path, format, record, array, skip, endian)
+    return data.columns(using)
+
+
+def _scan(buf: Any) -> _BlockIndex:
+    """Index the blocks of a data file held in a bytes-like buffer.
+
+    Lines are classified as data, blank or comment in vectorized passes over
+    chunks of the buffer; comment lines are skipped, consecutive data lines
+    form a block and runs of two or more blank lines start a new dataset.
+    """
+    runs = []
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        stop = min(pos + _INDEX_CHUNK, size)
+        if stop < size:
+            # End the chunk on a line boundary
+            newline = buf.rfind(b"\n", pos, stop)
+            if newline < 0:
+                newline = buf.find(b"\n", stop)
+            stop = size if newline < 0 else newline + 1
+        runs.append(_scan_chunk(np.frombuffer(buf, np.uint8, stop - pos, pos), pos))
+        pos = stop
+
+    if not size:
+        runs.append((np.zeros(0, dtype=bool),) + (np.zeros(0, dtype=np.int64),) * 3)
+    is_data, start, stop, count = (np.concatenate(column) for column in zip(*runs))
+    if not is_data.any():
+        empty = np.zeros(0, dtype=np.int64)
+        return _BlockIndex(empty, empty, empty, empty)
+
+    # Runs of the same kind split across chunks are merged
+    first = np.flatnonzero(np.r_[True, is_data[1:] != is_data[:-1]])
+    last = np.r_[first[1:], len(is_data)] - 1
+    is_data, start, stop = is_data[first], start[first], stop[last]
+    count = np.add.reduceat(count, first)
+
+    blocks = np.flatnonzero(is_data)
+    # A block preceded by two or more blank lines opens a new dataset
+    new_set = (blocks > 0) & (count[np.maximum(blocks - 1, 0)] >= 2)
+    new_set[:1] = False
+    return _BlockIndex(start[blocks], stop[blocks], count[blocks], np.cumsum(new_set))
+
+
+def _scan_chunk(chunk: np.ndarray, offset: int) -> Tuple[np.ndarray, ...]:
+    """Return the data/blank line runs of a chunk that ends on a line boundary.
+
+    Each run is described by whether it holds data lines, its byte range in
+    the file and its number of lines.
+    """
+    ends = np.flatnonzero(chunk == _NEWLINE)
+    if not ends.size or ends[-1] != len(chunk) - 1:
+        # The last line of the file may lack a newline
+        ends = np.append(ends, len(chunk))
+    starts = np.r_[0, ends[:-1] + 1]
+
+    # First non-blank byte of every line. Data lines usually start with
+    # their first field; indented lines are advanced over their leading
+    # blanks one byte per pass, all together
+    first_at = starts.copy()
+    pending = np.flatnonzero(starts < ends)
+    for _ in range(_MAX_INDENT):
+        pending = pending[_is_blank(chunk[first_at[pending]])]
+        if not pending.size:
+            break
+        first_at[pending] += 1
+        pending = pending[first_at[pending] < ends[pending]]
+    if pending.size:
+        # Deeper indentation: jump to the next non-blank byte directly
+        text_at = np.append(np.flatnonzero(~_is_blank(chunk)), len(chunk))
+        first_at[pending] = text_at[np.searchsorted(text_at, first_at[pending])]
+    has_text = first_at < ends
+    comment = np.zeros_like(has_text)
+    comment[has_text] = chunk[first_at[has_text]] == _COMMENT
+
+    keep = ~comment
+    is_data, starts, ends = has_text[keep], starts[keep], ends[keep]
+    if not is_data.size:
+        return (is_data,) + (np.zeros(0, dtype=np.int64),) * 3
+    run_first = np.flatnonzero(np.r_[True, is_data[1:] != is_data[:-1]])
+    run_last = np.r_[run_first[1:], len(is_data)] - 1
+    return (
+        is_data[run_first],
+        offset + starts[run_first],
+        offset + ends[run_last] + 1,
+        np.diff(np.r_[run_first, len(is_data)]),
+    )
+
+
+def _is_blank(chars: np.ndarray) -> np.ndarray:
+    """Return which bytes are spaces, tabs or carriage returns."""
+    return (chars == _SPACE) | (chars == _TAB) | (chars == _RETURN)
+
+
+@lru_cache(maxsize=_INDEX_CACHE_SIZE)
+def _cached_index(path: str, size: int, mtime_ns: int, persist: bool) -> _BlockIndex:
+    """Return the block index of a file, memoized on its path, size and mtime.
+
+    With ``persist``, the index is also read from and written to a file next
+    to the data file; a stale or unwritable index file is ignored.
+    """
+    index_path = path + _INDEX_SUFFIX
+    if persist:
+        try:
+            with np.load(index_path) as saved:
+                if tuple(saved["source"]) == (size, mtime_ns):
+                    return _freeze(
+                        _BlockIndex(*(saved[f] for f in _BlockIndex._fields))
+                    )
+        except (OSError, KeyError, ValueError):
+            pass
+
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    try:
+        index = _freeze(_scan(buf))
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+    if persist:
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, source=np.array([size, mtime_ns]), **index._asdict())
+            os.replace(tmp_path, index_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return index
+
+
+def _freeze(index: _BlockIndex) -> _BlockIndex:
+    """Make the arrays of a shared index read-only."""
+    for array in index:
+        array.setflags(write=False)
+    return index
+
+
+def _parse_spec(spec: Spec, n_fields: int, name: str) -> List[Optional[int]]:
+    """Split a gnuplot ``a:b:c`` selector into at most ``n_fields`` values.
+
+    Empty fields are None; missing trailing fields are left out.
+    """
+    if spec is None:
+        return []
+    if isinstance(spec, str):
+        fields: List[Any] = [field.strip() or None for field in spec.split(":")]
+    elif isinstance(spec, (int, np.integer)):
+        fields = [spec]
+    else:
+        fields = list(spec)
+    try:
+        if len(fields) > n_fields:
+            raise ValueError
+        values = [None if field is None else _non_negative(field) for field in fields]
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name} selector: {spec!r}") from None
+    return values
+
+
+def _non_negative(value: Any) -> int:
+    """Return a selector field as an int, rejecting negative values."""
+    value = int(value) if isinstance(value, str) else operator.index(value)
+    if value < 0:
+        raise ValueError
+    return value
+
+
+def _inclusive(start: Optional[int], end: Optional[int], step: Optional[int]) -> slice:
+    """Return the slice of a gnuplot ``start:end:step`` range with inclusive end."""
+    if step == 0:
+        raise ValueError("Selector increments must be positive")
+    return slice(start, None if end is None else end + 1, step)
+
+
+def _parse_using(using: Union[None, str, Sequence[int]]) -> Optional[List[int]]:
+    """Return the column numbers of a gnuplot ``using`` selector."""
+    if using is None:
+        return None
+    fields = using.split(":") if isinstance(using, str) else list(using)
+    try:
+        columns = [
+            int(field) if isinstance(field, str) else operator.index(field)
+            for field in fields
+        ]
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"Invalid using selector: {using!r}; only column numbers are supported"
+        ) from None
+    if not columns or min(columns) < -2:
+        raise ValueError(f"Invalid using selector: {using!r}")
+    return columns
+
+
+def _binary_dtype(format: str, endian: str) -> np.dtype:
+    """Return the structured record dtype of a gnuplot binary format.
+
+    Columns are named '1', '2', ... as gnuplot numbers them; skipped fields
+    only take up space in the record.
+    """
+    if endian not in _ENDIAN:
+        raise ValueError(
+            f"Unknown endian: {endian}. Use 'default', 'little', 'big' or 'swap'"
+        )
+    order = _ENDIAN[endian]
+    if order is None:
+        order = ">" if sys.byteorder == "little" else "<"
+
+    fields = _BINARY_FIELD.findall(format)
+    if "".join(_BINARY_FIELD.sub("", format).split()) or not fields:
+        raise ValueError(f"Invalid binary format: {format!r}")
+    names: List[str] = []
+    formats: List[str] = []
+    offsets: List[int] = []
+    offset = 0
+    for skipped, count, kind in fields:
+        if kind not in _BINARY_TYPES:
+            raise ValueError(f"Unknown binary type %{kind} in format {format!r}")
+        code = order + _BINARY_TYPES[kind]
+        for _ in range(int(count or 1)):
+            if not skipped:
+                names.append(str(len(names) + 1))
+                formats.append(code)
+                offsets.append(offset)
+            offset += np.dtype(code).itemsize
+    if not names:
+        raise ValueError(f"Binary format {format!r} skips every field")
+    return np.dtype(
+        {"names": names, "formats": formats, "offsets": offsets, "itemsize": offset}
+    )
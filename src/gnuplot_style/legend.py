@@ -0,0 +1,365 @@
+"""Gnuplot-style keys (legends) built from cached proxy artists."""
+
+from functools import lru_cache
+from math import ceil
+from numbers import Integral
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.legend_handler import HandlerLine2D
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+
+from .cycle import _shared_marker
+
+# Upper bound on the number of distinct entry styles kept as proxies; an
+# extended 'all' cycle has 1224
+_PROXY_CACHE_SIZE = 2048
+
+# Words of gnuplot's 'set key' placement
+_VERTICAL = {"top": "upper", "bottom": "lower"}
+_HORIZONTAL = ("left", "right")
+_MARGINS = {
+    "inside": "inside",
+    "outside": "outside",
+    "above": "above",
+    "over": "above",
+    "tmargin": "above",
+    "below": "below",
+    "under": "below",
+    "bmargin": "below",
+    "lmargin": "lmargin",
+    "rmargin": "rmargin",
+}
+_POSITION_WORDS = frozenset({"center", *_VERTICAL, *_HORIZONTAL, *_MARGINS})
+
+# Axes coordinates of the anchor point for each side
+_ANCHOR = {"upper": 1.0, "lower": 0.0, "left": 0.0, "right": 1.0, "center": 0.5}
+
+
+def key(
+    ax: Any,
+    handles: Optional[Sequence[Any]] = None,
+    labels: Optional[Sequence[str]] = None,
+    position: str = "top right",
+    maxrows: Optional[int] = None,
+    maxcols: Optional[int] = None,
+    horizontal: Optional[bool] = None,
+    reverse: bool = False,
+    box: Optional[bool] = None,
+    **kwargs: Any,
+) -> Any:
+    """Draw a gnuplot-style key (legend) at a fixed position.
+
+    Unlike ``ax.legend()`` with ``loc='best'``, the key is placed without
+    searching the axes for the least crowded spot, and every entry is
+    drawn from a proxy artist shared by all entries with the same color,
+    dash, marker and fill, so building the key costs time linear in the
+    number of entries.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to draw the key on
+    handles : sequence of Artist, optional
+        Entries to show (default: the labelled artists of ``ax``)
+    labels : sequence of str, optional
+        One label per handle (default: the handles' labels)
+    position : str, optional
+        Placement in gnuplot's ``set key`` words (default: 'top right'):
+        ``top``, ``bottom``, ``left``, ``right`` and ``center`` inside the
+        axes, plus ``outside`` (right of the axes, or left of them with
+        ``left``), ``above`` / ``below`` (centered on the axes by default)
+        and ``lmargin`` / ``rmargin``
+    maxrows : int, optional
+        Like gnuplot's ``maxrows``: start a new column after this many
+        entries, leaving the remainder in the last column (vertical layout)
+    maxcols : int, optional
+        Like gnuplot's ``maxcols``: start a new row after this many entries
+        (horizontal layout; default: all entries in one row)
+    horizontal : bool, optional
+        Fill rows before columns, like ``set key horizontal`` (default: True
+        above and below the axes, False elsewhere)
+    reverse : bool, optional
+        Like ``set key reverse``: put the sample left of the text; gnuplot's
+        default puts the text first (default: False)
+    box : bool, optional
+        Whether to draw a frame around the key (default:
+        ``rcParams['legend.frameon']``)
+    **kwargs
+        Passed on to ``ax.legend``, e.g. ``title`` or ``fontsize``
+
+    Returns
+    -------
+    Legend
+
+    Raises
+    ------
+    ValueError
+        If ``position`` has an unknown word, ``maxrows`` or ``maxcols`` is
+        not positive, or ``labels`` does not match ``handles``.
+
+    Examples
+    --------
+    >>> gp.use("all", cycle_mode="extended")
+    >>> gp.key(ax, position="outside top", maxrows=40)
+    """
+    if handles is None:
+        found, found_labels = ax.get_legend_handles_labels()
+        handles = found
+        if labels is None:
+            labels = found_labels
+    handles = list(handles)
+    if labels is None:
+        labels = [handle.get_label() for handle in handles]
+    labels = list(labels)
+    if len(labels) != len(handles):
+        raise ValueError(f"Got {len(labels)} labels for {len(handles)} handles")
+    for name, value in (("maxrows", maxrows), ("maxcols", maxcols)):
+        if value is not None and (
+            isinstance(value, bool) or not (isinstance(value, Integral) and value >= 1)
+        ):
+            raise ValueError(f"{name} must be a positive integer, got {value!r}")
+
+    loc, anchor, margin = _placement(position)
+    if horizontal is None:
+        horizontal = margin in ("above", "below")
+    n = len(handles)
+    if horizontal:
+        ncols = max(1, min(n, maxcols or n))
+        order = _row_major(n, ncols)
+        handles = [handles[i] for i in order]
+        labels = [labels[i] for i in order]
+    else:
+        ncols = ceil(n / maxrows) if maxrows and n else 1
+        if ncols > 1:
+            # Matplotlib balances the columns (110 entries in 3 columns as
+            # 37/37/36); blank entries at the end make every column but the
+            # last hold maxrows entries, as in gnuplot (50/50/10)
+            spacers = ncols * maxrows - n
+            handles = handles + [_spacer()] * spacers
+            labels = labels + [""] * spacers
+
+    if anchor is not None:
+        kwargs.setdefault("bbox_to_anchor", anchor)
+    if box is not None:
+        kwargs.setdefault("frameon", box)
+    kwargs["handler_map"] = {**_HANDLER_MAP, **kwargs.get("handler_map", {})}
+    return ax.legend(
+        [_proxy(handle) for handle in handles],
+        labels,
+        loc=loc,
+        ncol=ncols,
+        markerfirst=reverse,
+        **kwargs,
+    )
+
+
+def _placement(position: str) -> Tuple[str, Optional[Tuple[float, float]], str]:
+    """Return the legend loc, anchor point and margin of a key position."""
+    vertical = horizontal = None
+    centered = False
+    margin = "inside"
+    for word in position.split():
+        if word in _VERTICAL:
+            vertical = _VERTICAL[word]
+        elif word in _HORIZONTAL:
+            horizontal = word
+        elif word == "center":
+            centered = True
+        elif word in _MARGINS:
+            margin = _MARGINS[word]
+        else:
+            raise ValueError(f"Unknown key position word: {word!r}")
+    if margin in ("lmargin", "rmargin"):
+        horizontal = "left" if margin == "lmargin" else "right"
+        margin = "outside"
+
+    if margin in ("above", "below"):
+        # Centered on the axes unless a side is given, like gnuplot
+        horizontal = horizontal or "center"
+        if margin == "above":
+            return _loc("lower", horizontal), (_ANCHOR[horizontal], 1.0), margin
+        return _loc("upper", horizontal), (_ANCHOR[horizontal], 0.0), margin
+
+    # 'center' applies to whichever direction no other word set
+    if centered:
+        if vertical is None:
+            vertical = "center"
+        elif horizontal is None:
+            horizontal = "center"
+    vertical = vertical or "upper"
+    horizontal = horizontal or "right"
+    if margin == "outside":
+        # The key's inner side touches the axes: right of them unless 'left'
+        if horizontal == "left":
+            return _loc(vertical, "right"), (0.0, _ANCHOR[vertical]), margin
+        return _loc(vertical, "left"), (1.0, _ANCHOR[vertical]), margin
+    return _loc(vertical, horizontal), None, margin
+
+
+def _loc(vertical: str, horizontal: str) -> str:
+    """Return the matplotlib loc string of a vertical and horizontal side."""
+    if vertical == horizontal == "center":
+        return "center"
+    return f"{vertical} {horizontal}"
+
+
+def _row_major(n: int, ncols: int) -> List[int]:
+    """Return the entry order that makes column-major filling read by rows.
+
+    Matplotlib fills the first ``n % ncols`` columns with one entry more,
+    which is exactly where the last, partial row of a row-major layout is.
+    """
+    nrows = ceil(n / ncols)
+    return [
+        row * ncols + col
+        for col in range(ncols)
+        for row in range(nrows)
+        if row * ncols + col < n
+    ]
+
+
+class _KeySample(Line2D):
+    """A shared line proxy that keeps its style for :class:`_SampleHandler`."""
+
+    def __init__(self, style: Dict[str, Any]) -> None:
+        super().__init__([], [], **style)
+        self.style = style
+
+
+class _SampleHandler(HandlerLine2D):
+    """Draw key samples from a proxy's style instead of copying the proxy.
+
+    ``HandlerLine2D`` creates a default line and then copies every property
+    of the handle onto it, deep-copying its marker; building the sample
+    from the stored style once is about twice as fast per entry.
+    """
+
+    def create_artists(
+        self,
+        legend: Any,
+        orig_handle: Any,
+        xdescent: float,
+        ydescent: float,
+        width: float,
+        height: float,
+        fontsize: float,
+        trans: Any,
+    ) -> List[Any]:
+        """Return the sample line of one key entry."""
+        xdata, _ = self.get_xdata(legend, xdescent, ydescent, width, height, fontsize)
+        markevery = None
+        if self.get_numpoints(legend) == 1:
+            # One marker in the middle of a line reaching both ends
+            xdata = np.linspace(xdata[0], xdata[-1], 3)
+            markevery = [1]
+        ydata = np.full_like(xdata, (height - ydescent) / 2)
+        style = orig_handle.style
+        if legend.markerscale != 1:
+            style = {**style, "markersize": style["markersize"] * legend.markerscale}
+        sample = Line2D(xdata, ydata, markevery=markevery, **style)
+        sample.set_transform(trans)
+        return [sample]
+
+
+_HANDLER_MAP = {_KeySample: _SampleHandler()}
+
+
+def _proxy(handle: Any) -> Any:
+    """Return the shared proxy artist for the style of a legend handle."""
+    if isinstance(handle, Line2D):
+        style, make_proxy = _line_style(handle), _line_proxy
+    elif isinstance(handle, (Patch, PolyCollection)):
+        facecolor, edgecolor, linewidth = _patch_style(handle)
+        style = (facecolor, edgecolor, handle.get_hatch(), linewidth)
+        make_proxy = _patch_proxy
+    else:
+        return handle
+    try:
+        hash(style)
+    except TypeError:
+        # An unhashable style, e.g. a marker given as vertices
+        return handle
+    return make_proxy(*style)
+
+
+def _line_style(handle: Any) -> Tuple[Any, ...]:
+    """Return the hashable style of a line: colors, dashes, widths, marker."""
+    # get_linestyle() reports every dash pattern as '--'; matplotlib < 3.6
+    # keeps the unscaled pattern in two attributes
+    try:
+        offset, dashes = handle._unscaled_dash_pattern
+    except AttributeError:
+        offset, dashes = handle._us_dashOffset, handle._us_dashSeq
+    linestyle = handle.get_linestyle() if dashes is None else (offset, tuple(dashes))
+    return (
+        to_rgba(handle.get_color()),
+        linestyle,
+        float(handle.get_linewidth()),
+        handle.get_marker(),
+        handle.get_fillstyle(),
+        float(handle.get_markersize()),
+        to_rgba(handle.get_markerfacecolor()),
+        to_rgba(handle.get_markeredgecolor()),
+    )
+
+
+def _patch_style(handle: Any) -> Tuple[Any, Any, float]:
+    """Return the face color, edge color and line width of a patch or bars."""
+    if isinstance(handle, Patch):
+        return handle.get_facecolor(), handle.get_edgecolor(), handle.get_linewidth()
+    facecolors, edgecolors = handle.get_facecolor(), handle.get_edgecolor()
+    return (
+        tuple(facecolors[0]) if len(facecolors) else (0.0, 0.0, 0.0, 0.0),
+        tuple(edgecolors[0]) if len(edgecolors) else (0.0, 0.0, 0.0, 0.0),
+        float(handle.get_linewidth()[0]),
+    )
+
+
+@lru_cache(maxsize=_PROXY_CACHE_SIZE)
+def _line_proxy(
+    color: Tuple[float, ...],
+    linestyle: Any,
+    linewidth: float,
+    marker: Any,
+    fillstyle: str,
+    markersize: float,
+    markerfacecolor: Tuple[float, ...],
+    markeredgecolor: Tuple[float, ...],
+) -> _KeySample:
+    """Return the line proxy of one line style; shared, so read-only."""
+    return _KeySample(
+        {
+            "color": color,
+            "linestyle": linestyle,
+            "linewidth": linewidth,
+            # Point types reuse their pre-built MarkerStyle in every sample
+            "marker": _shared_marker(marker, fillstyle),
+            "fillstyle": fillstyle,
+            "markersize": markersize,
+            "markerfacecolor": markerfacecolor,
+            "markeredgecolor": markeredgecolor,
+        }
+    )
+
+
+@lru_cache(maxsize=None)
+def _spacer() -> _KeySample:
+    """Return the invisible proxy of a blank key entry; shared, so read-only."""
+    return _KeySample({"linestyle": "none", "marker": "none", "markersize": 0.0})
+
+
+@lru_cache(maxsize=_PROXY_CACHE_SIZE)
+def _patch_proxy(
+    facecolor: Tuple[float, ...],
+    edgecolor: Tuple[float, ...],
+    hatch: Optional[str],
+    linewidth: float,
+) -> Patch:
+    """Return the Patch proxy of one fill style; shared, so read-only."""
+    return Patch(
+        facecolor=facecolor, edgecolor=edgecolor, hatch=hatch, linewidth=linewidth
+    )
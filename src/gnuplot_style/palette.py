@@ -0,0 +1,368 @@
+"""Gnuplot continuous palettes as cached matplotlib colormaps."""
+
+import hashlib
+import shlex
+from functools import lru_cache
+from numbers import Integral
+from typing import Any, Callable, Sequence, Tuple
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib.colors import Colormap, ListedColormap, to_rgb
+
+# Upper bound on the number of distinct palettes kept by each builder
+_PALETTE_CACHE_SIZE = 32
+
+# Number of colors in a palette's lookup table (matplotlib's image.lut)
+_LUT_SIZE = 256
+
+_DEG = np.pi / 180.0
+
+# Trailing 'set palette' keywords selecting the palette direction
+_SIGNS = {"positive": False, "pos": False, "negative": True, "neg": True}
+
+
+def _const(value: float) -> Callable[[np.ndarray], np.ndarray]:
+    """Return a formula that is ``value`` everywhere."""
+    return lambda x: np.full_like(x, value)
+
+
+def _formula_32(x: np.ndarray) -> np.ndarray:
+    """Evaluate formula 32, the piecewise ``4x; 1; -2x+1.84; x/0.08-11.5``."""
+    return np.select(
+        [x <= 0.25, x <= 0.42, x <= 0.92],
+        [4 * x, np.ones_like(x), -2 * x + 1.84],
+        x / 0.08 - 11.5,
+    )
+
+
+# gnuplot's 'set palette rgbformulae' functions, see 'show palette rgbformulae'
+_FORMULAE: Tuple[Callable[[np.ndarray], np.ndarray], ...] = (
+    _const(0.0),
+    _const(0.5),
+    _const(1.0),
+    lambda x: x,
+    lambda x: x**2,
+    lambda x: x**3,
+    lambda x: x**4,
+    np.sqrt,
+    lambda x: np.sqrt(np.sqrt(x)),
+    lambda x: np.sin(90 * _DEG * x),
+    lambda x: np.cos(90 * _DEG * x),
+    lambda x: np.abs(x - 0.5),
+    lambda x: (2 * x - 1) ** 2,
+    lambda x: np.sin(180 * _DEG * x),
+    lambda x: np.abs(np.cos(180 * _DEG * x)),
+    lambda x: np.sin(360 * _DEG * x),
+    lambda x: np.cos(360 * _DEG * x),
+    lambda x: np.abs(np.sin(360 * _DEG * x)),
+    lambda x: np.abs(np.cos(360 * _DEG * x)),
+    lambda x: np.abs(np.sin(720 * _DEG * x)),
+    lambda x: np.abs(np.cos(720 * _DEG * x)),
+    lambda x: 3 * x,
+    lambda x: 3 * x - 1,
+    lambda x: 3 * x - 2,
+    lambda x: np.abs(3 * x - 1),
+    lambda x: np.abs(3 * x - 2),
+    lambda x: (3 * x - 1) / 2,
+    lambda x: (3 * x - 2) / 2,
+    lambda x: np.abs((3 * x - 1) / 2),
+    lambda x: np.abs((3 * x - 2) / 2),
+    lambda x: x / 0.32 - 0.78125,
+    lambda x: 2 * x - 0.84,
+    _formula_32,
+    lambda x: np.abs(2 * x - 0.5),
+    lambda x: 2 * x,
+    lambda x: 2 * x - 0.5,
+    lambda x: 2 * x - 1,
+)
+
+# Coefficients of the cubehelix scheme (D. A. Green 2011), as used by gnuplot
+_CUBEHELIX = np.array(
+    [[-0.14861, 1.78277], [-0.29227, -0.90649], [1.97294, 0.0]], dtype=float
+)
+
+
+def rgbformula(number: int, x: Any) -> np.ndarray:
+    """Evaluate one of gnuplot's ``rgbformulae`` on gray values.
+
+    Parameters
+    ----------
+    number : int
+        Formula number, -36 to 36. A negative number evaluates the formula
+        at ``1 - x``, as gnuplot does.
+    x : float or array-like
+        Gray values in [0, 1]
+
+    Returns
+    -------
+    ndarray
+        The color component for each gray value, clipped to [0, 1].
+
+    Raises
+    ------
+    ValueError
+        If ``number`` is not an integer from -36 to 36.
+    """
+    last = len(_FORMULAE) - 1
+    if not (isinstance(number, Integral) and -last <= number <= last):
+        raise ValueError(
+            f"rgbformulae numbers must be integers from {-last} to {last}, "
+            f"got {number!r}"
+        )
+    x = np.asarray(x, dtype=float)
+    if number < 0:
+        x = 1.0 - x
+    return np.clip(_FORMULAE[abs(int(number))](x), 0.0, 1.0)
+
+
+def rgbformulae_palette(
+    r: int = 7, g: int = 5, b: int = 15, n: int = _LUT_SIZE
+) -> ListedColormap:
+    """Return gnuplot's ``set palette rgbformulae r,g,b`` as a colormap.
+
+    The default 7,5,15 is gnuplot's default palette (black-blue-red-yellow).
+
+    Parameters
+    ----------
+    r, g, b : int
+        Formula numbers of the red, green and blue components, see
+        :func:`rgbformula`
+    n : int, optional
+        Number of colors in the lookup table (default: 256)
+
+    Returns
+    -------
+    ListedColormap
+        Shared by all calls with the same arguments; treat it as read-only.
+
+    Raises
+    ------
+    ValueError
+        If a formula number or ``n`` is invalid.
+    """
+    for number in (r, g, b):
+        rgbformula(number, 0.0)
+    return _rgbformulae_cmap(int(r), int(g), int(b), _lut_size(n))
+
+
+def defined_palette(
+    points: Sequence[Sequence[Any]], n: int = _LUT_SIZE
+) -> ListedColormap:
+    """Return gnuplot's ``set palette defined`` gradient as a colormap.
+
+    Parameters
+    ----------
+    points : sequence
+        ``(position, color)`` or ``(position, r, g, b)`` entries in
+        increasing position order. Positions are rescaled so the first maps
+        to 0 and the last to 1; colors are anything matplotlib accepts and
+        r, g, b are in [0, 1].
+    n : int, optional
+        Number of colors in the lookup table (default: 256)
+
+    Returns
+    -------
+    ListedColormap
+        Shared by all calls with the same arguments; treat it as read-only.
+
+    Raises
+    ------
+    ValueError
+        If fewer than two points are given, positions decrease, or a color
+        is invalid.
+    """
+    entries = []
+    for point in points:
+        if len(point) == 2:
+            color = to_rgb(point[1])
+        elif len(point) == 4:
+            color = tuple(float(c) for c in point[1:])
+        else:
+            raise ValueError(
+                f"Expected (position, color) or (position, r, g, b), got {point!r}"
+            )
+        entries.append((float(point[0]),) + tuple(color))
+    return _defined_cmap(tuple(entries), _lut_size(n))
+
+
+def cubehelix_palette(
+    start: float = 0.5,
+    cycles: float = -1.5,
+    saturation: float = 1.0,
+    n: int = _LUT_SIZE,
+) -> ListedColormap:
+    """Return gnuplot's ``set palette cubehelix`` as a colormap.
+
+    Parameters
+    ----------
+    start : float, optional
+        Starting hue, in units of a third of a turn (default: 0.5)
+    cycles : float, optional
+        Number of hue rotations from black to white (default: -1.5)
+    saturation : float, optional
+        Amplitude of the hue deviation from gray (default: 1)
+    n : int, optional
+        Number of colors in the lookup table (default: 256)
+
+    Returns
+    -------
+    ListedColormap
+        Shared by all calls with the same arguments; treat it as read-only.
+    """
+    return _cubehelix_cmap(float(start), float(cycles), float(saturation), _lut_size(n))
+
+
+def get_palette(spec: Any, n: int = _LUT_SIZE) -> Colormap:
+    """Return the colormap of a gnuplot ``set palette`` specification.
+
+    Parameters
+    ----------
+    spec : str or Colormap
+        Everything after ``set palette``: ``'rgbformulae 7,5,15'`` (or
+        ``'rgb 7,5,15'``), ``"defined (0 'black', 1 'red', 2 'yellow')"``,
+        ``'cubehelix start 0.5 cycles -1.5 saturation 1'``, ``'gray'`` or
+        ``'color'``, optionally followed by ``'negative'`` to reverse it.
+        The name of a registered matplotlib colormap and Colormap instances
+        are passed through.
+    n : int, optional
+        Number of colors in a gnuplot palette's lookup table (default: 256)
+
+    Returns
+    -------
+    Colormap
+
+    Raises
+    ------
+    ValueError
+        If the specification cannot be parsed.
+
+    Examples
+    --------
+    >>> ax.imshow(z, cmap=get_palette("rgbformulae 33,13,10"))
+    """
+    if isinstance(spec, Colormap):
+        return spec
+    return _parse_palette(str(spec).strip(), _lut_size(n))
+
+
+def register_palette(spec: Any, n: int = _LUT_SIZE) -> str:
+    """Register the colormap of :func:`get_palette` and return its name.
+
+    The name can be passed as ``cmap=`` or stored in ``image.cmap``; a
+    palette is registered only once per process.
+    """
+    cmap = get_palette(spec, n)
+    if cmap.name not in mpl.colormaps:
+        if hasattr(mpl.colormaps, "register"):
+            mpl.colormaps.register(cmap)
+        else:
+            # matplotlib < 3.6 registers through matplotlib.cm
+            from matplotlib.cm import register_cmap
+
+            register_cmap(cmap=cmap)
+    return cmap.name
+
+
+def _lut_size(n: Any) -> int:
+    """Validate the number of colors of a lookup table."""
+    if not (isinstance(n, Integral) and n >= 2):
+        raise ValueError(f"n must be an integer of at least 2, got {n!r}")
+    return int(n)
+
+
+@lru_cache(maxsize=_PALETTE_CACHE_SIZE)
+def _rgbformulae_cmap(r: int, g: int, b: int, n: int) -> ListedColormap:
+    """Tabulate three rgbformulae at ``n`` evenly spaced gray values."""
+    x = np.linspace(0.0, 1.0, n)
+    lut = np.stack([rgbformula(r, x), rgbformula(g, x), rgbformula(b, x)], axis=-1)
+    return ListedColormap(lut, name=_name(f"rgbformulae_{r}_{g}_{b}", n))
+
+
+@lru_cache(maxsize=_PALETTE_CACHE_SIZE)
+def _defined_cmap(entries: Tuple[Tuple[float, ...], ...], n: int) -> ListedColormap:
+    """Interpolate ``(position, r, g, b)`` entries linearly into a table."""
+    if len(entries) < 2:
+        raise ValueError("A defined palette needs at least two points")
+    table = np.array(entries, dtype=float)
+    position = table[:, 0]
+    if np.any(np.diff(position) < 0) or position[-1] == position[0]:
+        raise ValueError("Palette positions must increase")
+    position = (position - position[0]) / (position[-1] - position[0])
+    x = np.linspace(0.0, 1.0, n)
+    lut = np.stack([np.interp(x, position, table[:, k]) for k in (1, 2, 3)], axis=-1)
+    digest = hashlib.sha1(table.tobytes()).hexdigest()[:10]
+    return ListedColormap(np.clip(lut, 0.0, 1.0), name=_name(f"defined_{digest}", n))
+
+
+@lru_cache(maxsize=_PALETTE_CACHE_SIZE)
+def _cubehelix_cmap(
+    start: float, cycles: float, saturation: float, n: int
+) -> ListedColormap:
+    """Tabulate the cubehelix scheme at ``n`` evenly spaced gray values."""
+    x = np.linspace(0.0, 1.0, n)
+    phi = 2 * np.pi * (start / 3 + x * cycles)
+    amplitude = saturation * x * (1 - x) / 2
+    angles = np.stack([np.cos(phi), np.sin(phi)])
+    lut = x[:, None] + amplitude[:, None] * (_CUBEHELIX @ angles).T
+    name = _name(f"cubehelix_{start:g}_{cycles:g}_{saturation:g}", n)
+    return ListedColormap(np.clip(lut, 0.0, 1.0), name=name)
+
+
+def _name(base: str, n: int) -> str:
+    """Return the registry name of a palette with an ``n``-color table."""
+    name = f"gnuplot_{base}"
+    return name if n == _LUT_SIZE else f"{name}_{n}"
+
+
+@lru_cache(maxsize=_PALETTE_CACHE_SIZE)
+def _parse_palette(spec: str, n: int) -> Colormap:
+    """Build the colormap of a ``set palette`` specification."""
+    words = spec.split()
+    negative = False
+    if words and words[-1] in _SIGNS:
+        negative = _SIGNS[words[-1]]
+        spec = spec[: spec.rfind(words.pop())].rstrip()
+    kind = words[0] if words else "color"
+    rest = spec[len(kind) :].strip()
+
+    if kind in ("rgbformulae", "rgb"):
+        numbers = [int(v) for v in rest.split(",")] if rest else [7, 5, 15]
+        if len(numbers) != 3:
+            raise ValueError(f"rgbformulae needs three numbers, got {rest!r}")
+        cmap = rgbformulae_palette(*numbers, n=n)
+    elif kind in ("color", "colour"):
+        cmap = rgbformulae_palette(n=n)
+    elif kind in ("gray", "grey"):
+        cmap = rgbformulae_palette(3, 3, 3, n=n)
+    elif kind == "defined":
+        cmap = defined_palette(_parse_defined(rest), n=n)
+    elif kind == "cubehelix":
+        options = {"start": 0.5, "cycles": -1.5, "saturation": 1.0}
+        tokens = rest.split()
+        if len(tokens) % 2 or any(k not in options for k in tokens[::2]):
+            raise ValueError(f"Invalid cubehelix options: {rest!r}")
+        options.update((k, float(v)) for k, v in zip(tokens[::2], tokens[1::2]))
+        cmap = cubehelix_palette(n=n, **options)
+    elif spec in mpl.colormaps:
+        cmap = mpl.colormaps[spec]
+    else:
+        raise ValueError(f"Unknown palette: {spec!r}")
+    return cmap.reversed() if negative else cmap
+
+
+def _parse_defined(text: str) -> Tuple[Tuple[Any, ...], ...]:
+    """Parse the ``(pos color, ...)`` list of ``set palette defined``."""
+    text = text.strip()
+    if not (text.startswith("(") and text.endswith(")")):
+        raise ValueError(f"Expected a parenthesized list of points, got {text!r}")
+    points = []
+    for entry in text[1:-1].split(","):
+        fields = shlex.split(entry)
+        if len(fields) == 2:
+            points.append((float(fields[0]), fields[1]))
+        elif len(fields) == 4:
+            points.append(tuple(float(v) for v in fields))
+        else:
+            raise ValueError(f"Invalid palette point: {entry.strip()!r}")
+    return tuple(points)
@@ -0,0 +1,597 @@
+"""Vectorized gnuplot-style plotting functions."""
+
+from itertools import islice
+from math import ceil
+from numbers import Integral
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import matplotlib as mpl
+import numpy as np
+
+from .constants import COLORS, COLORS_RGBA, MARKERS
+from .cycle import marker_style
+
+# Points decimated per vectorized pass, bounding the temporary arrays
+_DECIMATE_CHUNK = 1 << 20
+
+# A grid axis is regular if no coordinate is off its evenly spaced position
+# by more than this fraction of a cell
+_REGULAR_TOL = 0.01
+
+# Width of the colorbox as a fraction of the axes, like gnuplot's default
+_COLORBOX_FRACTION = 0.05
+
+# gnuplot's default palette, used by pm3d unless use() set a gnuplot palette
+_PM3D_PALETTE = "rgbformulae 7,5,15"
+
+# gnuplot's 'set pm3d corners2color' reductions of a cell's four corners
+_CORNERS2COLOR = {
+    "mean": lambda c: np.mean(c, axis=0),
+    "geomean": lambda c: np.exp(np.mean(np.log(c), axis=0)),
+    "median": lambda c: np.median(c, axis=0),
+    "min": lambda c: np.min(c, axis=0),
+    "max": lambda c: np.max(c, axis=0),
+}
+
+
+def scatter(
+    ax: Any,
+    x: Any,
+    y: Any,
+    pt: Any = 7,
+    lc: Any = 0,
+    s: Any = None,
+    **kwargs: Any,
+) -> List[Any]:
+    """Draw points with gnuplot point types, one collection per point type.
+
+    Points are grouped by point type with a stable argsort, so drawing
+    costs time proportional to the number of distinct point types rather
+    than of points, and each point keeps its own color.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to draw on
+    x, y : array-like
+        Point coordinates
+    pt : int or array-like of int, optional
+        Gnuplot point type, an index into ``MARKERS`` and ``FILL_STYLES``,
+        or one per point. Indices wrap around; points of type 0 (no symbol)
+        are not drawn (default: 7, open circle)
+    lc : int or array-like of int, optional
+        Gnuplot line color, an index into ``COLORS``, or one per point.
+        Indices wrap around (default: 0)
+    s : float or array-like, optional
+        Marker size in points**2, or one per point
+        (default: ``rcParams['lines.markersize'] ** 2``)
+    **kwargs
+        Passed on to each `~matplotlib.collections.PathCollection`
+
+    Returns
+    -------
+    list of PathCollection
+        One collection per distinct point type, in increasing type order.
+
+    Examples
+    --------
+    >>> pt = np.where(y > 0, 7, 9)  # circles above zero, triangles below
+    >>> gp.scatter(ax, x, y, pt=pt, lc=pt)
+    """
+    from matplotlib.collections import PathCollection
+    from matplotlib.transforms import IdentityTransform
+
+    if s is None:
+        s = mpl.rcParams["lines.markersize"] ** 2
+    x, y, pt, lc, sizes = (
+        np.atleast_1d(a).ravel()
+        for a in np.broadcast_arrays(
+            np.asarray(x, dtype=float),
+            np.asarray(y, dtype=float),
+            np.asarray(pt, dtype=np.intp),
+            np.asarray(lc, dtype=np.intp),
+            np.asarray(s, dtype=float),
+        )
+    )
+    # Small unsigned keys let the stable argsort use numpy's radix sort
+    pt = (pt % len(MARKERS)).astype(np.uint8)
+
+    # Sort the points by type once; each type is then a contiguous slice
+    order = np.argsort(pt, kind="stable")
+    counts = np.bincount(pt, minlength=len(MARKERS))
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    offsets = np.column_stack([x, y])[order]
+    colors = COLORS_RGBA[lc[order] % len(COLORS)]
+    # A single size is shared instead of being transformed once per point
+    per_point_size = np.ndim(s) > 0
+    sizes = sizes[order] if per_point_size else sizes[:1]
+
+    kwargs.setdefault("linewidths", mpl.rcParams["lines.markeredgewidth"])
+    # matplotlib < 3.6 names the offset transform ``transOffset``
+    if hasattr(PathCollection, "set_offset_transform"):
+        kwargs["offset_transform"] = ax.transData
+    else:
+        kwargs["transOffset"] = ax.transData
+    collections = []
+    for index in np.flatnonzero(counts).tolist():
+        marker = marker_style(index)
+        if marker.get_marker() == " ":
+            continue
+        start, stop = bounds[index], bounds[index + 1]
+        path = marker.get_path().transformed(marker.get_transform())
+        color = colors[start:stop]
+        collection = PathCollection(
+            (path,),
+            sizes[start:stop] if per_point_size else sizes,
+            facecolors=color if marker.is_filled() else "none",
+            edgecolors=color,
+            offsets=offsets[start:stop],
+            **kwargs,
+        )
+        collection.set_transform(IdentityTransform())
+        ax.add_collection(collection, autolim=True)
+        collections.append(collection)
+    ax.autoscale_view()
+    return collections
+
+
+def multiline(
+    ax: Any,
+    x: Any,
+    Y: Any,
+    labels: Optional[Sequence[str]] = None,
+    cycle: Any = None,
+    **kwargs: Any,
+) -> Tuple[List[Any], List[Any]]:
+    """Draw the rows of a 2-D array as lines, one collection per dash pattern.
+
+    Row ``i`` gets the style the ``i``-th next ``ax.plot`` call would get
+    from the axes' prop cycle, which is then advanced past the rows, but
+    all rows that share a dash pattern are drawn by a single
+    `~matplotlib.collections.LineCollection` with one color per row.
+    Thousands of series therefore cost a handful of artists instead of one
+    ``Line2D`` each.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to draw on
+    x : array-like
+        Shape (m,) x values shared by all rows, or shape (n, m), one row each
+    Y : array-like
+        Shape (n, m): n series of m points
+    labels : sequence of str, optional
+        One legend label per row. Proxies are only made for labelled rows.
+    cycle : cycler.Cycler, optional
+        Cycle providing ``color`` and ``linestyle``; other properties such
+        as markers are ignored. Row ``i`` gets entry ``i``, and the axes'
+        cycle is left alone (default: the axes' prop cycle, e.g. the one
+        installed by :func:`use` or :func:`apply`)
+    **kwargs
+        Passed on to each `~matplotlib.collections.LineCollection`
+
+    Returns
+    -------
+    collections : list of LineCollection
+        One collection per distinct dash pattern, in cycle order.
+    handles : list of Line2D
+        Legend proxies for the labelled rows, for ``ax.legend(handles=...)``.
+
+    Raises
+    ------
+    ValueError
+        If ``labels`` does not have one entry per row, or ``cycle`` is empty
+        or not a cycle of property dicts.
+
+    Examples
+    --------
+    >>> gp.use("cl", cycle_mode="extended")
+    >>> collections, handles = gp.multiline(ax, t, traces, labels=names)
+    >>> ax.legend(handles=handles[:10])
+    """
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    n_rows = Y.shape[0]
+    segments = np.stack([np.broadcast_to(np.asarray(x, dtype=float), Y.shape), Y], -1)
+    if labels is not None and len(labels) != n_rows:
+        raise ValueError(f"Got {len(labels)} labels for {n_rows} rows")
+
+    if cycle is None:
+        entries, positions = _next_cycle_entries(ax, n_rows)
+    else:
+        entries, positions = _cycle_entries(cycle, n_rows)
+    colors, dash_ids, dashes = _row_styles(entries, positions)
+    kwargs.setdefault("linewidths", mpl.rcParams["lines.linewidth"])
+
+    collections = []
+    for code, linestyle in enumerate(dashes):
+        rows = np.flatnonzero(dash_ids == code)
+        if not rows.size:
+            continue
+        collection = LineCollection(
+            segments[rows], colors=colors[rows], linestyles=linestyle, **kwargs
+        )
+        ax.add_collection(collection, autolim=True)
+        collections.append(collection)
+    ax.autoscale_view()
+
+    handles = []
+    if labels is not None:
+        linewidth = np.atleast_1d(kwargs["linewidths"])[0]
+        for row, label in enumerate(labels):
+            handles.append(
+                Line2D(
+                    [],
+                    [],
+                    color=colors[row],
+                    linestyle=dashes[dash_ids[row]],
+                    linewidth=linewidth,
+                    label=label,
+                )
+            )
+    return collections, handles
+
+
+def _next_cycle_entries(ax: Any, n_rows: int) -> Tuple[List[Any], np.ndarray]:
+    """Return the axes' prop cycle entries and the positions of the next rows.
+
+    The axes' cycle is advanced past the rows, as ``n_rows`` calls of
+    ``ax.plot`` would.
+    """
+    # matplotlib has no public API for the cycle position, so its private
+    # state is read where it is known: matplotlib >= 3.10 keeps the entries
+    # in a _PropCycle, 3.8 and 3.9 on the line factory itself
+    lines = getattr(ax, "_get_lines", None)
+    state = getattr(lines, "_prop_cycle", lines)
+    entries = getattr(state, "_cycler_items", None)
+    if entries and isinstance(getattr(state, "_idx", None), int):
+        positions = (state._idx + np.arange(n_rows)) % len(entries)
+        state._idx = (state._idx + n_rows) % len(entries)
+        return entries, positions
+    # matplotlib < 3.8 only has an itertools.cycle of the entries
+    prop_cycler = getattr(lines, "prop_cycler", None)
+    if prop_cycler is not None:
+        return [next(prop_cycler) for _ in range(n_rows)], np.arange(n_rows)
+    # Unknown internals: start the rcParams cycle over, as a new axes would
+    return _cycle_entries(mpl.rcParams["axes.prop_cycle"], n_rows)
+
+
+def _cycle_entries(cycle: Any, n_rows: int) -> Tuple[List[Any], np.ndarray]:
+    """Return the first entries of ``cycle`` and the positions of the rows."""
+    entries = list(islice(cycle, max(n_rows, 1)))
+    if not entries or not all(isinstance(entry, dict) for entry in entries):
+        raise ValueError(
+            f"cycle must be a non-empty Cycler of property dicts, got {cycle!r}"
+        )
+    return entries, np.arange(n_rows) % len(entries)
+
+
+def _row_styles(
+    entries: Sequence[Dict[str, Any]], positions: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, List[Any]]:
+    """Return per-row RGBA colors, dash codes and the distinct dash patterns."""
+    # Colors and dash patterns are resolved once per cycle entry, not per row
+    color = mpl.rcParams["lines.color"]
+    colors = mpl.colors.to_rgba_array([e.get("color", color) for e in entries])
+    codes: Dict[Any, int] = {}
+    linestyle = mpl.rcParams["lines.linestyle"]
+    entry_codes = [
+        codes.setdefault(e.get("linestyle", linestyle), len(codes)) for e in entries
+    ]
+    return colors[positions], np.asarray(entry_codes)[positions], list(codes)
+
+
+def plot(
+    ax: Any, x: Any, y: Any, pointnumber: Optional[int] = None, **kwargs: Any
+) -> Any:
+    """Plot a long series decimated to what the axes can display.
+
+    The line takes the next style of the axes' prop cycle, as ``ax.plot``
+    does, but only keeps the first, last, minimum and maximum point of
+    every pixel column of the visible x range (M4 decimation), so it
+    rasterizes to the same pixels as the full series while drawing a few
+    thousand points. The decimation is redone whenever the x limits or the
+    canvas size change; once the line is removed from the axes, the next
+    such change disconnects it.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to draw on
+    x : array-like
+        Shape (n,) x values, sorted in increasing order
+    y : array-like
+        Shape (n,) y values; NaN marks gaps
+    pointnumber : int, optional
+        Like gnuplot's ``pointnumber``: draw at most N markers, on every
+        ``ceil(n / N)``-th point of the decimated series, recomputed with
+        each decimation. Only useful with a marker style.
+    **kwargs
+        Passed on to ``ax.plot``, e.g. ``label`` or ``linewidth``
+
+    Returns
+    -------
+    Line2D
+        The line; its data is the decimated series.
+
+    Raises
+    ------
+    ValueError
+        If ``x`` and ``y`` differ in length, ``x`` is not sorted or
+        ``pointnumber`` is not a positive integer.
+
+    Notes
+    -----
+    The pixel columns are counted at the larger of the figure dpi and a
+    numeric ``savefig.dpi``; saving at a higher ``dpi=`` keeps the screen
+    resolution. Antialiasing may blend a few pixels at column boundaries
+    differently from a full draw. Markers are drawn at the kept points
+    only, so decimation is meant for plain lines.
+
+    Examples
+    --------
+    >>> t = np.arange(50_000_000) / 1e3
+    >>> gp.plot(ax, t, signal, label="sensor 1")
+    >>> ax.set_xlim(100, 101)  # re-decimated for the new range
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if x.shape != y.shape:
+        raise ValueError(
+            f"x and y must have the same length, got {x.size} and {y.size}"
+        )
+    if np.any(x[1:] < x[:-1]):
+        raise ValueError("x must be sorted in increasing order")
+    if pointnumber is not None:
+        _point_stride(0, pointnumber)
+
+    def decimated(x0: float, x1: float) -> Any:
+        fig = ax.figure
+        dpi = mpl.rcParams["savefig.dpi"]
+        scale = max(dpi, fig.dpi) / fig.dpi if dpi != "figure" else 1.0
+        width = ax.bbox.width * scale
+        keep = _m4_indices(x, y, x0, x1, width, ax.xaxis.get_transform())
+        return x[keep], y[keep]
+
+    span = (x[0], x[-1]) if x.size else (0.0, 1.0)
+    (line,) = ax.plot(*decimated(*span), **kwargs)
+    if pointnumber is not None:
+        line.set_markevery(_point_stride(len(line.get_xdata()), pointnumber))
+
+    def redecimate(*args: Any) -> None:
+        if line.axes is not ax:
+            # The line was removed: drop both callbacks and the data they hold
+            ax.callbacks.disconnect(xlim_cid)
+            canvas.mpl_disconnect(resize_cid)
+            return
+        xd, yd = decimated(*sorted(ax.get_xlim()))
+        line.set_data(xd, yd)
+        if pointnumber is not None:
+            line.set_markevery(_point_stride(len(xd), pointnumber))
+
+    canvas = ax.figure.canvas
+    xlim_cid = ax.callbacks.connect("xlim_changed", redecimate)
+    resize_cid = canvas.mpl_connect("resize_event", redecimate)
+    return line
+
+
+def _point_stride(size: int, pointnumber: int) -> int:
+    """Return the markevery stride that draws at most ``pointnumber`` markers."""
+    if isinstance(pointnumber, bool) or not (
+        isinstance(pointnumber, Integral) and pointnumber >= 1
+    ):
+        raise ValueError(f"pointnumber must be a positive integer, got {pointnumber!r}")
+    return max(1, ceil(size / int(pointnumber)))
+
+
+def _m4_indices(
+    x: np.ndarray, y: np.ndarray, x0: float, x1: float, width: float, scale: Any
+) -> np.ndarray:
+    """Return the indices of the points that survive M4 decimation.
+
+    The visible range ``[x0, x1]`` is split into ``width`` columns in the
+    axis' scale; each column keeps its first, last, minimum and maximum
+    point. One point beyond each side is kept so the line reaches the edge.
+    """
+    n_bins = max(int(width), 1)
+    lo = max(int(np.searchsorted(x, x0, "left")) - 1, 0)
+    hi = min(int(np.searchsorted(x, x1, "right")) + 1, len(x))
+    if hi - lo <= 4 * n_bins or x1 <= x0:
+        return np.arange(lo, hi)
+
+    t0, t1 = scale.transform(np.array([x0, x1]))
+    per_unit = n_bins / (t1 - t0)
+    keep = []
+    for start in range(lo, hi, _DECIMATE_CHUNK):
+        stop = min(start + _DECIMATE_CHUNK, hi)
+        bins = np.floor((scale.transform(x[start:stop]) - t0) * per_unit)
+        # Points beyond the edges collapse into one column on either side
+        np.clip(bins, -1, n_bins, out=bins)
+        keep.append(start + _m4_chunk(bins, y[start:stop]))
+    return np.unique(np.concatenate(keep))
+
+
+def _m4_chunk(bins: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Return the first/last/min/max indices of each run of equal ``bins``."""
+    starts = np.concatenate([[0], np.flatnonzero(bins[1:] != bins[:-1]) + 1])
+    ends = np.append(starts[1:], len(y)) - 1
+    counts = ends - starts + 1
+    lows = np.repeat(np.fmin.reduceat(y, starts), counts) == y
+    highs = np.repeat(np.fmax.reduceat(y, starts), counts) == y
+    return np.concatenate(
+        [
+            starts,
+            ends,
+            _first_in_run(lows, starts, ends),
+            _first_in_run(highs, starts, ends),
+        ]
+    )
+
+
+def _first_in_run(mask: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Return the first True index of each run, or its start if there is none."""
+    hits = np.flatnonzero(mask)
+    if not hits.size:
+        return starts
+    first = hits[np.minimum(np.searchsorted(hits, starts), len(hits) - 1)]
+    # All-NaN runs have no minimum or maximum; keep their (NaN) first point
+    return np.where((first >= starts) & (first <= ends), first, starts)
+
+
+def pm3d(
+    ax: Any,
+    X: Any,
+    Y: Any,
+    Z: Any,
+    palette: Any = None,
+    colorbox: bool = True,
+    corners2color: str = "mean",
+    **kwargs: Any,
+) -> Any:
+    """Draw a gnuplot ``pm3d map`` of gridded data.
+
+    As in gnuplot, ``Z`` holds the values at the grid points and every cell
+    between four neighbouring points is filled with a color computed from
+    its corners. The artist is chosen from the grid: an image for a regular
+    grid, a `~matplotlib.image.PcolorImage` for a rectilinear one and a
+    rasterized ``pcolormesh`` only for an irregular one or on log axes.
+    Images are drawn by resampling to the output pixels and embedded as
+    bitmaps in PDF and SVG, so dense maps cost time and file size per output
+    pixel, not per cell.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to draw on
+    X, Y : array-like
+        Grid coordinates: shape (nx,) and (ny,) axes, or shape (ny, nx)
+        arrays as returned by ``np.meshgrid``. Each axis must be monotonic.
+    Z : array-like
+        Shape (ny, nx) values at the grid points; NaN leaves the cells that
+        touch the point empty
+    palette : str or Colormap, optional
+        Palette specification, as accepted by :func:`get_palette`
+        (default: the palette set by ``use(palette=...)``, else gnuplot's
+        default ``'rgbformulae 7,5,15'``)
+    colorbox : bool, optional
+        Whether to draw a gnuplot-style colorbox next to the axes
+        (default: True)
+    corners2color : {'mean', 'geomean', 'median', 'min', 'max'}, optional
+        How a cell's color value is computed from its four corners, like
+        gnuplot's ``set pm3d corners2color`` (default: 'mean')
+    **kwargs
+        Passed on to the artist, e.g. ``vmin``, ``vmax`` or ``norm``
+
+    Returns
+    -------
+    AxesImage, PcolorImage or QuadMesh
+        The color-mapped artist; its ``colorbar`` attribute holds the
+        colorbox, if drawn.
+
+    Raises
+    ------
+    ValueError
+        If the shapes do not match, the grid has fewer than 2x2 points, an
+        axis of a rectilinear grid is not monotonic or ``corners2color`` is
+        unknown.
+
+    Examples
+    --------
+    >>> x = np.linspace(-3, 3, 4000)
+    >>> X, Y = np.meshgrid(x, x)
+    >>> gp.pm3d(ax, X, Y, np.exp(-X**2 - Y**2), palette="rgbformulae 33,13,10")
+    """
+    Z = np.asarray(Z, dtype=float)
+    if Z.ndim != 2 or min(Z.shape) < 2:
+        raise ValueError(f"Z must be a 2-D grid of at least 2x2, got {Z.shape}")
+    reduce = _CORNERS2COLOR.get(corners2color)
+    if reduce is None:
+        raise ValueError(
+            f"corners2color must be one of {', '.join(_CORNERS2COLOR)}, "
+            f"got {corners2color!r}"
+        )
+    corners = np.stack([Z[:-1, :-1], Z[:-1, 1:], Z[1:, :-1], Z[1:, 1:]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        C = np.ma.masked_invalid(reduce(corners))
+
+    if palette is None and "cmap" not in kwargs:
+        # use(palette=...) registers its colormap as gnuplot_*
+        current = mpl.rcParams["image.cmap"]
+        palette = current if current.startswith("gnuplot_") else _PM3D_PALETTE
+    if palette is not None:
+        from .palette import get_palette
+
+        kwargs["cmap"] = get_palette(palette)
+
+    axes = _grid_axes(X, Y, Z.shape)
+    # Images are placed by an affine transform, so log axes need the mesh
+    linear = ax.get_xscale() == "linear" and ax.get_yscale() == "linear"
+    if axes is None or not linear:
+        if axes is not None:
+            X, Y = np.meshgrid(*axes)
+        X, Y = np.broadcast_arrays(
+            np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+        )
+        kwargs.setdefault("rasterized", True)
+        artist = ax.pcolormesh(X, Y, C, shading="flat", **kwargs)
+    else:
+        x, y = axes
+        # Order both axes increasingly so the cells map onto image rows
+        if x[0] > x[-1]:
+            x, C = x[::-1], C[:, ::-1]
+        if y[0] > y[-1]:
+            y, C = y[::-1], C[::-1]
+        if _is_regular(x) and _is_regular(y):
+            kwargs.setdefault("aspect", "auto")
+            kwargs.setdefault("interpolation", "nearest")
+            extent = (x[0], x[-1], y[0], y[-1])
+            artist = ax.imshow(C, origin="lower", extent=extent, **kwargs)
+        else:
+            artist = ax.pcolorfast(x, y, C, **kwargs)
+
+    if colorbox:
+        cbar = ax.figure.colorbar(artist, ax=ax, fraction=_COLORBOX_FRACTION)
+        cbar.outline.set_linewidth(mpl.rcParams["axes.linewidth"])
+        cbar.solids.set_rasterized(True)
+    return artist
+
+
+def _grid_axes(X: Any, Y: Any, shape: Tuple[int, int]) -> Optional[Tuple[Any, Any]]:
+    """Return the 1-d x and y axes of a rectilinear grid, or None.
+
+    Raises ValueError if the coordinates do not match ``shape`` or an axis
+    is not monotonic.
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if X.ndim == 1 and Y.ndim == 1:
+        x, y = X, Y
+    else:
+        try:
+            X, Y = (np.broadcast_to(a, shape) for a in (X, Y))
+        except ValueError:
+            raise ValueError(
+                f"X and Y must match Z's shape {shape}, got {X.shape} and {Y.shape}"
+            ) from None
+        if not (np.all(X == X[:1]) and np.all(Y == Y[:, :1])):
+            return None
+        x, y = X[0], Y[:, 0]
+    if (y.size, x.size) != shape:
+        raise ValueError(
+            f"X and Y must have {shape[1]} and {shape[0]} points, "
+            f"got {x.size} and {y.size}"
+        )
+    for name, axis in (("X", x), ("Y", y)):
+        step = np.diff(axis)
+        if not (np.all(step > 0) or np.all(step < 0)):
+            raise ValueError(f"{name} must be strictly monotonic")
+    return x, y
+
+
+def _is_regular(axis: np.ndarray) -> bool:
+    """Return whether the points of an increasing axis are evenly spaced."""
+    even = np.linspace(axis[0], axis[-1], axis.size)
+    step = (axis[-1] - axis[0]) / (axis.size - 1)
+    return bool(np.abs(axis - even).max() <= _REGULAR_TOL * step)
@@ -0,0 +1,269 @@
+"""Batch rendering of gnuplot-styled figures in worker processes."""
+
+import io
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from .constants import STYLE_MAP
+
+# A job builds and returns a Figure; a (job, basepath) pair also names the files
+Job = Union[Callable[[], Any], Sequence[Any]]
+Result = Union[List[str], Dict[str, bytes]]
+
+
+def render_many(
+    jobs: Iterable[Job],
+    workers: Optional[int] = None,
+    style: str = "color",
+    formats: Sequence[str] = ("png",),
+    apply_mplstyle: bool = True,
+    cycle_mode: str = "default",
+    skip_no_marker: bool = False,
+    loop_order: str = "mlc",
+    profile: str = "default",
+    pointinterval: Optional[int] = None,
+    palette: Any = None,
+) -> List[Result]:
+    """Build and save many figures in a pool of pre-styled worker processes.
+
+    Each worker imports matplotlib with the Agg backend, calls :func:`use`
+    with the given configuration and saves a small warm-up figure in every
+    format once, so the font cache, the style and the output backends are
+    ready before the first job. Per job, only the figure is built and saved.
+
+    Parameters
+    ----------
+    jobs : iterable
+        Figure builders. Each is either a picklable callable taking no
+        arguments and returning a Figure (e.g. a module-level function or a
+        ``functools.partial``), or a ``(callable, basepath)`` pair whose
+        figure is written to ``basepath + '.' + fmt`` for every format.
+    workers : int, optional
+        Number of worker processes (default: ``os.cpu_count()``)
+    style : str, optional
+        Style to apply in every worker, as accepted by :func:`use`
+        (default: 'color')
+    formats : sequence of str, optional
+        Output formats, e.g. ``('png', 'pdf', 'svg')`` (default: ``('png',)``)
+    apply_mplstyle, cycle_mode, skip_no_marker, loop_order, profile
+    pointinterval, palette
+        Passed on to :func:`use` in every worker
+
+    Returns
+    -------
+    list
+        One result per job, in job order: the list of written paths for a
+        ``(callable, basepath)`` job, or a dict mapping each format to the
+        encoded file contents for a bare callable.
+
+    Raises
+    ------
+    ValueError
+        If an unknown style, profile, pointinterval or palette is provided.
+
+    Examples
+    --------
+    >>> def make_figure():
+    ...     fig, ax = plt.subplots()
+    ...     ax.plot([0, 1], [0, 1])
+    ...     return fig
+    >>> render_many([(make_figure, "out/a"), make_figure], style="cl",
+    ...             formats=("png", "pdf"))
+    [['out/a.png', 'out/a.pdf'], {'png': b'...', 'pdf': b'...'}]
+    """
+    from .core import _build_prop_cycle, _check_profile, _markevery, _palette_name
+
+    # Validate in the parent so a bad style fails before any worker starts
+    _build_prop_cycle(
+        STYLE_MAP.get(style, style),
+        cycle_mode,
+        skip_no_marker,
+        loop_order,
+        _markevery(pointinterval),
+    )
+    _check_profile(profile)
+    _palette_name(palette)
+
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    use_kwargs = {
+        "apply_mplstyle": apply_mplstyle,
+        "cycle_mode": cycle_mode,
+        "skip_no_marker": skip_no_marker,
+        "loop_order": loop_order,
+        "profile": profile,
+        "pointinterval": pointinterval,
+        "palette": palette,
+    }
+    formats = tuple(formats)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(style, use_kwargs, formats),
+    ) as executor:
+        return list(executor.map(_render_job, jobs, [formats] * len(jobs)))
+
+
+def _init_worker(
+    style: str, use_kwargs: Dict[str, Any], formats: Sequence[str]
+) -> None:
+    """Set up a worker process: Agg backend, gnuplot style and warm caches."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    from matplotlib.figure import Figure
+
+    from .core import use
+
+    use(style, **use_kwargs)
+
+    # Loads the font cache and imports the backend of every output format
+    fig = Figure()
+    fig.subplots().set_title("warm-up")
+    for fmt in formats:
+        fig.savefig(io.BytesIO(), format=fmt)
+
+
+def savefig_many(
+    fig: Any,
+    basepath: Optional[str] = None,
+    formats: Sequence[str] = ("png", "pdf", "svg"),
+    executor: Optional[Executor] = None,
+    **kwargs: Any,
+) -> Any:
+    """Save a figure in several formats with a single layout pass.
+
+    Calling ``fig.savefig`` once per format runs the layout engine and, with
+    ``savefig.bbox: tight`` from gnuplot.mplstyle, an extra draw to measure
+    the tight bounding box for every file. Here the layout and the bounding
+    box are computed once and every format is rendered with them, so each
+    output costs a single draw.
+
+    Parameters
+    ----------
+    fig : Figure
+        The figure to save
+    basepath : str or path-like, optional
+        Files are written to ``basepath + '.' + fmt``. If None, nothing is
+        written and the encoded contents are returned instead.
+    formats : sequence of str, optional
+        Output formats (default: ``('png', 'pdf', 'svg')``)
+    executor : concurrent.futures.Executor, optional
+        If given, the rendered files are written by tasks submitted to it
+        (e.g. a ``ThreadPoolExecutor``), so the caller can build the next
+        figure while the files are written
+    **kwargs
+        Passed on to ``fig.savefig``, e.g. ``dpi`` or ``bbox_inches``
+
+    Returns
+    -------
+    list of str, list of Future or dict
+        The written paths in format order; with an ``executor``, futures
+        that resolve to those paths; without a ``basepath``, a dict mapping
+        each format to the encoded file contents.
+
+    Notes
+    -----
+    The tight bounding box is measured once with the figure's own renderer
+    at the save dpi and reused for every format, so vector outputs may be
+    cropped a fraction of a point differently from a separate
+    ``savefig(bbox_inches='tight')`` call. The layout engine is switched off
+    while the formats are rendered and restored afterwards.
+
+    Examples
+    --------
+    >>> savefig_many(fig, "out/figure", dpi=150)
+    ['out/figure.png', 'out/figure.pdf', 'out/figure.svg']
+
+    >>> with ThreadPoolExecutor() as pool:
+    ...     for name, make_figure in jobs:
+    ...         savefig_many(make_figure(), name, executor=pool)
+    """
+    contents = _render_formats(fig, formats, **kwargs)
+    if basepath is None:
+        return contents
+    paths = [f"{os.fspath(basepath)}.{fmt}" for fmt in contents]
+    if executor is None:
+        return [_write_file(path, data) for path, data in zip(paths, contents.values())]
+    return [
+        executor.submit(_write_file, path, data)
+        for path, data in zip(paths, contents.values())
+    ]
+
+
+def _render_formats(
+    fig: Any, formats: Sequence[str], **kwargs: Any
+) -> Dict[str, bytes]:
+    """Encode ``fig`` in every format, laying it out only once."""
+    import matplotlib as mpl
+
+    if not hasattr(fig, "get_layout_engine"):
+        # matplotlib < 3.6 cannot run the layout outside a draw
+        return {fmt: _encode(fig, fmt, **kwargs) for fmt in formats}
+
+    bbox_inches = kwargs.pop("bbox_inches", mpl.rcParams["savefig.bbox"])
+    pad_inches = kwargs.get("pad_inches", mpl.rcParams["savefig.pad_inches"])
+    dpi = kwargs.get("dpi", mpl.rcParams["savefig.dpi"])
+    if dpi == "figure":
+        dpi = fig.dpi
+    engine = fig.get_layout_engine()
+
+    # Lay out and measure at the save dpi, as savefig itself would
+    figure_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        if engine is not None:
+            engine.execute(fig)
+        if bbox_inches == "tight" and pad_inches != "layout":
+            extra = kwargs.pop("bbox_extra_artists", None)
+            tight = fig.get_tightbbox(bbox_extra_artists=extra)
+            bbox_inches = tight.padded(pad_inches)
+    finally:
+        fig.dpi = figure_dpi
+
+    if engine is not None:
+        fig.set_layout_engine("none")
+    try:
+        return {
+            fmt: _encode(fig, fmt, bbox_inches=bbox_inches, **kwargs) for fmt in formats
+        }
+    finally:
+        if engine is not None:
+            fig.set_layout_engine(engine)
+
+
+def _encode(fig: Any, fmt: str, **kwargs: Any) -> bytes:
+    """Return the contents of ``fig`` saved in format ``fmt``."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def _write_file(path: str, data: bytes) -> str:
+    """Write ``data`` to ``path`` and return the path."""
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _render_job(job: Job, formats: Sequence[str]) -> Result:
+    """Build the figure of one job and save it in every format."""
+    if callable(job):
+        builder, basepath = job, None
+    else:
+        builder, basepath = job
+    fig = builder()
+    try:
+        return savefig_many(fig, basepath, formats)
+    finally:
+        # Figures made with pyplot stay registered until closed
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close(fig)
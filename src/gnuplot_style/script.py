@@ -0,0 +1,488 @@
+"""Run a subset of gnuplot scripts with matplotlib."""
+
+import os
+import re
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import matplotlib as mpl
+import numpy as np
+
+from .constants import COLORS, LINE_STYLES
+from .cycle import marker_style
+from .data import DataFile
+from .legend import _POSITION_WORDS, key
+from .plotting import _point_stride
+
+# Upper bound on the number of compiled scripts and loaded data selections
+_PLAN_CACHE_SIZE = 32
+_DATA_CACHE_SIZE = 64
+
+# Quoted strings, [ranges], separators and bare words; '#' starts a comment
+_TOKEN = re.compile(r"'[^']*'|\"(?:\\.|[^\"\\])*\"|\[[^\]]*\]|[,;]|#.*|[^\s,;#]+")
+
+# Abbreviations gnuplot accepts for the supported keywords
+_PLOT_KEYWORDS = {
+    "i": "index",
+    "index": "index",
+    "every": "every",
+    "u": "using",
+    "using": "using",
+    "w": "with",
+    "with": "with",
+    "t": "title",
+    "ti": "title",
+    "title": "title",
+    "notitle": "notitle",
+    "lt": "linetype",
+    "linetype": "linetype",
+    "lc": "linecolor",
+    "linecolor": "linecolor",
+    "dt": "dashtype",
+    "dashtype": "dashtype",
+    "pt": "pointtype",
+    "pointtype": "pointtype",
+    "ps": "pointsize",
+    "pointsize": "pointsize",
+    "lw": "linewidth",
+    "linewidth": "linewidth",
+    "pi": "pointinterval",
+    "pointinterval": "pointinterval",
+    "pn": "pointnumber",
+    "pointnumber": "pointnumber",
+}
+_WITH_STYLES = {
+    "l": "lines",
+    "lines": "lines",
+    "p": "points",
+    "points": "points",
+    "lp": "linespoints",
+    "linespoints": "linespoints",
+}
+_SET_OPTIONS = {
+    "title": "title",
+    "xlabel": "xlabel",
+    "xlab": "xlabel",
+    "ylabel": "ylabel",
+    "ylab": "ylabel",
+    "xrange": "xrange",
+    "xr": "xrange",
+    "yrange": "yrange",
+    "yr": "yrange",
+    "logscale": "logscale",
+    "log": "logscale",
+    "key": "key",
+    "grid": "grid",
+    "style": "style",
+}
+
+# Axes state left by an empty script; 'set' and 'unset' commands change it
+_DEFAULT_SETTINGS = {
+    "title": "",
+    "xlabel": "",
+    "ylabel": "",
+    "xrange": (None, None),
+    "yrange": (None, None),
+    "xscale": "linear",
+    "yscale": "linear",
+    "key": "top right",
+    "grid": None,
+    "style": "points",
+}
+
+
+class _PlotItem(NamedTuple):
+    """One data file plotted by a ``plot`` command."""
+
+    path: str
+    index: Optional[str]
+    every: Optional[str]
+    using: Optional[str]
+    # Sorted (property, value) pairs for Axes.plot, label included
+    style: Tuple[Tuple[str, Any], ...]
+
+
+class _Plan(NamedTuple):
+    """The compiled form of a script: final axes settings and plot items."""
+
+    settings: Tuple[Tuple[str, Any], ...]
+    items: Tuple[_PlotItem, ...]
+
+
+# Per axes: the (item, data stamp) load key and the line drawn for each plot item
+_RENDERED: "weakref.WeakKeyDictionary[Any, List[Tuple[Any, Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def run_script(script: Any, ax: Optional[Any] = None) -> Any:
+    """Draw a gnuplot script's data plot with matplotlib.
+
+    The script is compiled once into a plan of axes settings and plot
+    items; plans are cached by script text, or by path and modification
+    time for script files. Loaded data columns are cached by data file and
+    modification time. Running a script again on the same axes only
+    redraws the plot items whose style or data file changed, so the call
+    can be repeated cheaply in a watch loop.
+
+    Supported syntax:
+
+    - ``plot 'file' [index ...] [every ...] [using a:b] [with lines|points|
+      linespoints] [lt n] [lc n | lc rgb 'color'] [dt n] [pt n] [ps x]
+      [pi n | pn n] [lw x] [title 'text' | notitle]``, with several
+      comma-separated items, gnuplot's abbreviations and ``''`` for the
+      previous file. ``lt``/``lc`` pick ``COLORS[(n-1) % 8]``, ``dt``
+      picks ``LINE_STYLES[(n-1) % 9]`` and ``pt`` picks
+      ``MARKERS[n % 17]``; item ``i`` defaults to ``lt i`` and ``pt i``.
+      ``pi n`` draws a marker on every nth point and ``pn n`` at most n
+      markers, evenly spread over the item's points.
+    - ``set``/``unset`` of ``title``, ``xlabel``, ``ylabel``, ``xrange``,
+      ``yrange``, ``logscale``, ``key``, ``grid`` and ``style data``.
+      Other settings (terminal, output, tics, ...) are ignored.
+
+    Parameters
+    ----------
+    script : str or path-like
+        Path of a script file, or the script text itself. Data files are
+        looked up relative to the script's directory.
+    ax : Axes, optional
+        The axes to draw on (default: a new figure's axes)
+
+    Returns
+    -------
+    Axes
+        The axes drawn on.
+
+    Raises
+    ------
+    ValueError
+        If the script uses unsupported plot syntax or has no plot command.
+
+    Examples
+    --------
+    >>> gp.use("cl")
+    >>> ax = gp.run_script("fig1.gp")
+    >>> while True:  # watch loop: only changed items are redrawn
+    ...     gp.run_script("fig1.gp", ax=ax)
+    ...     ax.figure.savefig("fig1.png")
+    ...     time.sleep(1)
+    """
+    if isinstance(script, str) and ("\n" in script or not os.path.isfile(script)):
+        plan, base = _compile(script), os.getcwd()
+    else:
+        path = os.path.realpath(os.fspath(script))
+        stat = os.stat(path)
+        plan = _compile_file(path, stat.st_mtime_ns, stat.st_size)
+        base = os.path.dirname(path)
+
+    if ax is None:
+        import matplotlib.pyplot as plt
+
+        ax = plt.figure().add_subplot()
+
+    rendered = _RENDERED.setdefault(ax, [])
+    changed = False
+    for i, item in enumerate(plan.items):
+        path = os.path.join(base, item.path)
+        stat = os.stat(path)
+        load_key = (item, path, stat.st_mtime_ns, stat.st_size)
+        old_load_key, line = rendered[i] if i < len(rendered) else (None, None)
+        if line is not None and line.axes is not ax:
+            # Removed from the axes since the last run
+            line = None
+        if line is not None and old_load_key == load_key:
+            continue
+        x, y = _load(*load_key[1:], item.index, item.every, item.using)
+        if line is not None and old_load_key[0] == item:
+            # Same style, new data
+            line.set_data(x, y)
+        else:
+            if line is not None:
+                line.remove()
+            (line,) = ax.plot(x, y, **_plot_kwargs(item.style))
+        pointnumber = dict(item.style).get("pointnumber")
+        if pointnumber is not None:
+            line.set_markevery(_point_stride(len(x), pointnumber))
+        if i < len(rendered):
+            rendered[i] = (load_key, line)
+        else:
+            rendered.append((load_key, line))
+        changed = True
+    for _, line in rendered[len(plan.items) :]:
+        if line.axes is ax:
+            line.remove()
+        changed = True
+    del rendered[len(plan.items) :]
+
+    _apply_settings(ax, dict(plan.settings), [line for _, line in rendered], changed)
+    return ax
+
+
+def _apply_settings(
+    ax: Any, settings: Dict[str, Any], lines: List[Any], relim: bool
+) -> None:
+    """Bring the axes decorations in line with the script's settings."""
+    ax.set_title(settings["title"])
+    ax.set_xlabel(settings["xlabel"])
+    ax.set_ylabel(settings["ylabel"])
+    ax.set_xscale(settings["xscale"])
+    ax.set_yscale(settings["yscale"])
+    grid = settings["grid"]
+    ax.grid(mpl.rcParams["axes.grid"] if grid is None else grid)
+
+    if relim:
+        ax.relim()
+    for axis, (low, high) in (("x", settings["xrange"]), ("y", settings["yrange"])):
+        getattr(ax, f"set_autoscale{axis}_on")(True)
+        ax.autoscale_view(scalex=axis == "x", scaley=axis == "y")
+        if low is not None or high is not None:
+            getattr(ax, f"set_{axis}lim")(low, high)
+
+    legend = ax.get_legend()
+    if legend is not None:
+        legend.remove()
+    handles = [line for line in lines if not line.get_label().startswith("_")]
+    if settings["key"] is not None and handles:
+        key(ax, handles, position=settings["key"])
+
+
+@lru_cache(maxsize=_PLAN_CACHE_SIZE)
+def _compile_file(path: str, mtime_ns: int, size: int) -> _Plan:
+    """Compile a script file; memoized on its path, mtime and size."""
+    with open(path) as f:
+        return _compile(f.read())
+
+
+@lru_cache(maxsize=_PLAN_CACHE_SIZE)
+def _compile(text: str) -> _Plan:
+    """Compile script text into its final axes settings and plot items."""
+    settings = dict(_DEFAULT_SETTINGS)
+    items: Optional[Tuple[_PlotItem, ...]] = None
+    for command in _commands(text):
+        name = command[0]
+        if name in ("plot", "p", "pl"):
+            items = _compile_plot(command[1:], settings["style"])
+        elif name in ("set", "unset") and len(command) > 1:
+            option = _SET_OPTIONS.get(command[1])
+            if option is not None:
+                _compile_set(settings, name == "set", option, command[2:])
+    if items is None:
+        raise ValueError("The script has no plot command")
+    return _Plan(tuple(settings.items()), items)
+
+
+def _commands(text: str) -> List[List[str]]:
+    """Split script text into commands of tokens, without comments."""
+    commands: List[List[str]] = []
+    for line in text.replace("\\\n", " ").splitlines():
+        command: List[str] = []
+        for token in _TOKEN.findall(line):
+            if token.startswith("#"):
+                break
+            if token == ";":
+                commands.append(command)
+                command = []
+            else:
+                command.append(token)
+        commands.append(command)
+    return [command for command in commands if command]
+
+
+def _compile_set(
+    settings: Dict[str, Any], enable: bool, option: str, args: List[str]
+) -> None:
+    """Record the effect of one ``set`` or ``unset`` command."""
+    if option in ("title", "xlabel", "ylabel"):
+        settings[option] = _unquote(args[0]) if enable and args else ""
+    elif option in ("xrange", "yrange"):
+        settings[option] = _parse_range(args[0]) if enable and args else (None, None)
+    elif option == "logscale":
+        axes = args[0] if args else "xy"
+        for axis in "xy":
+            if axis in axes:
+                settings[f"{axis}scale"] = "log" if enable else "linear"
+    elif option == "key":
+        settings["key"] = _key_location(args) if enable else None
+    elif option == "grid":
+        settings["grid"] = enable
+    elif option == "style" and len(args) == 2 and args[0] == "data":
+        settings["style"] = _WITH_STYLES.get(args[1], settings["style"])
+
+
+def _compile_plot(tokens: List[str], default_style: str) -> Tuple[_PlotItem, ...]:
+    """Compile the comma-separated items of a ``plot`` command."""
+    items: List[_PlotItem] = []
+    groups: List[List[str]] = [[]]
+    for token in tokens:
+        if token == ",":
+            groups.append([])
+        else:
+            groups[-1].append(token)
+
+    previous = None
+    for number, group in enumerate(groups, start=1):
+        if not group or group[0][0] not in "'\"":
+            raise ValueError(
+                f"Unsupported plot item {' '.join(group)!r}; "
+                "only data files are supported"
+            )
+        path = _unquote(group[0]) or previous
+        if path is None:
+            raise ValueError("'' refers to a previous data file, but there is none")
+        previous = path
+
+        options: Dict[str, Any] = {
+            "with": default_style,
+            "linetype": number,
+            "pointtype": number,
+        }
+        i = 1
+        while i < len(group):
+            keyword = _PLOT_KEYWORDS.get(group[i])
+            if keyword is None:
+                raise ValueError(f"Unsupported plot option {group[i]!r}")
+            if keyword == "notitle":
+                options["title"] = None
+                i += 1
+                continue
+            if i + 1 >= len(group):
+                raise ValueError(f"Plot option {group[i]!r} needs a value")
+            value = group[i + 1]
+            if keyword == "linecolor" and value == "rgb" and i + 2 < len(group):
+                value = _unquote(group[i + 2])
+                i += 1
+            elif keyword == "title":
+                value = _unquote(value)
+            options[keyword] = value
+            i += 2
+
+        if "title" not in options:
+            # gnuplot's default key entry
+            using = options.get("using")
+            options["title"] = f"'{path}'" + (f" using {using}" if using else "")
+        items.append(
+            _PlotItem(
+                path,
+                options.get("index"),
+                options.get("every"),
+                options.get("using"),
+                _line_style(options),
+            )
+        )
+    return tuple(items)
+
+
+def _line_style(options: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Return the Axes.plot properties of one plot item.
+
+    ``linewidth`` and ``markersize`` are factors of the rcParams defaults,
+    as gnuplot's ``lw`` and ``ps`` are; see :func:`_plot_kwargs`.
+    """
+    style = _WITH_STYLES.get(options["with"])
+    if style is None:
+        raise ValueError(f"Unsupported plot style 'with {options['with']}'")
+    try:
+        linetype = int(options["linetype"])
+        color = options.get("linecolor", linetype)
+        if not isinstance(color, str) or color.lstrip("-").isdigit():
+            color = COLORS[(int(color) - 1) % len(COLORS)]
+        dashtype = int(options.get("dashtype", 1))
+        pointtype = int(options["pointtype"])
+        pointsize = float(options.get("pointsize", 1))
+        linewidth = float(options.get("linewidth", 1))
+        pointinterval = int(options.get("pointinterval", 1))
+        pointnumber = options.get("pointnumber")
+        if pointnumber is not None:
+            pointnumber = int(pointnumber)
+    except ValueError as err:
+        raise ValueError(f"Invalid plot option value: {err}") from None
+    if pointinterval < 1 or (pointnumber is not None and pointnumber < 1):
+        raise ValueError("pointinterval and pointnumber must be positive")
+
+    # Widths and sizes stay relative to the rcParams until the item is drawn
+    props: Dict[str, Any] = {
+        "color": color,
+        "label": options["title"] if options["title"] else "_nolegend_",
+        "linewidth": linewidth,
+    }
+    if style == "points":
+        props["linestyle"] = "none"
+    else:
+        props["linestyle"] = LINE_STYLES[(dashtype - 1) % len(LINE_STYLES)]
+    if style == "lines":
+        props["marker"] = "None"
+    else:
+        # The shared MarkerStyle carries the fill and is used without a copy
+        props["marker"] = marker_style(pointtype)
+        props["markersize"] = pointsize
+        if pointinterval > 1:
+            props["markevery"] = pointinterval
+        if pointnumber is not None:
+            # Resolved into a markevery stride once the data is loaded
+            props["pointnumber"] = pointnumber
+    return tuple(sorted(props.items()))
+
+
+def _plot_kwargs(style: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+    """Return the Axes.plot keywords of a compiled style, in current units."""
+    kwargs = dict(style)
+    kwargs.pop("pointnumber", None)
+    kwargs["linewidth"] *= mpl.rcParams["lines.linewidth"]
+    if "markersize" in kwargs:
+        kwargs["markersize"] *= mpl.rcParams["lines.markersize"]
+    return kwargs
+
+
+def _unquote(token: str) -> str:
+    """Strip the quotes of a gnuplot string token."""
+    if len(token) >= 2 and token[0] == token[-1] and token[0] in "'\"":
+        return token[1:-1]
+    return token
+
+
+def _parse_range(token: str) -> Tuple[Optional[float], Optional[float]]:
+    """Parse ``[low:high]``; empty or ``*`` bounds are autoscaled."""
+    if not (token.startswith("[") and token.endswith("]")) or ":" not in token:
+        raise ValueError(f"Invalid range {token!r}")
+    low, high = token[1:-1].split(":", 1)
+    return tuple(  # type: ignore[return-value]
+        None if bound.strip() in ("", "*") else float(bound) for bound in (low, high)
+    )
+
+
+def _key_location(args: List[str]) -> Optional[str]:
+    """Return the key position of ``set key [off|on|top|bottom|left|...]``."""
+    if "off" in args:
+        return None
+    words = [word for word in args if word in _POSITION_WORDS]
+    return " ".join(words) if words else "top right"
+
+
+@lru_cache(maxsize=_DATA_CACHE_SIZE)
+def _load(
+    path: str,
+    mtime_ns: int,
+    size: int,
+    index: Optional[str],
+    every: Optional[str],
+    using: Optional[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Load the x and y columns of a plot item; memoized per file version."""
+    with DataFile(path) as data:
+        if using is None:
+            columns = data.read(index=index, every=every, gaps=True)
+            if len(columns) == 1:
+                # A single column is plotted against the point number
+                columns = data.read(index=index, every=every, using="0:1", gaps=True)
+        else:
+            if ":" not in using:
+                # 'using 2' plots column 2 against the point number
+                using = "0:" + using
+            columns = data.read(index=index, every=every, using=using, gaps=True)
+    if len(columns) < 2:
+        raise ValueError(f"using {using} selects {len(columns)} column(s), need 2")
+    x, y = columns[0], columns[1]
+    for array in (x, y):
+        array.setflags(write=False)
+    return x, y
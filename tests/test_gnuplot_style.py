@@ -1,5 +1,6 @@
 """Tests for gnuplot_style package."""
 
+import io
 import os
 import sys
 
@@ -22,12 +23,77 @@ def test_import():
     assert gp.__version__ == "0.1.3"
 
 
+def test_import_is_lazy():
+    """Test that importing the package does not pull in matplotlib."""
+    import subprocess
+
+    src = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {src!r})\n"
+        "start = time.perf_counter()\n"
+        "import gnuplot_style as gp\n"
+        "elapsed = time.perf_counter() - start\n"
+        "loaded = 'matplotlib' in sys.modules\n"
+        "gp.use('all')\n"
+        "print(elapsed, loaded, 'matplotlib.pyplot' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    elapsed, mpl_loaded, pyplot_loaded = result.stdout.split()
+
+    assert mpl_loaded == "False"
+    # Even applying a style never needs pyplot (no backend selection)
+    assert pyplot_loaded == "False"
+    # Import-time budget; typically well under 0.05 s
+    assert float(elapsed) < 0.5
+
+
 def test_colors_constant():
     """Test that COLORS constant is accessible and correct."""
     assert len(gp.COLORS) == 8
     assert gp.COLORS[0] == "#9400D3"
 
 
+def test_linetype_pointtype_lookups():
+    """Test the RGBA table and the vectorized line/point type lookups."""
+    from matplotlib.colors import to_rgba_array
+
+    np.testing.assert_array_equal(gp.COLORS_RGBA, to_rgba_array(gp.COLORS))
+    assert gp.COLORS_RGBA.shape == (8, 4)
+    with pytest.raises(ValueError):
+        gp.COLORS_RGBA[0, 0] = 1.0
+
+    color, dashes = gp.linetype(10)
+    np.testing.assert_array_equal(color, gp.COLORS_RGBA[2])
+    assert dashes == gp.LINE_STYLES[1]
+
+    idx = np.array([[0, 8], [9, 17]])
+    colors, dashes = gp.linetype(idx)
+    assert colors.shape == (2, 2, 4)
+    np.testing.assert_array_equal(colors[1, 1], gp.COLORS_RGBA[1])
+    assert dashes.shape == (2, 2)
+    assert dashes[0, 1] == gp.LINE_STYLES[8]
+    assert dashes[1, 0] == gp.LINE_STYLES[0]
+
+    assert gp.pointtype(24) == (gp.MARKERS[7], gp.FILL_STYLES[7])
+    markers, fills = gp.pointtype(np.arange(34))
+    assert markers.tolist() == gp.MARKERS * 2
+    assert fills.tolist() == gp.FILL_STYLES * 2
+
+    # Point types are pre-built once and shared without copies
+    from matplotlib.lines import Line2D
+
+    marker = gp.marker_style(24)
+    assert marker is gp.marker_style(7)
+    assert (marker.get_marker(), marker.get_fillstyle()) == gp.pointtype(7)
+    assert list(gp.marker_style(np.array([6, 23]))) == [gp.marker_style(6)] * 2
+    line = Line2D([], [], marker=marker)
+    assert line.get_fillstyle() == "none" and line.get_marker() == "o"
+    assert gp.marker_style(6).is_filled() and not marker.is_filled()
+
+
 def test_use_color():
     """Test applying color style."""
     gp.use("color")
@@ -74,6 +140,546 @@ def test_apply_pattern():
     plt.close(fig)
 
 
+def test_apply_pattern_bulk():
+    """Test per-bar pattern indices, lists of containers and collections."""
+    from matplotlib.patches import Rectangle
+
+    fig, ax = plt.subplots()
+    first = ax.bar([1, 2, 3], [1, 2, 3])
+    second = ax.bar([4, 5, 6], [1, 2, 3])
+
+    gp.apply_pattern([first, second], [0, 1, 3, 4, 9, 3], color="red")
+    patches = list(first) + list(second)
+    assert patches[0].get_hatch() is None
+    assert patches[1].get_hatch() == gp.PATTERNS[1]
+    assert patches[1].get_facecolor()[3] == 0  # 'none'
+    assert patches[2].get_facecolor() == (1.0, 0.0, 0.0, 1.0)
+    assert patches[3].get_hatch() == gp.PATTERNS[4]
+    assert patches[4].get_hatch() is None  # out of range: unchanged
+
+    with pytest.raises(ValueError):
+        gp.apply_pattern(first, [1, 2])
+
+    # The bulk path hides the bars behind one collection per pattern
+    third = ax.bar([7, 8, 9, 10], [1, 2, 3, 4], bottom=1)
+    collections = gp.apply_pattern(third, [2, 5, 2, 9], collection=True)
+    assert [c.get_hatch() for c in collections] == [gp.PATTERNS[2], gp.PATTERNS[5]]
+    np.testing.assert_allclose(
+        collections[0].get_paths()[1].vertices[:4],
+        [[8.6, 1], [9.4, 1], [9.4, 4], [8.6, 4]],
+    )
+    assert [p.get_visible() for p in third] == [False, False, False, True]
+    with pytest.raises(ValueError, match="on an axes"):
+        gp.apply_pattern([Rectangle((0, 0), 1, 1)], 1, collection=True)
+
+    plt.close(fig)
+
+
+def test_pattern_bars():
+    """Test drawing bars as one collection per distinct pattern."""
+    fig, ax = plt.subplots()
+    n = 10000
+    x = np.arange(n)
+    collections = gp.pattern_bars(ax, x, np.ones(n), pattern=x % 3)
+
+    assert len(collections) == 3
+    assert [len(c.get_paths()) for c in collections] == [3334, 3333, 3333]
+    assert [c.get_hatch() for c in collections] == gp.PATTERNS[:3]
+    assert len(ax.patches) == 0
+    assert ax.get_xlim()[1] >= n - 0.6
+
+    (solid,) = gp.pattern_bars(ax, [1, 2], [3, 4], pattern=3, color="black")
+    assert tuple(solid.get_facecolor()[0]) == (0.0, 0.0, 0.0, 1.0)
+
+    with pytest.raises(ValueError):
+        gp.pattern_bars(ax, [1], [1], pattern=8)
+
+    plt.close(fig)
+
+
+def test_histogram():
+    """Test clustered and stacked histogram layouts."""
+    table = np.array([[1.0, 2.0, 3.0], [4.0, np.nan, 6.0]])
+    fig, ax = plt.subplots()
+
+    collections = gp.histogram(ax, table, gap=1, labels=["a", "b", "c"])
+    assert len(collections) == 3 and len(ax.patches) == 0
+    assert [c.get_hatch() for c in collections] == gp.PATTERNS[:3]
+    assert collections[2].get_label() == "c"
+    # Three boxes and a gap of one box width per unit
+    left, bottom = collections[0].get_paths()[1].vertices[0]
+    assert np.isclose(left, 1 - 1.5 * 0.25) and bottom == 0.0
+    assert np.allclose(collections[1].get_paths()[1].vertices[:, 1], 0.0)
+
+    collections = gp.histogram(ax, table, mode="rowstacked", patterns=False)
+    assert [tuple(c.get_facecolor()[0][:3]) for c in collections] == [
+        plt.matplotlib.colors.to_rgb(c) for c in gp.COLORS[:3]
+    ]
+    tops = [c.get_paths()[1].vertices[2, 1] for c in collections]
+    assert tops == [4.0, 4.0, 10.0]
+
+    collections = gp.histogram(
+        ax, table, mode="columnstacked", patterns=[4, 5], xticklabels="xyz"
+    )
+    assert len(collections) == 2
+    assert collections[1].get_paths()[2].vertices[2, 1] == 9.0
+    assert [t.get_text() for t in ax.get_xticklabels()] == ["x", "y", "z"]
+
+    with pytest.raises(ValueError):
+        gp.histogram(ax, table, mode="stacked")
+    with pytest.raises(ValueError):
+        gp.histogram(ax, table, patterns=[1, 2])
+    plt.close(fig)
+
+
+def test_patterns_at_creation():
+    """Test that bars pick up pattern fills when they are created."""
+    styles = gp.patterns()
+    assert len(styles) == len(gp.PATTERNS)
+
+    fig, ax = plt.subplots()
+    x = np.arange(3)
+    containers = [
+        ax.bar(x + 0.1 * k, [1, 2, 3], width=0.1, **style)
+        for k, style in zip(range(10), styles())
+    ]
+    for k, bars in enumerate(containers):
+        pattern = k % len(gp.PATTERNS)
+        assert bars[0].get_hatch() == gp.PATTERNS[pattern]
+        filled = gp.PATTERN_FILL_STYLES[pattern] == "full"
+        assert (bars[0].get_facecolor()[3] == 1) == filled
+
+    plt.close(fig)
+
+
+def test_scatter_groups_point_types():
+    """Test one collection per point type with per-point colors."""
+    from matplotlib.colors import to_rgba
+
+    fig, ax = plt.subplots()
+    pt = np.array([7, 8, 0, 7, 2, 24, 8])  # 24 wraps around to 7
+    lc = np.array([0, 1, 2, 3, 4, 5, 9])  # 9 wraps around to 1
+    x = np.arange(len(pt), dtype=float)
+    collections = gp.scatter(ax, x, x * 2, pt=pt, lc=lc)
+
+    # Point type 0 (no symbol) is skipped
+    assert len(collections) == 3
+    assert list(ax.collections) == collections
+    plus, open_circles, filled_circles = collections
+
+    np.testing.assert_array_equal(open_circles.get_offsets()[:, 0], [0, 3, 5])
+    assert len(open_circles.get_facecolors()) == 0
+    np.testing.assert_allclose(
+        open_circles.get_edgecolors(),
+        [to_rgba(gp.COLORS[i]) for i in (0, 3, 5)],
+    )
+    np.testing.assert_allclose(
+        filled_circles.get_facecolors(),
+        [to_rgba(gp.COLORS[i]) for i in (1, 1)],
+    )
+    np.testing.assert_array_equal(plus.get_offsets(), [[4, 8]])
+
+    # Scalar styles broadcast over the points
+    (single,) = gp.scatter(ax, [0, 1], [1, 0], pt=5, lc=2, s=20)
+    np.testing.assert_array_equal(single.get_sizes(), [20])
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def test_multiline_matches_plot_cycle():
+    """Test that multiline styles rows like successive plot() calls."""
+    from matplotlib.colors import to_rgba, to_rgba_array
+
+    gp.use("cl", cycle_mode="extended")
+    x = np.linspace(0, 1, 5)
+    Y = np.arange(20)[:, None] + x
+    labels = [f"row {i}" for i in range(20)]
+
+    fig, (ax_lines, ax_multi) = plt.subplots(1, 2)
+    lines = [ax_lines.plot(x, y)[0] for y in Y]
+    collections, handles = gp.multiline(ax_multi, x, Y, labels=labels)
+
+    # 20 rows of the extended cycle use 3 dash patterns: 8 + 8 + 4 rows
+    assert [len(c.get_segments()) for c in collections] == [8, 8, 4]
+    for line, handle in zip(lines, handles):
+        assert to_rgba(handle.get_color()) == to_rgba(line.get_color())
+        assert handle.get_linestyle() == line.get_linestyle()
+    assert [h.get_label() for h in handles] == labels
+    np.testing.assert_array_equal(collections[2].get_segments()[0][:, 1], Y[16])
+    assert ax_multi.get_ylim() == pytest.approx(ax_lines.get_ylim())
+
+    # An explicit cycle; no labels, no proxies
+    collections, handles = gp.multiline(ax_multi, x, Y[:3], cycle=gp.GnuplotCycle())
+    assert len(collections) == 1 and handles == []
+    with pytest.raises(ValueError, match="labels"):
+        gp.multiline(ax_multi, x, Y, labels=["a"])
+    for cycle in ([], ["red"]):
+        with pytest.raises(ValueError, match="non-empty Cycler"):
+            gp.multiline(ax_multi, x, Y, cycle=cycle)
+    plt.close(fig)
+
+    # The default styles come from, and advance, the axes' own cycle
+    plt.rcdefaults()
+    fig, ax = plt.subplots()
+    gp.apply(ax, "cl")
+    collections, _ = gp.multiline(ax, x, Y[:3])
+    np.testing.assert_array_equal(
+        np.vstack([c.get_colors() for c in collections]),
+        to_rgba_array(gp.COLORS[:3]),
+    )
+    # Catches changes to the private matplotlib cycle state read here
+    (line,) = ax.plot(x, Y[3])
+    assert line.get_color() == gp.COLORS[3]
+    plt.close(fig)
+
+
+def test_plot_decimates_to_pixels():
+    """Test that plot() keeps the pixel-column extremes of the visible range."""
+    gp.use("cl")
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 10, 200_000)
+    y = np.sin(x) + rng.normal(0, 0.3, x.size)
+
+    fig, ax = plt.subplots()
+    first = gp.plot(ax, x, y, label="noisy")
+    second = gp.plot(ax, x[:10], y[:10])
+    assert first.get_color() == gp.COLORS[0]
+    assert second.get_linestyle() == ax.plot([0, 1])[0].get_linestyle() != "-"
+    assert first.get_label() == "noisy"
+
+    xd, yd = first.get_data()
+    assert len(xd) <= 4 * ax.bbox.width + 2
+    assert xd[0] == x[0] and xd[-1] == x[-1]
+    assert yd.max() == y.max() and yd.min() == y.min()
+    np.testing.assert_array_equal(second.get_xdata(), x[:10])
+
+    # Zooming in re-decimates the visible range, down to the raw samples
+    ax.set_xlim(4, 4.01)
+    xd, yd = first.get_data()
+    inside = (x >= 4) & (x <= 4.01)
+    np.testing.assert_array_equal(xd[1:-1], x[inside])
+    assert xd[0] < 4 < 4.01 < xd[-1]
+
+    # Removed lines drop their callbacks at the next limit change
+    n_callbacks = len(ax.callbacks.callbacks["xlim_changed"])
+    n_resize = len(fig.canvas.callbacks.callbacks["resize_event"])
+    first.remove()
+    second.remove()
+    ax.set_xlim(0, 10)
+    assert len(ax.callbacks.callbacks.get("xlim_changed", {})) == n_callbacks - 2
+    assert len(fig.canvas.callbacks.callbacks.get("resize_event", {})) == (n_resize - 2)
+
+    with pytest.raises(ValueError, match="sorted"):
+        gp.plot(ax, x[::-1], y)
+    with pytest.raises(ValueError, match="same length"):
+        gp.plot(ax, x, y[:-1])
+
+    # pointnumber bounds the markers of every decimation
+    thinned = gp.plot(ax, x, y, pointnumber=20, marker="o")
+    assert len(thinned.get_xdata()[:: thinned.get_markevery()]) <= 20
+    ax.set_xlim(4, 4.01)
+    assert len(thinned.get_xdata()[:: thinned.get_markevery()]) <= 20
+    with pytest.raises(ValueError, match="pointnumber"):
+        gp.plot(ax, x, y, pointnumber=0)
+    plt.close(fig)
+
+
+def test_load_data_selectors(tmp_path, monkeypatch):
+    """Test gnuplot index/every/using selection on a blocked data file."""
+    path = tmp_path / "run.dat"
+    path.write_text(
+        "# x y z\n1 10 100\n2 20 200\n\n3 30 300\n  # note\n4 40 400\n\n\n"
+        "5 50 500\n6 60 600\n\t7 70 700\n\n8 80 800"
+    )
+    with gp.DataFile(path, cache="none") as data:
+        assert data.n_datasets == 2
+        assert [data.n_blocks(i) for i in range(2)] == [2, 2]
+
+        x, y, z = data.read()
+        np.testing.assert_array_equal(x, np.arange(1, 9))
+        np.testing.assert_array_equal(z, 100 * x)
+
+        columns = data.read(index=1, using="0:-1:-2:2")
+        expected = [[0, 1, 2, 3], [0, 0, 0, 1], [1, 1, 1, 1], [50, 60, 70, 80]]
+        np.testing.assert_array_equal(columns, expected)
+
+        # every point_incr:block_incr:start_point:start_block:end_point:end_block
+        np.testing.assert_array_equal(
+            data.read(every="2", using=(1,))[0], [1, 3, 5, 7, 8]
+        )
+        np.testing.assert_array_equal(
+            data.read(every=":2", using="1")[0], [1, 2, 5, 6, 7]
+        )
+        (x,) = data.read(index="0:1", every=(1, 1, 0, 1), using=[1])
+        np.testing.assert_array_equal(x, [3, 4, 8])
+
+        x, y = data.read(every="::1", using="1:2", gaps=True)
+        np.testing.assert_array_equal(x, [2, np.nan, 4, np.nan, 6, 7])
+        x, _ = data.read(index=0, using="1:2", gaps=True)
+        np.testing.assert_array_equal(x, [1, 2, np.nan, 3, 4])
+
+        assert [len(c) for c in data.read(index=5, using="1:2")] == [0, 0]
+        with pytest.raises(ValueError, match="using"):
+            data.read(using="($1*2):2")
+        with pytest.raises(ValueError, match="increments"):
+            data.read(every="0")
+
+    # Indexing in small chunks finds the same blocks
+    expected = gp.data._scan(path.read_bytes())
+    monkeypatch.setattr(gp.data, "_INDEX_CHUNK", 7)
+    for array, reference in zip(gp.data._scan(path.read_bytes()), expected):
+        np.testing.assert_array_equal(array, reference)
+
+    # The index saved next to the file is reused by a fresh process cache
+    gp.data._cached_index.cache_clear()
+    x, z = gp.load_data(path, using="1:3", cache="file")
+    assert os.path.exists(str(path) + ".gpindex.npz")
+    gp.data._cached_index.cache_clear()
+    monkeypatch.setattr(gp.data, "_scan", None)
+    np.testing.assert_array_equal(gp.load_data(path, using="1:3", cache="file"), (x, z))
+    gp.data._cached_index.cache_clear()
+
+
+def test_load_binary_memmap(tmp_path):
+    """Test gnuplot binary formats as zero-copy structured views."""
+    records = np.zeros(
+        5, dtype=[("t", ">f8"), ("v", ">f4"), ("flag", ">i4"), ("w", ">f4")]
+    )
+    records["t"] = np.arange(5)
+    records["v"] = 2 * records["t"]
+    records["w"] = -1
+    path = tmp_path / "sim.bin"
+    path.write_bytes(b"HEAD" + records.tobytes())
+
+    data = gp.BinaryFile(path, "%float64%float32%*int32%float", skip=4, endian="big")
+    assert len(data) == 5 and data.dtype.itemsize == 20
+    t, v, w = data.columns()
+    assert np.shares_memory(t, data.records)
+    np.testing.assert_array_equal(t, records["t"])
+    np.testing.assert_array_equal(v, records["v"])
+    np.testing.assert_array_equal(w, -1)
+
+    index, v = data.columns("0:2")
+    np.testing.assert_array_equal(index, np.arange(5))
+    chunks = list(data.chunks(2, using=[1]))
+    assert [len(c[0]) for c in chunks] == [2, 2, 1]
+    np.testing.assert_array_equal(np.concatenate([c[0] for c in chunks]), t)
+
+    # A 4 x 3 grid of floats, x varying fastest
+    grid = tmp_path / "grid.bin"
+    np.arange(12, dtype="f4").tofile(grid)
+    (z,) = gp.load_binary(grid, array=(4, 3))
+    assert z.shape == (3, 4) and z[1, 0] == 4
+    x, y = gp.load_binary(grid, format="%2float", record=3)
+    np.testing.assert_array_equal(y, [1, 3, 5])
+
+    with pytest.raises(ValueError, match="Unknown binary type"):
+        gp.BinaryFile(grid, format="%float128")
+    with pytest.raises(ValueError, match="not 100"):
+        gp.BinaryFile(grid, record=100)
+    with pytest.raises(ValueError, match="mutually exclusive"):
+        gp.BinaryFile(grid, record=3, array=(2, 2))
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert len(gp.BinaryFile(empty)) == 0
+    with pytest.raises(ValueError, match="skip=10 lies outside"):
+        gp.BinaryFile(empty, skip=10)
+
+
+def test_run_script(tmp_path):
+    """Test compiling gnuplot plot/set commands and incremental re-runs."""
+    (tmp_path / "a.dat").write_text("1 1 5\n2 4 4\n3 9 3\n\n4 16 2\n")
+    (tmp_path / "b.dat").write_text("1\n3\n2\n")
+    script = tmp_path / "fig.gp"
+    script.write_text(
+        "set terminal pngcairo  # ignored\n"
+        "set title 'Squares'; set xrange [0:*]\n"
+        "set logscale y\n"
+        "plot 'a.dat' using 1:2 with linespoints lt 3 pt 7 title 'x', \\\n"
+        "     '' u 1:3 w l dt 2 lw 2 notitle, \\\n"
+        "     'b.dat' w p pt 6 ps 2\n"
+    )
+    gp.use("cl")
+    ax = gp.run_script(script)
+    squares, dashed, points = ax.lines
+
+    assert squares.get_color() == gp.COLORS[2]  # lt 3
+    assert squares.get_marker() == gp.MARKERS[7]
+    assert squares.get_fillstyle() == gp.FILL_STYLES[7]
+    np.testing.assert_array_equal(squares.get_ydata(), [1, 4, 9, np.nan, 16])
+    assert dashed.get_linestyle() == "--" and dashed.get_marker() == "None"
+    assert dashed.get_linewidth() == 2 * plt.rcParams["lines.linewidth"]
+    assert points.get_color() == gp.COLORS[2 % 8]  # third item: lt 3
+    assert points.get_linestyle() == "None"
+    assert points.get_markersize() == 2 * plt.rcParams["lines.markersize"]
+    np.testing.assert_array_equal(points.get_xdata(), [0, 1, 2])  # using 0:1
+
+    assert ax.get_title() == "Squares"
+    assert ax.get_yscale() == "log" and ax.get_xlim()[0] == 0
+    assert [t.get_text() for t in ax.get_legend().texts] == ["x", "'b.dat'"]
+
+    # Unchanged script and data: nothing is redrawn
+    gp.run_script(script, ax=ax)
+    assert ax.lines[0] is squares and ax.lines[2] is points
+
+    # New data keeps the line; a new style replaces it
+    (tmp_path / "b.dat").write_text("5\n6\n7\n8\n")
+    gp.run_script(script, ax=ax)
+    assert ax.lines[2] is points
+    np.testing.assert_array_equal(points.get_ydata(), [5, 6, 7, 8])
+    script.write_text("set key off\nplot 'a.dat' with lines lc rgb '#ff0000'\n")
+    gp.run_script(script, ax=ax)
+    (line,) = ax.lines
+    assert line.get_color() == "#ff0000" and ax.get_legend() is None
+    assert ax.get_title() == "" and ax.get_yscale() == "linear"
+
+    script.write_text("plot 'a.dat' w lp pn 2, '' w p pi 2\n")
+    gp.run_script(script, ax=ax)
+    assert [line.get_markevery() for line in ax.lines] == [3, 2]  # 5 points
+
+    with pytest.raises(ValueError, match="only data files"):
+        gp.run_script("plot sin(x)")
+    with pytest.raises(ValueError, match="no plot command"):
+        gp.run_script("set grid")
+    plt.close("all")
+
+
+def test_palettes():
+    """Test gnuplot palettes, their cache and use(palette=...)."""
+    import matplotlib as mpl
+
+    x = np.linspace(0, 1, 11)
+    # rgbformulae 7,5,15 and 30,31,32 are matplotlib's gnuplot colormaps
+    cmap = gp.get_palette("rgbformulae 7,5,15")
+    assert np.allclose(cmap(x), mpl.colormaps["gnuplot"](x))
+    assert np.allclose(
+        gp.rgbformulae_palette(30, 31, 32)(x), mpl.colormaps["gnuplot2"](x)
+    )
+    assert gp.get_palette("color") is cmap
+    assert np.allclose(gp.rgbformula(-3, [0.0, 0.25]), [1.0, 0.75])
+    with pytest.raises(ValueError):
+        gp.rgbformula(37, x)
+
+    defined = gp.get_palette("defined (0 'black', 1 'red', 2 '#ffffff')", n=5)
+    assert np.allclose(
+        defined([0.0, 0.5, 1.0])[:, :3], [[0, 0, 0], [1, 0, 0], [1, 1, 1]]
+    )
+    assert np.allclose(
+        gp.cubehelix_palette()(x), mpl.colormaps["cubehelix"](x), atol=1e-6
+    )
+    assert gp.get_palette("gray negative")(0.0)[:3] == (1.0, 1.0, 1.0)
+    with pytest.raises(ValueError):
+        gp.get_palette("hsv2rgb")
+
+    plt.rcdefaults()
+    gp.use("cl", palette="cubehelix start 1")
+    assert plt.rcParams["image.cmap"] == "gnuplot_cubehelix_1_-1.5_1"
+    fig, ax = plt.subplots()
+    image = ax.imshow(np.arange(4.0).reshape(2, 2))
+    assert image.get_cmap().name == "gnuplot_cubehelix_1_-1.5_1"
+    gp.apply(ax, palette="rgb 33,13,10")
+    assert image.get_cmap().name == "gnuplot_rgbformulae_33_13_10"
+    plt.close(fig)
+    gp.use("cl")
+    assert plt.rcParams["image.cmap"] == "viridis"
+
+
+def test_pm3d():
+    """Test that pm3d draws images for rectilinear grids and meshes otherwise."""
+    from matplotlib.collections import QuadMesh
+    from matplotlib.image import AxesImage, PcolorImage
+
+    x = np.linspace(0, 1, 5)
+    y = np.linspace(0, 2, 4)
+    X, Y = np.meshgrid(x, y)
+    Z = X + Y
+    fig, ax = plt.subplots()
+
+    image = gp.pm3d(ax, X, Y, Z, palette="rgbformulae 33,13,10")
+    assert isinstance(image, AxesImage)
+    assert image.get_extent() == [0.0, 1.0, 0.0, 2.0]
+    # Each cell gets the mean of its four corners
+    assert np.allclose(image.get_array(), (Z[:-1, :-1] + Z[1:, 1:]) / 2)
+    assert image.get_cmap().name == "gnuplot_rgbformulae_33_13_10"
+    assert image.colorbar is not None
+
+    image = gp.pm3d(ax, x**2, y[::-1], Z, corners2color="max", colorbox=False)
+    assert isinstance(image, PcolorImage)
+    # gnuplot's default palette, not matplotlib's image.cmap
+    assert image.get_cmap().name == "gnuplot_rgbformulae_7_5_15"
+    assert image.colorbar is None
+    assert np.allclose(image.get_array(), Z[1:, 1:][::-1])
+
+    with gp.style_context("cl", palette="gray"):
+        mesh = gp.pm3d(ax, X + 0.1 * Y, Y, Z, colorbox=False)
+    assert isinstance(mesh, QuadMesh) and mesh.get_rasterized()
+    assert mesh.get_cmap().name == "gnuplot_rgbformulae_3_3_3"
+
+    with pytest.raises(ValueError):
+        gp.pm3d(ax, x, y, Z.T)
+    with pytest.raises(ValueError):
+        gp.pm3d(ax, x[[0, 2, 1, 3, 4]], y, Z)
+    plt.close(fig)
+
+
+def test_key():
+    """Test gnuplot key placement, layouts and shared proxies."""
+    from matplotlib.lines import Line2D
+
+    from gnuplot_style.legend import _proxy
+
+    plt.rcdefaults()
+    gp.use("cl", cycle_mode="extended")
+    fig, ax = plt.subplots()
+    lines = [ax.plot([0, 1], [i, i], label=f"s{i}")[0] for i in range(150)]
+
+    legend = gp.key(ax, position="outside top", maxrows=50)
+    assert legend._loc == 2  # upper left, anchored to the right of the axes
+    assert legend._ncols == 3
+    assert len(legend.legend_handles) == 150
+    # Entries 72 apart share color and dash, and so their proxy
+    assert _proxy(lines[0]) is _proxy(lines[72])
+    assert _proxy(lines[0]) is not _proxy(lines[1])
+    # Unhashable styles keep their own handle
+    (vertices,) = ax.plot([0, 1], marker=[(0, 0), (1, 0), (0, 1)])
+    assert _proxy(vertices) is vertices
+    vertices.remove()
+    # matplotlib < 3.6 keeps the unscaled dash pattern in two attributes
+    old = Line2D([], [], linestyle=(0, (4, 2)))
+    old._us_dashOffset, old._us_dashSeq = old._unscaled_dash_pattern
+    del old._unscaled_dash_pattern
+    assert _proxy(old).style["linestyle"] == (0, (4, 2))
+
+    # Columns fill up to maxrows as in gnuplot (50/50/10), not 37/37/36
+    legend = gp.key(ax, lines[:110], maxrows=50)
+    columns = [
+        [row.get_children()[0].get_text() for row in column.get_children()]
+        for column in legend._legend_handle_box.get_children()
+    ]
+    assert [[text for text in column if text] for column in columns] == [
+        [f"s{i}" for i in range(start, min(start + 50, 110))] for start in (0, 50, 100)
+    ]
+
+    legend = gp.key(ax, lines[:10], position="above", maxcols=4)
+    assert [t.get_text() for t in legend.get_texts()] == [
+        f"s{i}" for i in (0, 4, 8, 1, 5, 9, 2, 6, 3, 7)
+    ]
+    assert legend._loc == 8  # lower center
+
+    legend = gp.key(ax, lines[:2], ["a", "b"], position="bottom left", box=False)
+    assert legend._loc == 3 and not legend.get_frame_on()
+
+    legend = gp.key(ax, lines[:6], maxrows=np.int64(3))
+    assert legend._ncols == 2
+    with pytest.raises(ValueError, match="maxrows"):
+        gp.key(ax, maxrows=True)
+    with pytest.raises(ValueError):
+        gp.key(ax, position="top rigth")
+    with pytest.raises(ValueError):
+        gp.key(ax, lines[:2], ["a"])
+    plt.close(fig)
+
+
 def test_mplstyle_loading():
     """Test that mplstyle file is loaded."""
     # Reset first
@@ -231,6 +837,350 @@ def test_zip_cycle_mode():
         gp.use("all", cycle_mode="extended", loop_order="xyz")
 
 
+def test_prop_cycle_cache():
+    """Test that use() reuses the cached prop_cycle for repeated calls."""
+    gp.cache_clear()
+    assert gp.cache_info().currsize == 0
+
+    gp.use("all", cycle_mode="extended")
+    first = plt.rcParams["axes.prop_cycle"]
+    gp.use("clm", cycle_mode="extended")  # shorthand shares the entry
+    assert plt.rcParams["axes.prop_cycle"] is first
+
+    info = gp.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+    # Eviction keeps the cache bounded
+    for style in ["c", "l", "m", "cl", "cm", "all"]:
+        for cycle_mode in ["default", "extended", "zip"]:
+            for skip_no_marker in [False, True]:
+                gp.use(style, cycle_mode=cycle_mode, skip_no_marker=skip_no_marker)
+    info = gp.cache_info()
+    assert info.currsize <= info.maxsize
+
+    gp.cache_clear()
+    assert gp.cache_info().currsize == 0
+
+
+def test_use_matches_full_reset():
+    """Test that the rcParams delta gives the same state as a full reset."""
+    import matplotlib as mpl
+
+    style_path = os.path.join(os.path.dirname(gp.__file__), "gnuplot.mplstyle")
+    mpl.rcdefaults()
+    plt.style.use(style_path)
+    plt.rc("axes", prop_cycle=gp.core._build_prop_cycle("all", "zip", False, "mlc"))
+    expected = dict(plt.rcParams)
+
+    plt.rcParams["lines.linewidth"] = 5.0
+    plt.rcParams["figure.dpi"] = 72
+    gp.use("all", cycle_mode="zip")
+    assert dict(plt.rcParams) == expected
+
+
+def test_use_mplstyle_parsed_once(monkeypatch):
+    """Test that repeated use() calls neither re-read nor rewrite rcParams."""
+    import matplotlib as mpl
+
+    gp.use("cm")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("gnuplot.mplstyle was parsed again")
+
+    monkeypatch.setattr(mpl, "rc_params_from_file", fail)
+    monkeypatch.setattr(gp.core, "_rc_update", fail)
+    gp.use("cm")  # already active: nothing to write
+
+    monkeypatch.undo()
+    plt.rcParams["axes.linewidth"] = 3.0
+    monkeypatch.setattr(mpl, "rc_params_from_file", fail)
+    gp.use("cm")
+    assert plt.rcParams["axes.linewidth"] == 0.8
+
+
+def test_fast_profile():
+    """Test that the fast profile swaps per-draw layout for fixed margins."""
+    from matplotlib.figure import Figure
+
+    gp.use("cl", profile="fast")
+    assert plt.rcParams["figure.autolayout"] is False
+    assert plt.rcParams["savefig.bbox"] is None
+    margins = gp.core._fixed_margins(plt.rcParams["figure.figsize"], plt.rcParams)
+    for side, value in margins.items():
+        assert plt.rcParams[f"figure.subplot.{side}"] == pytest.approx(value)
+    assert 0 < margins["left"] < margins["right"] < 1
+    assert 0 < margins["bottom"] < margins["top"] < 1
+
+    fig, ax = plt.subplots()
+    assert fig.get_layout_engine() is None
+    assert ax.get_position().x0 == pytest.approx(margins["left"])
+    plt.close(fig)
+
+    # Switching back restores the default profile
+    gp.use("cl")
+    assert plt.rcParams["figure.autolayout"] is True
+    assert plt.rcParams["savefig.bbox"] == "tight"
+
+    with pytest.raises(ValueError, match="Unknown profile"):
+        gp.use("cl", profile="slow")
+    assert plt.rcParams["figure.autolayout"] is True
+
+    # apply() derives the margins from each figure's own size
+    fig = Figure(figsize=(12, 3))
+    ax = fig.subplots()
+    assert fig.get_layout_engine() is not None  # tight, from figure.autolayout
+    gp.apply(fig, "cl", profile="fast")
+    assert not gp.core._has_tight_layout(fig)
+    wide = gp.core._fixed_margins((12, 3), gp.core._base_params(True, "fast"))
+    assert fig.subplotpars.left == pytest.approx(wide["left"])
+    assert wide["left"] < margins["left"]
+
+
+def test_pointinterval():
+    """Test that marker thinning sets markevery on series with markers."""
+    gp.use("cm", pointinterval=10)
+    fig, ax = plt.subplots()
+    (line,) = ax.plot(np.arange(100))
+    assert line.get_markevery() == 10
+    plt.close(fig)
+
+    gp.use("all", cycle_mode="extended", pointinterval=np.int64(20))
+    cycle = plt.rcParams["axes.prop_cycle"]
+    assert len(cycle) == 1224
+    assert {entry["markevery"] for entry in cycle} == {20}
+    assert "markevery=20" in repr(cycle)
+
+    # Styles without markers are unaffected; the cache keys on markevery
+    gp.use("cl", pointinterval=10)
+    assert "markevery" not in plt.rcParams["axes.prop_cycle"].keys
+    gp.use("cm")
+    assert "markevery" not in plt.rcParams["axes.prop_cycle"].keys
+
+    for invalid in (0, 2.5, True):
+        with pytest.raises(ValueError, match="positive integer"):
+            gp.apply(plt.figure(), "cm", pointinterval=invalid)
+    plt.close("all")
+
+
+def test_gnuplot_cycle():
+    """Test the lazy GnuplotCycle against explicit nested loops."""
+    import itertools
+
+    cycle = gp.GnuplotCycle("all", cycle_mode="extended", loop_order="clm")
+    assert len(cycle) == 1224
+
+    ranges = {
+        "c": range(len(gp.COLORS)),
+        "l": range(len(gp.LINE_STYLES)),
+        "m": range(len(gp.MARKERS)),
+    }
+    expected = []
+    for indices in itertools.product(*[ranges[k] for k in "clm"]):
+        idx = dict(zip("clm", indices))
+        expected.append(
+            {
+                "color": gp.COLORS[idx["c"]],
+                "linestyle": gp.LINE_STYLES[idx["l"]],
+                "marker": gp.MARKERS[idx["m"]],
+                "fillstyle": gp.FILL_STYLES[idx["m"]],
+            }
+        )
+    assert list(cycle) == expected
+
+    # Random access, negative indices and slicing
+    assert cycle[1000] == expected[1000]
+    assert cycle[-1] == expected[-1]
+    assert list(cycle[10:40:3]) == expected[10:40:3]
+    with pytest.raises(IndexError):
+        cycle[1224]
+
+    # Usable directly as an axes prop_cycle
+    fig, ax = plt.subplots()
+    ax.set_prop_cycle(gp.GnuplotCycle("cm", skip_no_marker=True))
+    (line,) = ax.plot([0, 1], [0, 1])
+    assert line.get_marker() == gp.MARKERS[1]
+    assert line.get_color() == gp.COLORS[0]
+    plt.close(fig)
+
+    with pytest.raises(ValueError, match="Unknown style"):
+        gp.GnuplotCycle("invalid")
+
+
+def test_apply_leaves_rcparams_alone():
+    """Test styling existing figures and axes without global state."""
+    import threading
+
+    from matplotlib.figure import Figure
+
+    plt.rcdefaults()
+    before = dict(plt.rcParams)
+
+    fig = Figure()
+    ax1, ax2 = fig.subplots(1, 2)
+    gp.apply(fig, "cm", skip_no_marker=True)
+    for ax in (ax1, ax2):
+        (line,) = ax.plot([0, 1], [0, 1])
+        assert line.get_color() == gp.COLORS[0]
+        assert line.get_marker() == gp.MARKERS[1]
+    assert fig.get_dpi() == 150
+
+    # A single axes keeps the figure untouched
+    other = Figure()
+    ax = other.subplots()
+    gp.apply(ax, "l", apply_mplstyle=False)
+    (line,) = ax.plot([0, 1], [0, 1])
+    assert line.get_linestyle() == "-"
+    assert other.get_dpi() == before["figure.dpi"]
+
+    # Concurrent styling of independent figures
+    figures = [Figure() for _ in range(8)]
+    for f in figures:
+        f.subplots()
+    threads = [
+        threading.Thread(target=gp.apply, args=(f, style), kwargs={"cycle_mode": mode})
+        for f, style, mode in zip(
+            figures,
+            ["c", "l", "m", "cl", "cm", "all", "all", "cl"],
+            ["default"] * 6 + ["zip", "extended"],
+        )
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert dict(plt.rcParams) == before
+
+    with pytest.raises(ValueError, match="Unknown style"):
+        gp.apply(fig, "invalid")
+
+
+def test_style_context_restores_changed_keys():
+    """Test nested style contexts and the decorator form."""
+    gp.use("c")
+    before = dict(plt.rcParams)
+
+    with gp.style_context("cl", cycle_mode="extended"):
+        assert len(plt.rcParams["axes.prop_cycle"]) == 72
+        with gp.style_context("m", apply_mplstyle=False):
+            assert plt.rcParams["figure.dpi"] == 100
+            assert "marker" in plt.rcParams["axes.prop_cycle"].keys
+        assert len(plt.rcParams["axes.prop_cycle"]) == 72
+        assert plt.rcParams["figure.dpi"] == 150
+    assert dict(plt.rcParams) == before
+
+    @gp.style_context("all", cycle_mode="zip")
+    def cycle_length():
+        return len(plt.rcParams["axes.prop_cycle"])
+
+    assert cycle_length() == 1224
+    assert cycle_length() == 1224
+    assert dict(plt.rcParams) == before
+
+    # Restored even when the block raises
+    with pytest.raises(RuntimeError):
+        with gp.style_context("l"):
+            raise RuntimeError
+    assert dict(plt.rcParams) == before
+
+
+def test_style_context_threads():
+    """Test that concurrent style contexts do not see each other's style."""
+    import threading
+    import time
+
+    gp.use("c")
+    before = dict(plt.rcParams)
+    errors = []
+
+    def worker(style, expected_length):
+        for _ in range(5):
+            with gp.style_context(style, cycle_mode="extended"):
+                time.sleep(0.001)
+                if len(plt.rcParams["axes.prop_cycle"]) != expected_length:
+                    errors.append(style)
+
+    threads = [
+        threading.Thread(target=worker, args=("cl", 72)),
+        threading.Thread(target=worker, args=("cm", 136)),
+        threading.Thread(target=worker, args=("all", 1224)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert dict(plt.rcParams) == before
+
+
+def _sine_figure():
+    """Build a small figure for the batch rendering test."""
+    fig, ax = plt.subplots()
+    x = np.linspace(0, 2 * np.pi, 20)
+    ax.plot(x, np.sin(x))
+    return fig
+
+
+def test_render_many(tmp_path):
+    """Test batch rendering in styled worker processes."""
+    basepath = os.path.join(str(tmp_path), "sine")
+    results = gp.render_many(
+        [_sine_figure, (_sine_figure, basepath)],
+        workers=2,
+        style="cl",
+        formats=("png", "svg"),
+    )
+    assert len(results) == 2
+
+    contents, paths = results
+    assert sorted(contents) == ["png", "svg"]
+    assert contents["png"].startswith(b"\x89PNG")
+    # The line was drawn with the first gnuplot color set up by the worker
+    assert gp.COLORS[0].lower().encode() in contents["svg"]
+
+    assert paths == [basepath + ".png", basepath + ".svg"]
+    assert all(os.path.getsize(path) > 0 for path in paths)
+
+    assert gp.render_many([]) == []
+    with pytest.raises(ValueError, match="Unknown style"):
+        gp.render_many([_sine_figure], style="invalid")
+
+
+def test_savefig_many(tmp_path, monkeypatch):
+    """Test saving several formats with one layout pass."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    gp.use("cl")
+    fig = _sine_figure()
+    fig.axes[0].set_title("Title")
+    expected = io.BytesIO()
+    fig.savefig(expected, format="png", dpi=100)
+
+    engine = fig.get_layout_engine()
+    calls = []
+    execute = engine.execute
+    monkeypatch.setattr(engine, "execute", lambda f: calls.append(f) or execute(f))
+
+    contents = gp.savefig_many(fig, formats=("png", "pdf", "svg"), dpi=100)
+    assert list(contents) == ["png", "pdf", "svg"]
+    assert contents["png"] == expected.getvalue()
+    assert contents["pdf"].startswith(b"%PDF")
+    assert len(calls) == 1
+    assert fig.get_layout_engine() is engine
+
+    basepath = os.path.join(str(tmp_path), "sine")
+    paths = gp.savefig_many(fig, basepath, formats=("png", "svg"))
+    assert paths == [basepath + ".png", basepath + ".svg"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = gp.savefig_many(fig, basepath + "-bg", executor=pool)
+        written = [future.result() for future in futures]
+    assert written == [basepath + "-bg." + fmt for fmt in ("png", "pdf", "svg")]
+    assert all(os.path.getsize(path) > 0 for path in paths + written)
+    plt.close(fig)
+
+
 def test_default_vs_extended_visual():
     """Visual test comparing default vs extended cycle modes."""
     fig, axes = plt.subplots(2, 2, figsize=(14, 8))
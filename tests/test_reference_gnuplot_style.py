@@ -20,8 +20,8 @@ import numpy as np  # noqa: E402
 import gnuplot_style as gp  # noqa: E402
 
 
-def create_reference():
-    """Create comprehensive reference figure showing all gnuplot_style features."""
+def build_reference():
+    """Build comprehensive reference figure showing all gnuplot_style features."""
 
     gp.use()
     # Create figure with proper layout
@@ -452,16 +452,20 @@ Integrated gnuplot.mplstyle:
 
     ax.axis("off")
 
-    # Save in multiple formats
     plt.tight_layout()
-    for fmt in ["png", "pdf", "svg"]:
-        filename = os.path.join(
-            os.path.dirname(__file__), f"gnuplot_style_reference.{fmt}"
-        )
-        plt.savefig(filename, dpi=150, bbox_inches="tight")
+    return fig
+
+
+def create_reference():
+    """Create the reference figure and save it in multiple formats."""
+    fig = build_reference()
+    basepath = os.path.join(os.path.dirname(__file__), "gnuplot_style_reference")
+    for filename in gp.savefig_many(
+        fig, basepath, formats=("png", "pdf", "svg"), dpi=150, bbox_inches="tight"
+    ):
         print(f"✓ Created: {filename}")
 
-    plt.close()
+    plt.close(fig)
 
 
 if __name__ == "__main__":